@@ -0,0 +1,70 @@
+"""Microbenchmark for SVG label escaping.
+
+Run with ``python -m py_mermaid.benchmarks.bench_escape``.
+"""
+from __future__ import annotations
+
+import random
+import timeit
+from typing import Callable, Dict, List
+
+from py_mermaid.src.escape import svg_escape
+
+LABEL_COUNT = 5000
+REPEAT = 5
+NUMBER = 20
+
+
+def _chained_replace(text: str) -> str:
+    return (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+        .replace("'", "&apos;")
+    )
+
+
+def typical_labels(count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    words = ["Service", "Gateway", "Queue", "Worker", "Cache", "Billing", "Auth", "Store"]
+    labels = [f"{rng.choice(words)} {rng.choice(words)} {idx % 50}" for idx in range(count)]
+    # A few labels in real diagrams carry an ampersand or angle bracket.
+    for idx in range(0, count, 40):
+        labels[idx] = labels[idx] + " & <edge>"
+    return labels
+
+
+def worst_case_labels(count: int, distinct: int) -> List[str]:
+    return [f"<tag attr='{idx % distinct}'>\"quoted\" & more &amp; {idx % distinct}</tag>" for idx in range(count)]
+
+
+def run() -> Dict[str, Dict[str, float]]:
+    label_sets = {
+        "typical": typical_labels(LABEL_COUNT),
+        "special-repeated": worst_case_labels(LABEL_COUNT, distinct=200),
+        # Every label is distinct and the set overflows the escape cache.
+        "special-unique": worst_case_labels(LABEL_COUNT, distinct=LABEL_COUNT),
+    }
+    implementations: Dict[str, Callable[[str], str]] = {
+        "chained-replace": _chained_replace,
+        "svg_escape": svg_escape,
+    }
+    results: Dict[str, Dict[str, float]] = {}
+    for set_name, labels in label_sets.items():
+        results[set_name] = {}
+        for impl_name, escape in implementations.items():
+            timings = timeit.repeat(lambda: [escape(label) for label in labels], number=NUMBER, repeat=REPEAT)
+            results[set_name][impl_name] = min(timings) / (NUMBER * len(labels))
+    return results
+
+
+def main() -> None:
+    for set_name, timings in run().items():
+        baseline = timings["chained-replace"]
+        for impl_name, seconds in timings.items():
+            print(f"{set_name:>16}  {impl_name:<16} {seconds * 1e9:8.1f} ns/label  x{baseline / seconds:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Flowchart parser throughput on generated sources.
+
+Run with ``python -m py_mermaid.benchmarks.bench_parser``.
+"""
+from __future__ import annotations
+
+import timeit
+from typing import Dict
+
+from py_mermaid.benchmarks.generators import flowchart_source
+from py_mermaid.src.parser import Parser
+
+SIZES = [1000, 5000, 20000]
+REPEAT = 5
+
+
+def run() -> Dict[int, float]:
+    parser = Parser()
+    results: Dict[int, float] = {}
+    for size in SIZES:
+        text = flowchart_source(size)
+        lines = text.count("\n")
+        timings = timeit.repeat(lambda: parser.parse(text), number=1, repeat=REPEAT)
+        results[size] = lines / min(timings)
+    return results
+
+
+def main() -> None:
+    for size, lines_per_second in run().items():
+        print(f"{size:>6} nodes  {lines_per_second / 1000:8.1f}k lines/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Validate-only throughput against full rendering on a batch of generated diagrams.
+
+Run with ``python -m py_mermaid.benchmarks.bench_validate``.
+"""
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, Iterable, List
+
+from py_mermaid.benchmarks.generators import flowchart_source, sequence_source
+from py_mermaid.src.pipeline import RenderResult, render_many, validate_many
+
+DIAGRAMS = 400
+SIZE = 200
+WORKERS = [0, 4]
+
+
+def batch() -> List[str]:
+    return [
+        flowchart_source(SIZE, seed=idx) if idx % 2 else sequence_source(SIZE, seed=idx)
+        for idx in range(DIAGRAMS)
+    ]
+
+
+def _time(run: Callable[..., Iterable[RenderResult]], texts: List[str], workers: int) -> float:
+    started = time.perf_counter()
+    for _ in run(texts, workers=workers, use_processes=workers > 0):
+        pass
+    return time.perf_counter() - started
+
+
+def run() -> Dict[int, Dict[str, float]]:
+    texts = batch()
+    return {
+        workers: {"render": _time(render_many, texts, workers), "validate": _time(validate_many, texts, workers)}
+        for workers in WORKERS
+    }
+
+
+def main() -> None:
+    for workers, timings in run().items():
+        label = f"{workers} workers" if workers else "serial"
+        print(
+            f"{label:>10}  render {DIAGRAMS / timings['render']:8.1f}/s  "
+            f"validate {DIAGRAMS / timings['validate']:8.1f}/s  "
+            f"({timings['render'] / timings['validate']:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Deterministic diagram source generators shared by benchmarks and tests."""
+from __future__ import annotations
+
+import random
+from typing import List
+
+CLASSES = ["header", "org", "capability", "infra"]
+
+
+def flowchart_source(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    columns = max(1, size // 25)
+    lines = ["flowchart LR"]
+    for idx in range(size):
+        key = f"c{idx % columns}"
+        class_name = CLASSES[0] if idx < columns else rng.choice(CLASSES[1:])
+        lines.append(f"{key}_n{idx}[Node {idx} & label {rng.randrange(1000)}]:::{class_name}")
+    for idx in range(1, size):
+        source = rng.randrange(idx)
+        connector = "-->" if idx % 5 else "---"
+        label = f"|e{idx}| " if idx % 3 == 0 else ""
+        lines.append(f"c{source % columns}_n{source} {connector}{label}c{idx % columns}_n{idx}")
+    for idx in range(0, size, 10):
+        lines.append(f"note right of c{idx % columns}_n{idx}: note {idx}")
+    lines.append("linkStyle 0,1,2 stroke:#f00")
+    return "\n".join(lines) + "\n"
+
+
+def multiline_label_source(size: int) -> str:
+    body = "\n".join(f"fragment {idx} of a long wrapped label" for idx in range(size))
+    return f"flowchart TB\nA[{body}]\nB[End]\nA --> B\n"
+
+
+def sequence_source(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    participant_count = max(2, size // 8)
+    names = [f"P{idx}" for idx in range(participant_count)]
+    lines: List[str] = ["sequenceDiagram"]
+    lines.extend(f"participant {name} as Service {name}" for name in names)
+    arrows = ["->>", "-->>", "->", "-->", "-x", "--x"]
+    depth = 0
+    for idx in range(size):
+        sender, receiver = rng.choice(names), rng.choice(names)
+        lines.append(f"{sender}{rng.choice(arrows)}{receiver}: message {idx} <payload & more>")
+        roll = idx % 17
+        if roll == 3:
+            lines.append(f"Note over {names[0]},{rng.choice(names)}: note {idx}")
+        elif roll == 5:
+            lines.append(f"activate {receiver}")
+        elif roll == 7:
+            lines.append(f"deactivate {receiver}")
+        elif roll == 9 and depth < 3:
+            lines.append(f"loop retry {idx}")
+            depth += 1
+        elif roll == 11 and depth:
+            lines.append("end")
+            depth -= 1
+    lines.extend(["end"] * depth)
+    return "\n".join(lines) + "\n"
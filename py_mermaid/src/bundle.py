@@ -0,0 +1,133 @@
+"""Many rendered diagrams in one HTML page with shared defs and a shared stylesheet.
+
+Each distinct ``<defs>`` block is written once into a hidden SVG at the top
+of the page, and diagrams point at it by id. A font-family every text of a
+diagram shares becomes a stylesheet rule rather than an attribute per
+element. Every other id is prefixed per diagram so nothing collides.
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from py_mermaid.src.escape import svg_escape
+from py_mermaid.src.pipeline import render_many
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+DIAGRAM_CLASS = "mermaid-diagram"
+SHARED_ID_PREFIX = "shared{}-"
+DIAGRAM_ID_PREFIX = "d{}-"
+FONT_CLASS = "mermaid-font{}"
+
+_DEFS = re.compile(r"<defs>\n(.*?)\n</defs>\n", re.S)
+_SVG_OPEN = "<svg "
+# Labels are escaped, so a double quote only ever delimits an attribute value.
+_ID = re.compile(r' id="([^"]+)"')
+_URL_REF = re.compile(r'="url\(#([^)"]+)\)"')
+_FONT_FAMILY = re.compile(r' font-family="([^"]*)"')
+
+
+class BundleBuilder:
+    """Accumulates rendered SVGs and writes them out as one HTML document."""
+
+    def __init__(self, title: str = "Diagrams"):
+        self.title = title
+        self._defs: Dict[str, int] = {}
+        self._shared_defs: List[str] = []
+        self._shared_ids: List[Dict[str, str]] = []
+        self._fonts: Dict[str, int] = {}
+        self._figures: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._figures)
+
+    def add(self, svg: str, caption: Optional[str] = None) -> str:
+        """Add one renderer output; returns the id of its ``<figure>``."""
+        index = len(self._figures)
+        if svg.startswith(XML_DECLARATION):
+            svg = svg[len(XML_DECLARATION):]
+        shared: Dict[str, str] = {}
+        match = _DEFS.search(svg)
+        if match is not None:
+            shared = self._share_defs(match.group(1))
+            svg = svg[: match.start()] + svg[match.end():]
+
+        prefix = DIAGRAM_ID_PREFIX.format(index)
+        svg = _ID.sub(lambda found: f' id="{prefix}{found.group(1)}"', svg)
+        svg = _URL_REF.sub(lambda found: f'="url(#{shared.get(found.group(1), prefix + found.group(1))})"', svg)
+
+        fonts = set(_FONT_FAMILY.findall(svg))
+        if len(fonts) == 1:
+            font_class = FONT_CLASS.format(self._fonts.setdefault(fonts.pop(), len(self._fonts)))
+            svg = _FONT_FAMILY.sub("", svg).replace(_SVG_OPEN, f'{_SVG_OPEN}class="{font_class}" ', 1)
+
+        figure_id = f"diagram-{index}"
+        parts = [f'<figure class="{DIAGRAM_CLASS}" id="{figure_id}">', svg.rstrip("\n")]
+        if caption is not None:
+            parts.append(f"<figcaption>{svg_escape(caption)}</figcaption>")
+        parts.append("</figure>")
+        self._figures.append("\n".join(parts))
+        return figure_id
+
+    def html(self) -> str:
+        rules = [f".{DIAGRAM_CLASS} {{ margin: 0 0 24px; }}"]
+        rules.extend(f".{FONT_CLASS.format(idx)} text {{ font-family: {font}; }}" for font, idx in self._fonts.items())
+        lines = [
+            "<!DOCTYPE html>",
+            '<html><head><meta charset="utf-8">',
+            f"<title>{svg_escape(self.title)}</title>",
+            "<style>",
+            *rules,
+            "</style>",
+            "</head><body>",
+        ]
+        if self._shared_defs:
+            lines.append(
+                '<svg xmlns="http://www.w3.org/2000/svg" width="0" height="0" '
+                'style="position: absolute" aria-hidden="true">'
+            )
+            lines.append("<defs>")
+            lines.extend(self._shared_defs)
+            lines.extend(("</defs>", "</svg>"))
+        lines.extend(self._figures)
+        lines.extend(("</body></html>", ""))
+        return "\n".join(lines)
+
+    def _share_defs(self, defs: str) -> Dict[str, str]:
+        """Register one defs block (deduplicated by content); returns its id renames."""
+        index = self._defs.get(defs)
+        if index is None:
+            index = len(self._shared_defs)
+            prefix = SHARED_ID_PREFIX.format(index)
+            renames = {old: prefix + old for old in _ID.findall(defs)}
+            body = _ID.sub(lambda found: f' id="{renames[found.group(1)]}"', defs)
+            body = _URL_REF.sub(lambda found: f'="url(#{renames.get(found.group(1), found.group(1))})"', body)
+            self._defs[defs] = index
+            self._shared_defs.append(body)
+            self._shared_ids.append(renames)
+        return self._shared_ids[index]
+
+
+def bundle_svgs(svgs: Iterable[str], captions: Optional[Sequence[Optional[str]]] = None, title: str = "Diagrams") -> str:
+    builder = BundleBuilder(title)
+    for idx, svg in enumerate(svgs):
+        builder.add(svg, captions[idx] if captions is not None else None)
+    return builder.html()
+
+
+def render_bundle(
+    texts: Iterable[str],
+    captions: Optional[Sequence[Optional[str]]] = None,
+    title: str = "Diagrams",
+    **options,
+) -> str:
+    """Render diagram sources (through render_many) straight into one HTML page.
+
+    The first failing diagram's error is raised.
+    """
+    builder = BundleBuilder(title)
+    for result in render_many(texts, **options):
+        if not result.ok:
+            raise result.error
+        builder.add(result.output, captions[result.index] if captions is not None else None)
+    return builder.html()
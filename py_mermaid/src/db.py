@@ -12,9 +12,19 @@ class Node:
     subgraph: Optional[str]
     column_index: int = 0
     row_index: int = 0
-    text_lines: List[str] = field(default_factory=list)
-    width: float = 0.0
-    height: float = 0.0
+    shape: str = "rect"
+    column_key: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.column_key:
+            self.column_key = self.node_id.split("_", 1)[0]
+
+
+@dataclass
+class NodeBox:
+    text_lines: List[str]
+    width: float
+    height: float
     x: float = 0.0  # top-left
     y: float = 0.0  # top-left
 
@@ -49,7 +59,35 @@ class Note:
     anchor: str
     position: str
     text_lines: List[str]
-    width: float = 0.0
-    height: float = 0.0
+
+
+@dataclass
+class NoteBox:
+    width: float
+    height: float
     x: float = 0.0
     y: float = 0.0
+
+
+@dataclass
+class EdgeBundle:
+    """Unlabelled edges between two clusters, drawn through one shared trunk."""
+
+    edge_indexes: List[int]
+    start: Tuple[float, float]
+    end: Tuple[float, float]
+
+
+@dataclass
+class FlowchartLayout:
+    """Geometry for one render; the parsed model is never written to."""
+
+    canvas_size: Tuple[float, float]
+    columns: List[ColumnFrame]
+    margin: float
+    nodes: Dict[str, NodeBox]
+    notes: List[NoteBox]
+    # Edge index -> label anchor, filled only when collisions are resolved.
+    edge_labels: Dict[int, Tuple[float, float]] = field(default_factory=dict)
+    # Filled only when edge bundling is enabled.
+    bundles: List[EdgeBundle] = field(default_factory=list)
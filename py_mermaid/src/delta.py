@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+DELTA_SCHEMA_VERSION = 1
+
+_GROUP_OPEN = re.compile(r'<g id="([^"]+)">')
+_SVG_CLOSE = "</svg>"
+
+
+def split_svg(svg: str) -> Tuple[str, Dict[str, str]]:
+    """Split renderer output into its head and its id-keyed element groups.
+
+    Relies on the renderers writing each ``<g id=...>`` and its closing
+    ``</g>`` on lines of their own; groups are never nested.
+    """
+    head: List[str] = []
+    elements: Dict[str, str] = {}
+    current_id: Optional[str] = None
+    current: List[str] = []
+    for line in svg.splitlines():
+        if current_id is not None:
+            current.append(line)
+            if line == "</g>":
+                elements[current_id] = "\n".join(current)
+                current_id = None
+            continue
+        match = _GROUP_OPEN.fullmatch(line)
+        if match:
+            current_id = match.group(1)
+            current = [line]
+        elif line != _SVG_CLOSE and not elements:
+            head.append(line)
+    return "\n".join(head), elements
+
+
+def svg_delta(previous: str, current: str) -> Dict[str, Any]:
+    previous_head, previous_elements = split_svg(previous)
+    current_head, current_elements = split_svg(current)
+
+    removed = [element_id for element_id in previous_elements if element_id not in current_elements]
+    changed: List[List[str]] = []
+    added: List[List[Optional[str]]] = []
+    # Retained elements must keep their relative order; anything that moved
+    # is sent as remove + add so the patch can be applied by DOM insertion.
+    previous_positions = {element_id: idx for idx, element_id in enumerate(previous_elements)}
+    last_position = -1
+    after: Optional[str] = None
+    for element_id, markup in current_elements.items():
+        position = previous_positions.get(element_id)
+        if position is not None and position > last_position:
+            last_position = position
+            if previous_elements[element_id] != markup:
+                changed.append([element_id, markup])
+        else:
+            if position is not None:
+                removed.append(element_id)
+            added.append([element_id, after, markup])
+        after = element_id
+
+    patch: Dict[str, Any] = {"version": DELTA_SCHEMA_VERSION, "removed": removed, "changed": changed, "added": added}
+    if previous_head != current_head:
+        patch["head"] = current_head
+    return patch
+
+
+def apply_delta(previous: str, patch: Dict[str, Any]) -> str:
+    head, elements = split_svg(previous)
+    if "head" in patch:
+        head = patch["head"]
+    for element_id in patch["removed"]:
+        elements.pop(element_id, None)
+    for element_id, markup in patch["changed"]:
+        elements[element_id] = markup
+
+    followers: Dict[Optional[str], List[str]] = {}
+    for element_id, after, markup in patch["added"]:
+        elements[element_id] = markup
+        followers.setdefault(after, []).append(element_id)
+    added_ids = {element_id for element_id, _, _ in patch["added"]}
+    order: List[str] = []
+
+    def emit_followers(anchor: Optional[str]) -> None:
+        stack = list(reversed(followers.get(anchor, ())))
+        while stack:
+            element_id = stack.pop()
+            order.append(element_id)
+            stack.extend(reversed(followers.get(element_id, ())))
+
+    emit_followers(None)
+    for element_id in list(elements):
+        if element_id not in added_ids:
+            order.append(element_id)
+            emit_followers(element_id)
+    return "\n".join([head] + [elements[element_id] for element_id in order] + [_SVG_CLOSE]) + "\n"
+
+
+def is_empty_delta(patch: Dict[str, Any]) -> bool:
+    return not (patch["removed"] or patch["changed"] or patch["added"] or "head" in patch)
+
+
+def dumps_delta(patch: Dict[str, Any]) -> str:
+    return json.dumps(patch, separators=(",", ":"), ensure_ascii=False)
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+ERROR = "error"
+WARNING = "warning"
+
+
+@dataclass
+class Diagnostic:
+    # 1-based source line; for statements joined across lines, the first one.
+    line: int
+    severity: str
+    code: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.line}: {self.severity}: {self.message} [{self.code}]"
+
+
+def has_errors(diagnostics: List[Diagnostic]) -> bool:
+    return any(diagnostic.severity == ERROR for diagnostic in diagnostics)
+
+
+class DiagnosticSink:
+    """Collects diagnostics against the line currently being parsed."""
+
+    def __init__(self) -> None:
+        self.diagnostics: List[Diagnostic] = []
+        self.line = 0
+
+    def report(self, code: str, message: str, severity: str = ERROR, line: Optional[int] = None) -> None:
+        self.diagnostics.append(Diagnostic(self.line if line is None else line, severity, code, message))
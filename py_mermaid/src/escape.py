@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Union
+
+ESCAPE_CACHE_SIZE = 4096
+
+# Characters outside XML name chars (and "." itself, the escape marker) are
+# written as ".<hex>." so distinct keys always map to distinct ids.
+_ID_UNSAFE = re.compile(r"[^A-Za-z0-9_-]")
+
+
+@lru_cache(maxsize=ESCAPE_CACHE_SIZE)
+def _escape_special(text: str) -> str:
+    # str.translate with multi-character replacements runs a per-character
+    # Python-level mapping and is several times slower than these C scans.
+    return (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+        .replace("'", "&apos;")
+    )
+
+
+def svg_escape(text: str) -> str:
+    # Substring checks are memchr scans; most labels take this early return.
+    if not ("&" in text or "<" in text or ">" in text or '"' in text or "'" in text):
+        return text
+    return _escape_special(text)
+
+
+def element_id(kind: str, key: Union[str, int]) -> str:
+    key = str(key)
+    if _ID_UNSAFE.search(key) is not None:
+        key = _ID_UNSAFE.sub(lambda match: f".{ord(match.group()):x}.", key)
+    return f"{kind}-{key}"
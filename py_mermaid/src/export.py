@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional
+
+from py_mermaid.src.db import ColumnMeta, Edge, FlowchartLayout, Node, Note
+from py_mermaid.src.renderer import Renderer
+from py_mermaid.src.sequence import (
+    DEFAULT_STYLE,
+    HEADER_HEIGHT,
+    LIFELINE_TOP,
+    MARGIN,
+    Activation,
+    Fragment,
+    Message,
+    Participant,
+    SequenceLayout,
+    SequenceRenderer,
+)
+from py_mermaid.src.sequence import Note as SequenceNote
+from py_mermaid.src.styles import DEFAULT_EDGE_STYLE, StyleTable
+from py_mermaid.src.utils import compact_number
+
+# Bump whenever a field is added, removed or reordered.
+LAYOUT_SCHEMA_VERSION = 3
+
+# Every collection is a list of packed rows; "fields" names the columns.
+FLOWCHART_FIELDS = {
+    "columns": ["id", "label", "x", "width"],
+    "nodes": ["id", "x", "y", "width", "height", "class", "row", "column", "lines", "shape"],
+    # labelX/labelY are null for unlabelled edges.
+    "edges": ["source", "target", "label", "style", "labelX", "labelY"],
+    # Edges drawn as one bundle: spurs to start, trunk to end, arrows on to each target.
+    "bundles": ["startX", "startY", "endX", "endY", "edges"],
+    "notes": ["anchor", "position", "x", "y", "width", "height", "lines"],
+}
+SEQUENCE_FIELDS = {
+    "participants": ["name", "label", "x", "width"],
+    "messages": ["sender", "receiver", "row", "y", "flags", "text"],
+    "activations": ["participant", "x", "y", "width", "height"],
+    "fragments": ["kind", "label", "x", "y", "width", "height", "sections"],
+    "notes": ["row", "x", "y", "width", "height", "lines"],
+}
+MESSAGE_DASHED = 1
+MESSAGE_DOUBLE_HEAD = 2
+MESSAGE_ASYNC = 4
+MESSAGE_SELF = 8
+
+
+def flowchart_layout_payload(
+    node_map: Dict[str, Node],
+    edges: List[Edge],
+    column_meta: List[ColumnMeta],
+    styles: Dict[str, Dict[str, str]],
+    notes: List[Note],
+    direction: str,
+    renderer: Optional[Renderer] = None,
+    layout: Optional[FlowchartLayout] = None,
+) -> Dict[str, Any]:
+    renderer = renderer or Renderer()
+    if layout is None:
+        layout = renderer.layout(node_map, column_meta, notes, direction, edges)
+    boxes = layout.nodes
+    node_index: Dict[str, int] = {}
+    packed_nodes: List[List[Any]] = []
+    for node_id, node in node_map.items():
+        box = boxes[node_id]
+        node_index[node_id] = len(packed_nodes)
+        packed_nodes.append(
+            [
+                node_id,
+                compact_number(box.x),
+                compact_number(box.y),
+                compact_number(box.width),
+                compact_number(box.height),
+                node.class_name,
+                node.row_index,
+                node.column_index,
+                box.text_lines,
+                node.shape,
+            ]
+        )
+
+    edge_styles = StyleTable(DEFAULT_EDGE_STYLE)
+    edge_index: Dict[int, int] = {}
+    packed_edges: List[List[Any]] = []
+    for idx, edge in enumerate(edges):
+        source = node_index.get(edge.source)
+        target = node_index.get(edge.target)
+        if source is None or target is None:
+            continue
+        label_x = label_y = None
+        if edge.label:
+            label_x, label_y = (compact_number(value) for value in renderer.edge_label_anchor(idx, edge, layout))
+        edge_index[idx] = len(packed_edges)
+        packed_edges.append([source, target, edge.label, edge_styles.intern(edge.style), label_x, label_y])
+
+    packed_bundles = [
+        [
+            compact_number(bundle.start[0]),
+            compact_number(bundle.start[1]),
+            compact_number(bundle.end[0]),
+            compact_number(bundle.end[1]),
+            [edge_index[idx] for idx in bundle.edge_indexes],
+        ]
+        for bundle in layout.bundles
+    ]
+
+    packed_notes: List[List[Any]] = []
+    for note, note_box in zip(notes, layout.notes):
+        if note.anchor not in node_index:
+            continue
+        packed_notes.append(
+            [
+                node_index[note.anchor],
+                note.position,
+                compact_number(note_box.x),
+                compact_number(note_box.y),
+                compact_number(note_box.width),
+                compact_number(note_box.height),
+                note.text_lines,
+            ]
+        )
+
+    return {
+        "version": LAYOUT_SCHEMA_VERSION,
+        "type": "flowchart",
+        "canvas": [compact_number(layout.canvas_size[0]), compact_number(layout.canvas_size[1])],
+        "direction": direction,
+        "margin": compact_number(layout.margin),
+        "fields": FLOWCHART_FIELDS,
+        "columns": [
+            [column.identifier, column.label, compact_number(column.x), compact_number(column.width)]
+            for column in layout.columns
+        ],
+        "nodes": packed_nodes,
+        "edges": packed_edges,
+        "bundles": packed_bundles,
+        "notes": packed_notes,
+        "classes": styles,
+        "edgeStyles": edge_styles.styles(),
+    }
+
+
+def sequence_layout_payload(
+    participants: List[Participant],
+    messages: List[Message],
+    notes: List[SequenceNote],
+    activations: List[Activation],
+    fragments: List[Fragment],
+    style_overrides: Dict[str, str],
+    renderer: Optional[SequenceRenderer] = None,
+    layout: Optional[SequenceLayout] = None,
+) -> Dict[str, Any]:
+    renderer = renderer or SequenceRenderer()
+    if layout is None:
+        layout = renderer.layout(participants, messages, notes)
+    boxes = layout.participants
+    participant_index = {participant.name: idx for idx, participant in enumerate(participants)}
+
+    packed_messages: List[List[Any]] = []
+    for message in messages:
+        sender = participant_index.get(message.sender)
+        receiver = participant_index.get(message.receiver)
+        if sender is None or receiver is None:
+            continue
+        flags = (
+            (MESSAGE_DASHED if message.dashed else 0)
+            | (MESSAGE_DOUBLE_HEAD if message.double_head else 0)
+            | (MESSAGE_ASYNC if message.async_arrow else 0)
+            | (MESSAGE_SELF if sender == receiver else 0)
+        )
+        message_y = compact_number(renderer.message_y(message.row_index))
+        packed_messages.append([sender, receiver, message.row_index, message_y, flags, message.text])
+
+    packed_activations: List[List[Any]] = []
+    for activation in activations:
+        rect = renderer.activation_rect(activation, layout)
+        if rect:
+            packed_activations.append(
+                [participant_index[activation.participant]] + [compact_number(value) for value in rect]
+            )
+
+    packed_fragments: List[List[Any]] = []
+    for fragment in fragments:
+        left, top, width, height = renderer.fragment_rect(fragment, participants, layout)
+        sections = [
+            [section.label, compact_number(label_y)]
+            for section, label_y in zip(fragment.sections, renderer.section_label_ys(fragment, top))
+        ]
+        packed_fragments.append(
+            [fragment.kind, fragment.label]
+            + [compact_number(value) for value in (left, top, width, height)]
+            + [sections]
+        )
+
+    width, height = layout.canvas
+    return {
+        "version": LAYOUT_SCHEMA_VERSION,
+        "type": "sequence",
+        "canvas": [compact_number(width), compact_number(height)],
+        "header": {"y": compact_number(MARGIN / 2), "height": compact_number(HEADER_HEIGHT)},
+        "lifeline": [compact_number(LIFELINE_TOP), compact_number(height - MARGIN / 2)],
+        "fields": SEQUENCE_FIELDS,
+        "participants": [
+            [
+                participant.name,
+                participant.label,
+                compact_number(boxes[participant.name].x),
+                compact_number(boxes[participant.name].width),
+            ]
+            for participant in participants
+        ],
+        "messages": packed_messages,
+        "activations": packed_activations,
+        "fragments": packed_fragments,
+        "notes": [
+            [note.row_index]
+            + [compact_number(value) for value in (box.x, box.y, box.width, box.height)]
+            + [note.text_lines]
+            for note, box in zip(notes, layout.notes)
+        ],
+        "style": {**DEFAULT_STYLE, **style_overrides},
+    }
+
+
+def dumps_layout(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from py_mermaid.src.db import ColumnMeta, Edge, Node, Note
+
+OUT = "out"
+IN = "in"
+BOTH = "both"
+DEFAULT_EDGE_WIDTH = 2
+MAX_WEIGHTED_STROKE = 8
+
+FlowchartModel = Tuple[
+    Dict[str, Node], List[Edge], List[ColumnMeta], Dict[str, Dict[str, str]], List[Note], str
+]
+
+
+def compact_columns(node_map: Dict[str, Node], column_meta: List[ColumnMeta]) -> Tuple[Dict[str, Node], List[ColumnMeta]]:
+    """Drop columns no node uses and renumber the rest, copying only moved nodes."""
+    used = sorted({node.column_index for node in node_map.values()})
+    if len(used) == len(column_meta):
+        return node_map, column_meta
+    remap = {old: new for new, old in enumerate(used)}
+    compacted_meta = [column_meta[old] for old in used if old < len(column_meta)]
+    compacted: Dict[str, Node] = {}
+    for node_id, node in node_map.items():
+        column_index = remap[node.column_index]
+        compacted[node_id] = node if column_index == node.column_index else replace(node, column_index=column_index)
+    return compacted, compacted_meta
+
+
+def weighted_edge(
+    source: str,
+    target: str,
+    count: int,
+    label: Optional[str] = None,
+    style: Optional[Dict[str, str]] = None,
+) -> Edge:
+    """One edge standing for ``count`` parallel ones: labelled ×count and drawn thicker."""
+    style = dict(style or {})
+    if count == 1:
+        return Edge(source=source, target=target, label=label, style=style)
+    width = style.get("stroke-width", "")
+    base = int(width) if width.isdigit() else DEFAULT_EDGE_WIDTH
+    style["stroke-width"] = str(max(base, min(base + count // 2, MAX_WEIGHTED_STROKE)))
+    multiplicity = f"×{count}"
+    return Edge(source=source, target=target, label=f"{label} {multiplicity}" if label else multiplicity, style=style)
+
+
+def merge_duplicate_edges(edges: List[Edge]) -> List[Edge]:
+    """Collapse edges with the same endpoints, label and style, keeping first-seen order."""
+    buckets: Dict[Tuple[str, str, Optional[str], Tuple[Tuple[str, str], ...]], List[Edge]] = {}
+    for edge in edges:
+        key = (edge.source, edge.target, edge.label, tuple(sorted(edge.style.items())))
+        buckets.setdefault(key, []).append(edge)
+    if len(buckets) == len(edges):
+        return edges
+    return [
+        group[0] if len(group) == 1 else weighted_edge(source, target, len(group), label, group[0].style)
+        for (source, target, label, _), group in buckets.items()
+    ]
+
+
+class FlowGraph:
+    """Adjacency index over a parsed flowchart.
+
+    Edges are stored once in ``edges``; ``out_edges``/``in_edges`` hold
+    indexes into that list, so every per-node query costs O(degree).
+    """
+
+    def __init__(
+        self,
+        node_map: Dict[str, Node],
+        edges: List[Edge],
+        column_meta: List[ColumnMeta],
+        styles: Dict[str, Dict[str, str]],
+        notes: List[Note],
+        direction: str,
+    ):
+        self.node_map = node_map
+        self.edges = edges
+        self.column_meta = column_meta
+        self.styles = styles
+        self.notes = notes
+        self.direction = direction
+        self.out_edges: Dict[str, List[int]] = {node_id: [] for node_id in node_map}
+        self.in_edges: Dict[str, List[int]] = {node_id: [] for node_id in node_map}
+        self._positions = {node_id: idx for idx, node_id in enumerate(node_map)}
+        self._notes_by_anchor: Dict[str, List[int]] = {}
+
+        for idx, edge in enumerate(edges):
+            if edge.source in self.out_edges and edge.target in self.in_edges:
+                self.out_edges[edge.source].append(idx)
+                self.in_edges[edge.target].append(idx)
+        for idx, note in enumerate(notes):
+            self._notes_by_anchor.setdefault(note.anchor, []).append(idx)
+
+    def model(self) -> FlowchartModel:
+        return self.node_map, self.edges, self.column_meta, self.styles, self.notes, self.direction
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self.node_map
+
+    def __len__(self) -> int:
+        return len(self.node_map)
+
+    def successors(self, node_id: str) -> List[str]:
+        return self.neighbors(node_id, OUT)
+
+    def predecessors(self, node_id: str) -> List[str]:
+        return self.neighbors(node_id, IN)
+
+    def neighbors(self, node_id: str, direction: str = BOTH) -> List[str]:
+        """Adjacent node ids in edge order, each listed once."""
+        found: Dict[str, None] = {}
+        if direction in (OUT, BOTH):
+            for idx in self.out_edges[node_id]:
+                found.setdefault(self.edges[idx].target, None)
+        if direction in (IN, BOTH):
+            for idx in self.in_edges[node_id]:
+                found.setdefault(self.edges[idx].source, None)
+        return list(found)
+
+    def degree(self, node_id: str, direction: str = BOTH) -> int:
+        total = 0
+        if direction in (OUT, BOTH):
+            total += len(self.out_edges[node_id])
+        if direction in (IN, BOTH):
+            total += len(self.in_edges[node_id])
+        return total
+
+    def reachable(self, start: str, direction: str = OUT, max_depth: Optional[int] = None) -> List[str]:
+        """Breadth-first walk from ``start``; returns ids in visit order, ``start`` first."""
+        seen: Dict[str, None] = {start: None}
+        queue = deque([(start, 0)])
+        while queue:
+            node_id, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for neighbor in self.neighbors(node_id, direction):
+                if neighbor not in seen:
+                    seen[neighbor] = None
+                    queue.append((neighbor, depth + 1))
+        return list(seen)
+
+    def neighborhood(self, node_id: str, depth: int = 1) -> List[str]:
+        return self.reachable(node_id, BOTH, max_depth=depth)
+
+    def induced_edges(self, node_ids: Iterable[str]) -> List[int]:
+        """Indexes of edges with both endpoints in ``node_ids``, in source order."""
+        members: Set[str] = set(node_ids)
+        indexes = [
+            idx
+            for node_id in members
+            for idx in self.out_edges.get(node_id, ())
+            if self.edges[idx].target in members
+        ]
+        indexes.sort()
+        return indexes
+
+    def induced(self, node_ids: Iterable[str]) -> FlowchartModel:
+        """Renderable model restricted to ``node_ids`` and the edges and notes between them."""
+        members = sorted({node_id for node_id in node_ids if node_id in self.node_map}, key=self._positions.__getitem__)
+        node_map = {node_id: self.node_map[node_id] for node_id in members}
+        edges = [self.edges[idx] for idx in self.induced_edges(members)]
+        note_indexes = sorted(idx for node_id in members for idx in self._notes_by_anchor.get(node_id, ()))
+        notes = [self.notes[idx] for idx in note_indexes]
+        node_map, column_meta = compact_columns(node_map, self.column_meta)
+        return node_map, edges, column_meta, self.styles, notes, self.direction
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from py_mermaid.src.db import ColumnMeta, Edge, FlowchartLayout, Node, Note
+from py_mermaid.src.graph import FlowchartModel, compact_columns, weighted_edge
+from py_mermaid.src.renderer import Renderer
+
+SUMMARY_CLASS = "subgraph-summary"
+SUMMARY_ID_PREFIX = "subgraph:"
+SUMMARY_STYLE = {"fill": "#eef2f7", "stroke": "#4a5a70", "color": "#1c2736"}
+
+# An edge endpoint is either a loose node ("node", id) or a whole subgraph ("subgraph", name).
+Unit = Tuple[str, str]
+
+
+@dataclass
+class SubgraphInfo:
+    name: str
+    node_ids: List[str]
+    column_index: int
+    row_index: int
+    internal_edges: int = 0
+
+
+class LevelOfDetail:
+    """Renders a flowchart with chosen subgraphs folded into summary nodes.
+
+    The model is indexed once on construction; every later view costs
+    O(subgraphs + visible nodes + edge buckets) rather than O(nodes + edges).
+    """
+
+    def __init__(
+        self,
+        node_map: Dict[str, Node],
+        edges: List[Edge],
+        column_meta: List[ColumnMeta],
+        styles: Dict[str, Dict[str, str]],
+        notes: List[Note],
+        direction: str,
+        renderer: Optional[Renderer] = None,
+    ):
+        self.node_map = node_map
+        self.edges = edges
+        self.column_meta = column_meta
+        self.styles = {**styles, SUMMARY_CLASS: styles.get(SUMMARY_CLASS, SUMMARY_STYLE)}
+        self.notes = notes
+        self.direction = direction
+        self.renderer = renderer or Renderer()
+        self.subgraphs: Dict[str, SubgraphInfo] = {}
+        self._loose_nodes: List[str] = []
+        self._buckets: Dict[Tuple[Unit, Unit], List[int]] = {}
+        self._layouts: Dict[Tuple[str, FrozenSet[str]], FlowchartLayout] = {}
+
+        for node_id, node in node_map.items():
+            if node.subgraph is None:
+                self._loose_nodes.append(node_id)
+                continue
+            info = self.subgraphs.get(node.subgraph)
+            if info is None:
+                info = SubgraphInfo(node.subgraph, [], node.column_index, node.row_index)
+                self.subgraphs[node.subgraph] = info
+            info.node_ids.append(node_id)
+
+        for idx, edge in enumerate(edges):
+            source_unit = self._unit(edge.source)
+            target_unit = self._unit(edge.target)
+            if source_unit is None or target_unit is None:
+                continue
+            if source_unit == target_unit and source_unit[0] == "subgraph":
+                self.subgraphs[source_unit[1]].internal_edges += 1
+            self._buckets.setdefault((source_unit, target_unit), []).append(idx)
+
+    def summary_id(self, subgraph: str) -> str:
+        return SUMMARY_ID_PREFIX + subgraph
+
+    def resolve_collapsed(
+        self,
+        collapse: Optional[Iterable[str]] = None,
+        threshold: Optional[int] = None,
+        expand: Iterable[str] = (),
+    ) -> FrozenSet[str]:
+        if collapse is not None:
+            chosen: Set[str] = {name for name in collapse if name in self.subgraphs}
+        elif threshold is not None:
+            chosen = {name for name, info in self.subgraphs.items() if len(info.node_ids) > threshold}
+        else:
+            chosen = set(self.subgraphs)
+        return frozenset(chosen.difference(expand))
+
+    def model(
+        self,
+        collapse: Optional[Iterable[str]] = None,
+        threshold: Optional[int] = None,
+        expand: Iterable[str] = (),
+    ) -> FlowchartModel:
+        collapsed = self.resolve_collapsed(collapse, threshold, expand)
+        node_map: Dict[str, Node] = {node_id: self.node_map[node_id] for node_id in self._loose_nodes}
+        for name, info in self.subgraphs.items():
+            if name in collapsed:
+                summary = self._summary_node(info)
+                node_map[summary.node_id] = summary
+            else:
+                for node_id in info.node_ids:
+                    node_map[node_id] = self.node_map[node_id]
+
+        edges: List[Edge] = []
+        counts: Counter = Counter()
+        for (source_unit, target_unit), indexes in self._buckets.items():
+            source_summary = source_unit[0] == "subgraph" and source_unit[1] in collapsed
+            target_summary = target_unit[0] == "subgraph" and target_unit[1] in collapsed
+            if not source_summary and not target_summary:
+                edges.extend(self.edges[idx] for idx in indexes)
+                continue
+            if source_unit == target_unit:
+                continue
+            source = self._endpoint(source_unit, source_summary)
+            target = self._endpoint(target_unit, target_summary)
+            if source is not None and target is not None:
+                counts[(source, target)] += len(indexes)
+                continue
+            for idx in indexes:
+                edge = self.edges[idx]
+                counts[(source or edge.source, target or edge.target)] += 1
+
+        for (source, target), count in counts.items():
+            edges.append(self._summary_edge(source, target, count))
+
+        notes = [note for note in self.notes if note.anchor in node_map]
+        node_map, column_meta = self._compact_columns(node_map)
+        return node_map, edges, column_meta, self.styles, notes, self.direction
+
+    def render(
+        self,
+        collapse: Optional[Iterable[str]] = None,
+        threshold: Optional[int] = None,
+        expand: Iterable[str] = (),
+    ) -> str:
+        collapsed = self.resolve_collapsed(collapse, threshold, expand)
+        model = self.model(collapse=collapsed)
+        layout = self._cached_layout(("overview", collapsed), model)
+        return self.renderer.render(*model, layout=layout)
+
+    def subgraph_model(self, subgraph: str) -> FlowchartModel:
+        node_map = {node_id: self.node_map[node_id] for node_id in self.subgraphs[subgraph].node_ids}
+        unit = ("subgraph", subgraph)
+        edges = [self.edges[idx] for idx in self._buckets.get((unit, unit), [])]
+        notes = [note for note in self.notes if note.anchor in node_map]
+        node_map, column_meta = self._compact_columns(node_map)
+        return node_map, edges, column_meta, self.styles, notes, self.direction
+
+    def render_subgraph(self, subgraph: str) -> str:
+        model = self.subgraph_model(subgraph)
+        layout = self._cached_layout(("subgraph", frozenset((subgraph,))), model)
+        return self.renderer.render(*model, layout=layout)
+
+    def _cached_layout(self, key: Tuple[str, FrozenSet[str]], model: FlowchartModel) -> FlowchartLayout:
+        layout = self._layouts.get(key)
+        if layout is None:
+            node_map, edges, column_meta, _, notes, direction = model
+            layout = self.renderer.layout(node_map, column_meta, notes, direction, edges)
+            self._layouts[key] = layout
+        return layout
+
+    def _compact_columns(self, node_map: Dict[str, Node]) -> Tuple[Dict[str, Node], List[ColumnMeta]]:
+        return compact_columns(node_map, self.column_meta)
+
+    def _unit(self, node_id: str) -> Optional[Unit]:
+        node = self.node_map.get(node_id)
+        if node is None:
+            return None
+        if node.subgraph is None:
+            return ("node", node_id)
+        return ("subgraph", node.subgraph)
+
+    def _endpoint(self, unit: Unit, summarized: bool) -> Optional[str]:
+        if summarized:
+            return self.summary_id(unit[1])
+        if unit[0] == "node":
+            return unit[1]
+        return None
+
+    def _summary_node(self, info: SubgraphInfo) -> Node:
+        label = f"{info.name}<br/>{len(info.node_ids)} nodes"
+        if info.internal_edges:
+            label += f", {info.internal_edges} edges"
+        return Node(
+            node_id=self.summary_id(info.name),
+            label=label,
+            class_name=SUMMARY_CLASS,
+            subgraph=None,
+            column_index=info.column_index,
+            row_index=info.row_index,
+        )
+
+    def _summary_edge(self, source: str, target: str, count: int) -> Edge:
+        return weighted_edge(source, target, count)
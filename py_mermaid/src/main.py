@@ -1,6 +1,4 @@
-from py_mermaid.src.parser import Parser as FlowchartParser
-from py_mermaid.src.renderer import Renderer as FlowchartRenderer
-from py_mermaid.src.sequence import SequenceParser, SequenceRenderer
+from py_mermaid.src.pipeline import render_diagram
 
 def main():
     """
@@ -14,30 +12,7 @@ def main():
         Bob-->>Alice: I am good thanks!
     """
 
-    if "sequenceDiagram" in diagram_text:
-        parser = SequenceParser()
-        (
-            participants,
-            messages,
-            notes,
-            activations,
-            fragments,
-            style_overrides,
-        ) = parser.parse(diagram_text)
-        renderer = SequenceRenderer()
-        svg_output = renderer.render(
-            participants,
-            messages,
-            notes,
-            activations,
-            fragments,
-            style_overrides,
-        )
-    else:
-        parser = FlowchartParser()
-        node_map, edges, column_meta, styles, notes, direction = parser.parse(diagram_text)
-        renderer = FlowchartRenderer()
-        svg_output = renderer.render(node_map, edges, column_meta, styles, notes, direction)
+    svg_output = render_diagram(diagram_text)
 
     with open("output.svg", "w") as f:
         f.write(svg_output)
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from py_mermaid.src.db import ColumnMeta, Edge, Node, Note
-from py_mermaid.src.utils import label_to_lines
+from py_mermaid.src.diagnostics import WARNING, Diagnostic, DiagnosticSink
+from py_mermaid.src.graph import FlowGraph, merge_duplicate_edges
+from py_mermaid.src.utils import PathLike, iter_file_lines, label_to_lines
 
 DEFAULT_STYLES = {
     "header": {"fill": "#ffffff", "stroke": "#9aa2b1", "color": "#1f2530"},
@@ -15,152 +18,332 @@ DEFAULT_STYLES = {
 
 ROW_PRIORITY = ["header", "org", "capability", "infra"]
 DASHED_EDGE_STYLE = {"stroke-dasharray": "6 4", "marker-end": "none"}
+DOTTED_EDGE_STYLE = {"stroke-dasharray": "2 4"}
+THICK_EDGE_STYLE = {"stroke-width": "4"}
 FLOW_DIRECTIONS = {"TB", "BT", "LR", "RL"}
-EDGE_SPLIT = re.compile(r"(-->|---)")
+DIRECTION_ALIASES = {"TD": "TB"}
+
+# Connector token -> edge style it starts from (copied per edge).
+CONNECTOR_STYLES = {"-->": {}, "---": DASHED_EDGE_STYLE, "-.->": DOTTED_EDGE_STYLE, "==>": THICK_EDGE_STYLE}
+# (shape, opening delimiter, closing delimiter). Alternatives are tried in
+# order, so multi-character openers come before their one-character prefixes.
+NODE_SHAPES = [
+    ("doublecircle", "(((", ")))"),
+    ("circle", "((", "))"),
+    ("stadium", "([", "])"),
+    ("subroutine", "[[", "]]"),
+    ("cylinder", "[(", ")]"),
+    ("parallelogram", "[/", "/]"),
+    ("trapezoid", "[/", "\\]"),
+    ("parallelogram_alt", "[\\", "\\]"),
+    ("trapezoid_alt", "[\\", "/]"),
+    ("hexagon", "{{", "}}"),
+    ("rect", "[", "]"),
+    ("round", "(", ")"),
+    ("diamond", "{", "}"),
+    ("asymmetric", ">", "]"),
+]
+# Keyword statements; anything else is a node or an edge chain.
+STATEMENT_PATTERN = re.compile(
+    r"(?P<header>flowchart|graph)\b"
+    r"|(?P<classDef>classDef)\b"
+    r"|(?P<subgraph>subgraph)\b"
+    r"|(?P<end>end)$"
+    r"|(?P<class>class)\s"
+    r"|(?P<linkStyle>linkStyle)\b"
+    r"|(?P<note>note)\s"
+)
+SHAPE_BY_DELIMITERS = {(opening, closing): shape for shape, opening, closing in NODE_SHAPES}
+# Exact per-shape alternatives, used when the fast pattern pairs the wrong delimiters.
+NODE_SHAPE_PATTERN = re.compile(
+    "|".join(f"{re.escape(opening)}(?P<{shape}>.*?){re.escape(closing)}" for shape, opening, closing in NODE_SHAPES)
+)
+# Fast path: the label stops at the first closing bracket, so labels with
+# "/", "\\" or nested brackets fall back to NODE_SHAPE_PATTERN.
+NODE_REF_PATTERN = re.compile(
+    r"\s*(?P<id>[^\s\[\](){}<>|:;,\"&=-]+(?:-(?![-.>])[^\s\[\](){}<>|:;,\"&=-]*)*)"
+    r"(?:(?P<open>"
+    + "|".join(re.escape(opening) for opening in dict.fromkeys(opening for _, opening, _ in NODE_SHAPES))
+    + r")(?P<label>[^)\]}]*)(?P<close>"
+    + "|".join(re.escape(closing) for closing in dict.fromkeys(closing for _, _, closing in NODE_SHAPES) if closing[0] in ")]}")
+    + r"))?(?::::(?P<class>[\w-]+))?"
+)
+NODE_CLASS_PATTERN = re.compile(r":::([\w-]+)")
+CONNECTOR_PATTERN = re.compile(
+    r"\s*(?:--\s+(?P<text>[^|]+?)\s+)?(?P<connector>-\.->|-->|---|==>)\s*(?:\|(?P<link_label>[^|]*)\|)?"
+)
+# One step of an edge chain: a node reference and the connector after it, if any.
+CHAIN_STEP_PATTERN = re.compile(f"{NODE_REF_PATTERN.pattern}(?:{CONNECTOR_PATTERN.pattern})?")
+# First two characters of every keyword; other lines skip STATEMENT_PATTERN.
+STATEMENT_PREFIXES = frozenset(("fl", "gr", "cl", "su", "en", "li", "no"))
 NOTE_PATTERN = re.compile(r"note\s+(left|right|top|bottom)\s+of\s+([A-Za-z0-9_]+)\s*:\s*(.+)", re.IGNORECASE)
 
 
-class Parser:
-    def parse(self, text: str):
-        direction = "TB"
-        lines = self._normalize_lines(text)
-        class_styles: Dict[str, Dict[str, str]] = {**DEFAULT_STYLES}
-        node_map: Dict[str, Node] = {}
-        edges: List[Edge] = []
-        current_subgraph: Optional[str] = None
-        pending_classes: Dict[str, str] = {}
-        node_sequence: List[str] = []
-        link_styles: List[Tuple[List[int], Dict[str, str]]] = []
-        notes: List[Note] = []
-
-        for raw_line in lines:
-            line = raw_line.strip()
-            if not line:
-                continue
-            if line.startswith("flowchart"):
-                parts = line.split()
-                if len(parts) > 1 and parts[1] in FLOW_DIRECTIONS:
-                    direction = parts[1]
-                continue
+@dataclass
+class _ParseState:
+    direction: str = "TB"
+    class_styles: Dict[str, Dict[str, str]] = field(default_factory=lambda: {**DEFAULT_STYLES})
+    node_map: Dict[str, Node] = field(default_factory=dict)
+    edges: List[Edge] = field(default_factory=list)
+    current_subgraph: Optional[str] = None
+    pending_classes: Dict[str, str] = field(default_factory=dict)
+    link_styles: List[Tuple[List[int], Dict[str, str]]] = field(default_factory=list)
+    notes: List[Note] = field(default_factory=list)
+    # Nodes referenced without a shape, with the subgraph they first appeared in.
+    referenced: Dict[str, Optional[str]] = field(default_factory=dict)
+    # Only set by Parser.validate(); handlers report what parse() would drop.
+    sink: Optional[DiagnosticSink] = None
+    link_style_lines: List[int] = field(default_factory=list)
 
-            if line.startswith("classDef"):
-                _, rest = line.split("classDef", 1)
-                parts = rest.strip().split(None, 1)
-                if len(parts) == 2:
-                    class_name, attributes = parts
-                    attributes = attributes.rstrip(";")
-                    class_styles[class_name] = self._parse_style_attributes(attributes)
-                continue
 
-            if line.startswith("subgraph"):
-                remainder = line.split(None, 1)[1]
-                if "[" in remainder and remainder.endswith("]"):
-                    graph_id, _ = remainder.split("[", 1)
-                    current_subgraph = graph_id.strip()
-                else:
-                    current_subgraph = remainder.strip()
-                continue
+class Parser:
+    def __init__(self, merge_duplicates: bool = False):
+        self.merge_duplicates = merge_duplicates
 
-            if line == "end":
-                current_subgraph = None
-                continue
+    def parse(self, text: Union[str, Iterable[str]]):
+        return self.parse_iter(text)
 
-            if line.startswith("class "):
-                body = line[len("class ") :].strip().rstrip(";")
-                if " " in body:
-                    node_tokens, class_name = body.split(None, 1)
-                    class_name = class_name.strip()
-                    for node_id in (token.strip() for token in node_tokens.split(",")):
-                        if node_id:
-                            pending_classes[node_id] = class_name
-                continue
+    def parse_file(self, path: PathLike, use_mmap: bool = False, encoding: str = "utf-8"):
+        return self.parse_iter(iter_file_lines(path, use_mmap=use_mmap, encoding=encoding))
 
-            if line.startswith("linkStyle"):
-                link_styles.append(self._parse_link_style(line))
-                continue
+    def parse_graph(self, text: Union[str, Iterable[str]]) -> FlowGraph:
+        return FlowGraph(*self.parse_iter(text))
 
-            if line.startswith("note "):
-                note = self._parse_note_line(line)
-                if note:
-                    notes.append(note)
-                continue
+    def parse_iter(self, lines: Union[str, Iterable[str]]):
+        state = _ParseState()
+        for _, line in self._numbered_lines(lines):
+            match = STATEMENT_PATTERN.match(line) if line[:2] in STATEMENT_PREFIXES else None
+            if match is not None:
+                self._STATEMENT_HANDLERS[match.lastgroup](self, state, line)
+            else:
+                self._parse_chain_statement(state, line)
 
-            if "-->" in line or "---" in line:
-                edges.extend(self._parse_edge_chain(line))
-                continue
+        node_map = state.node_map
+        edges = state.edges
+        for node_id, subgraph in state.referenced.items():
+            if node_id not in node_map:
+                node_map[node_id] = Node(node_id=node_id, label=node_id, class_name=None, subgraph=subgraph)
 
-            if "[" in line and "]" in line:
-                node_id, label, class_name = self._parse_node_line(line)
-                node = Node(
-                    node_id=node_id,
-                    label=label,
-                    class_name=class_name,
-                    subgraph=current_subgraph,
-                )
-                node_map[node_id] = node
-                node_sequence.append(node_id)
-
-        for node_id, class_name in pending_classes.items():
+        for node_id, class_name in state.pending_classes.items():
             if node_id in node_map:
                 node_map[node_id].class_name = class_name
 
-        for indexes, style in link_styles:
+        for indexes, style in state.link_styles:
             for idx in indexes:
                 if 0 <= idx < len(edges):
                     edges[idx].style.update(style)
+        if self.merge_duplicates:
+            edges = merge_duplicate_edges(edges)
 
-        row_map: Dict[str, int] = {}
-        next_row = 0
-        for class_name in ROW_PRIORITY:
-            if any(node.class_name == class_name for node in node_map.values()):
-                row_map[class_name] = next_row
-                next_row += 1
-        for node in node_map.values():
-            if node.class_name and node.class_name not in row_map:
-                row_map[node.class_name] = next_row
-                next_row += 1
-        for node in node_map.values():
-            node.row_index = row_map.get(node.class_name or "", next_row)
+        column_meta = self._assign_rows_and_columns(node_map)
 
-        column_meta = self._derive_column_meta(node_sequence, node_map)
-        column_lookup = {meta.key: idx for idx, meta in enumerate(column_meta)}
-        for node in node_map.values():
-            key = node.node_id.split("_", 1)[0]
-            node.column_index = column_lookup.get(key, 0)
+        return node_map, edges, column_meta, state.class_styles, state.notes, state.direction
 
-        return node_map, edges, column_meta, class_styles, notes, direction
+    def validate(self, lines: Union[str, Iterable[str]]) -> List[Diagnostic]:
+        """Report problems parse() would silently skip; nothing is laid out.
 
-    def _normalize_lines(self, raw_text: str) -> List[str]:
-        raw_lines = raw_text.splitlines()
-        cleaned: List[str] = []
-        buffer = ""
+        Covers unparsed lines, unmatched ``end``, malformed statements and
+        ``linkStyle`` indexes past the last edge.
+        """
+        sink = DiagnosticSink()
+        state = _ParseState(sink=sink)
+        for sink.line, line in self._numbered_lines(lines):
+            match = STATEMENT_PATTERN.match(line) if line[:2] in STATEMENT_PREFIXES else None
+            try:
+                if match is not None:
+                    self._STATEMENT_HANDLERS[match.lastgroup](self, state, line)
+                elif not self._parse_chain_statement(state, line):
+                    sink.report("unparsed-line", f"Not a recognised statement: {line!r}")
+            except (ValueError, IndexError, KeyError) as error:
+                sink.report("invalid-statement", f"Cannot parse {line!r} ({type(error).__name__}: {error})")
+
+        if state.current_subgraph is not None:
+            sink.report("unclosed-subgraph", f"Subgraph {state.current_subgraph!r} is never closed", WARNING)
+        edge_count = len(state.edges)
+        for (indexes, _), line_number in zip(state.link_styles, state.link_style_lines):
+            for idx in indexes:
+                if not 0 <= idx < edge_count:
+                    sink.report(
+                        "link-style-index",
+                        f"linkStyle index {idx} is out of range; the diagram has {edge_count} edges",
+                        line=line_number,
+                    )
+        for node_id in state.pending_classes:
+            if node_id not in state.node_map and node_id not in state.referenced:
+                sink.report("unknown-node", f"class assigned to undefined node {node_id!r}", WARNING)
+        return sink.diagnostics
+
+    def _numbered_lines(self, source: Union[str, Iterable[str]]) -> Iterator[Tuple[int, str]]:
+        """Statements with comments dropped and bracketed labels joined across lines.
+
+        Each comes with its first 1-based source line.
+        """
+        lines = source.splitlines() if isinstance(source, str) else source
+        fragments: List[str] = []
         open_brackets = 0
+        start = 0
 
-        for line in raw_lines:
+        for number, line in enumerate(lines, 1):
             stripped = line.strip()
-            if not stripped or stripped.startswith("%%"):
+            if not stripped or stripped.startswith(("%%", "```")):
                 continue
-            if stripped.startswith("```"):
-                continue
-
-            if buffer:
-                buffer += " " + stripped
-            else:
-                buffer = stripped
-
-            open_brackets += stripped.count("[")
-            open_brackets -= stripped.count("]")
 
+            if not fragments:
+                start = number
+            open_brackets += stripped.count("[") - stripped.count("]")
             if open_brackets > 0:
+                fragments.append(stripped)
                 continue
 
-            cleaned.append(buffer)
-            buffer = ""
-
-        if buffer:
-            cleaned.append(buffer)
+            if fragments:
+                fragments.append(stripped)
+                yield start, " ".join(fragments)
+                fragments.clear()
+            else:
+                yield number, stripped
+
+        if fragments:
+            yield start, " ".join(fragments)
+
+    def _parse_header(self, state: _ParseState, line: str) -> None:
+        parts = line.split()
+        if len(parts) > 1:
+            direction = DIRECTION_ALIASES.get(parts[1], parts[1])
+            if direction in FLOW_DIRECTIONS:
+                state.direction = direction
+            elif state.sink is not None:
+                state.sink.report("unknown-direction", f"Unknown direction {parts[1]!r}; keeping {state.direction}", WARNING)
+
+    def _parse_class_def(self, state: _ParseState, line: str) -> None:
+        _, rest = line.split("classDef", 1)
+        parts = rest.strip().split(None, 1)
+        if len(parts) == 2:
+            class_name, attributes = parts
+            attributes = attributes.rstrip(";")
+            state.class_styles[class_name] = self._parse_style_attributes(attributes)
+        elif state.sink is not None:
+            state.sink.report("invalid-classdef", "classDef needs a class name and attributes")
+
+    def _parse_subgraph(self, state: _ParseState, line: str) -> None:
+        remainder = line.split(None, 1)[1]
+        if "[" in remainder and remainder.endswith("]"):
+            graph_id, _ = remainder.split("[", 1)
+            state.current_subgraph = graph_id.strip()
+        else:
+            state.current_subgraph = remainder.strip()
+
+    def _parse_end(self, state: _ParseState, line: str) -> None:
+        if state.current_subgraph is None and state.sink is not None:
+            state.sink.report("unmatched-end", "end without an open subgraph")
+        state.current_subgraph = None
+
+    def _parse_class(self, state: _ParseState, line: str) -> None:
+        body = line[len("class ") :].strip().rstrip(";")
+        if " " in body:
+            node_tokens, class_name = body.split(None, 1)
+            class_name = class_name.strip()
+            for node_id in (token.strip() for token in node_tokens.split(",")):
+                if node_id:
+                    state.pending_classes[node_id] = class_name
+        elif state.sink is not None:
+            state.sink.report("invalid-class", "class needs node ids and a class name")
+
+    def _parse_link_style_statement(self, state: _ParseState, line: str) -> None:
+        state.link_styles.append(self._parse_link_style(line))
+        if state.sink is not None:
+            state.link_style_lines.append(state.sink.line)
+            self._check_link_style(state.sink, line)
+
+    def _parse_note_statement(self, state: _ParseState, line: str) -> None:
+        note = self._parse_note_line(line)
+        if note:
+            state.notes.append(note)
+        elif state.sink is not None:
+            state.sink.report("invalid-note", "Expected 'note left|right|top|bottom of <node>: <text>'")
+
+    _STATEMENT_HANDLERS = {
+        "header": _parse_header,
+        "classDef": _parse_class_def,
+        "subgraph": _parse_subgraph,
+        "end": _parse_end,
+        "class": _parse_class,
+        "linkStyle": _parse_link_style_statement,
+        "note": _parse_note_statement,
+    }
+
+    def _parse_chain_statement(self, state: _ParseState, line: str) -> bool:
+        """Parse ``node (connector node)*``; nodes may carry a shape and ``:::class``.
+
+        Returns False (leaving ``state`` untouched) when the line does not fit.
+        """
+        parsed = self._parse_chain(line)
+        if parsed is None:
+            return False
+        subgraph = state.current_subgraph
+        source = None
+        for node_id, shape, label, class_name, connector, link_label in parsed:
+            if shape is not None:
+                state.node_map[node_id] = Node(
+                    node_id=node_id,
+                    label=label,
+                    class_name=class_name,
+                    subgraph=subgraph,
+                    shape=shape,
+                )
+            else:
+                state.referenced.setdefault(node_id, subgraph)
+                if class_name:
+                    state.pending_classes[node_id] = class_name
+            if source is not None:
+                state.edges.append(Edge(source=source[0], target=node_id, label=source[2], style=dict(CONNECTOR_STYLES[source[1]])))
+            source = (node_id, connector, link_label) if connector else None
+        return True
+
+    def _parse_chain(self, line: str) -> Optional[List[Tuple[str, Optional[str], str, Optional[str], Optional[str], Optional[str]]]]:
+        """Split a chain into (id, shape, label, class, outgoing connector, link label) steps."""
+        steps: List[Tuple[str, Optional[str], str, Optional[str], Optional[str], Optional[str]]] = []
+        end = len(line)
+        pos = 0
+        connector = "-->"
+        while connector:
+            step = CHAIN_STEP_PATTERN.match(line, pos)
+            if step is None:
+                return None
+            node_id, opening, label, closing, class_name, link_text, connector, link_label = step.groups()
+            pos = step.end()
+            shape = None
+            if opening is None:
+                label = node_id
+            else:
+                shape = SHAPE_BY_DELIMITERS.get((opening, closing))
+                if shape is None:
+                    exact = NODE_SHAPE_PATTERN.match(line, step.start("open"))
+                    if exact is None:
+                        return None
+                    shape = exact.lastgroup
+                    label = exact.group(shape)
+                    pos = exact.end()
+                    class_match = NODE_CLASS_PATTERN.match(line, pos)
+                    class_name = class_match.group(1) if class_match else None
+                    pos = class_match.end() if class_match else pos
+                    connector_match = CONNECTOR_PATTERN.match(line, pos)
+                    if connector_match is not None:
+                        link_text, connector, link_label = connector_match.groups()
+                        pos = connector_match.end()
+                    else:
+                        connector = None
+                label = label.strip()
+            if link_label is None:
+                link_label = link_text
+            if link_label is not None:
+                link_label = link_label.strip()
+            steps.append((node_id, shape, label, class_name, connector, link_label))
+        if pos != end and line[pos:].strip(" \t;"):
+            return None
+        return steps
 
-        return cleaned
+    def _normalize_lines(self, source: Union[str, Iterable[str]]) -> Iterator[str]:
+        return (line for _, line in self._numbered_lines(source))
 
     def _parse_style_attributes(self, attr_text: str) -> Dict[str, str]:
         styles = {}
@@ -172,74 +355,49 @@ class Parser:
             styles[key] = value
         return styles
 
-    def _parse_node_line(self, line: str) -> Tuple[str, str, Optional[str]]:
-        if "[" not in line or "]" not in line:
-            raise ValueError(f"Invalid node line: {line}")
-        prefix, remainder = line.split("[", 1)
-        node_id = prefix.strip()
-        label_part, suffix = remainder.split("]", 1)
-        class_name = None
-        if ":::" in suffix:
-            class_name = suffix.split(":::")[-1].strip()
-        return node_id, label_part.strip(), class_name or None
-
-    def _split_edge_segment(self, segment: str) -> Tuple[Optional[str], str]:
-        segment = segment.strip()
-        label = None
-        if segment.startswith("|"):
-            closing = segment.find("|", 1)
-            if closing != -1:
-                label = segment[1:closing].strip()
-                segment = segment[closing + 1 :].strip()
-        return label, segment.strip()
-
-    def _parse_edge_chain(self, line: str) -> List[Edge]:
-        parts = EDGE_SPLIT.split(line)
-        if not parts:
-            return []
-        current_label, current_node = self._split_edge_segment(parts[0])
-        current_node = current_node or current_label or ""
-        edges: List[Edge] = []
-
-        for idx in range(1, len(parts), 2):
-            connector = parts[idx]
-            target_segment = parts[idx + 1] if idx + 1 < len(parts) else ""
-            label, target = self._split_edge_segment(target_segment)
-            if not current_node or not target:
-                current_node = target or current_node
-                continue
-            style = {}
-            if connector == "---":
-                style.update(DASHED_EDGE_STYLE)
-            edges.append(Edge(source=current_node, target=target, label=label, style=style))
-            current_node = target
-        return edges
-
-    def _derive_column_meta(self, node_sequence: List[str], node_map: Dict[str, Node]) -> List[ColumnMeta]:
-        metas: List[ColumnMeta] = []
-        seen: set[str] = set()
-
-        def label_string(node: Node) -> str:
-            lines = label_to_lines(node.label)
-            return " / ".join(line.strip() for line in lines if line.strip()) or node.node_id
+    def _assign_rows_and_columns(self, node_map: Dict[str, Node]) -> List[ColumnMeta]:
+        """Fill in row_index/column_index for every node and return the column order.
 
-        for node_id in node_sequence:
-            node = node_map[node_id]
+        Rows follow ROW_PRIORITY, then other classes by first use, then unclassed
+        nodes. Columns are keyed by each node's column_key: keys introduced by a
+        header node come first, then the remaining keys by first use.
+        """
+        class_order: Dict[str, None] = {}
+        header_columns: Dict[str, Node] = {}
+        other_columns: Dict[str, Node] = {}
+        for node in node_map.values():
+            if node.class_name:
+                class_order.setdefault(node.class_name, None)
             if node.class_name == "header":
-                key = node_id.split("_", 1)[0]
-                if key not in seen:
-                    metas.append(ColumnMeta(key=key, label=label_string(node)))
-                    seen.add(key)
-
-        for node_id in node_sequence:
-            key = node_id.split("_", 1)[0]
-            if key not in seen:
-                node = node_map[node_id]
-                metas.append(ColumnMeta(key=key, label=label_string(node)))
-                seen.add(key)
+                header_columns.setdefault(node.column_key, node)
+            else:
+                other_columns.setdefault(node.column_key, node)
+
+        row_map: Dict[str, int] = {}
+        for class_name in ROW_PRIORITY:
+            if class_name in class_order:
+                row_map[class_name] = len(row_map)
+        for class_name in class_order:
+            row_map.setdefault(class_name, len(row_map))
+        unclassed_row = len(row_map)
+
+        column_lookup: Dict[str, int] = {}
+        metas: List[ColumnMeta] = []
+        for columns in (header_columns, other_columns):
+            for key, node in columns.items():
+                if key not in column_lookup:
+                    column_lookup[key] = len(metas)
+                    metas.append(ColumnMeta(key=key, label=self._column_label(node)))
 
+        for node in node_map.values():
+            node.row_index = row_map.get(node.class_name or "", unclassed_row)
+            node.column_index = column_lookup[node.column_key]
         return metas
 
+    def _column_label(self, node: Node) -> str:
+        lines = label_to_lines(node.label)
+        return " / ".join(line.strip() for line in lines if line.strip()) or node.node_id
+
     def _parse_note_line(self, line: str) -> Optional[Note]:
         match = NOTE_PATTERN.match(line)
         if not match:
@@ -249,6 +407,21 @@ class Parser:
         text = match.group(3).strip()
         return Note(anchor=anchor, position=position, text_lines=label_to_lines(text))
 
+    def _check_link_style(self, sink: DiagnosticSink, line: str) -> None:
+        tokens = line.split(None, 2)
+        if len(tokens) < 3:
+            sink.report("invalid-link-style", "linkStyle needs edge indexes and a style")
+            return
+        for chunk in tokens[1].split(","):
+            chunk = chunk.strip()
+            if chunk == "default":
+                sink.report("invalid-link-style", "linkStyle default is not supported", WARNING)
+            elif chunk:
+                try:
+                    int(chunk)
+                except ValueError:
+                    sink.report("invalid-link-style", f"linkStyle index {chunk!r} is not a number")
+
     def _parse_link_style(self, line: str) -> Tuple[List[int], Dict[str, str]]:
         tokens = line.split(None, 2)
         if len(tokens) < 3:
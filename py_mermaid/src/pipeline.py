@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+from py_mermaid.src.diagnostics import Diagnostic
+from py_mermaid.src.export import flowchart_layout_payload, sequence_layout_payload
+from py_mermaid.src.parser import Parser as FlowchartParser
+from py_mermaid.src.renderer import Renderer as FlowchartRenderer
+from py_mermaid.src.sequence import DEFAULT_STYLE, SequenceParser, SequenceRenderer
+from py_mermaid.src.sidecar import flowchart_sidecar, sequence_sidecar
+from py_mermaid.src.styles import NODE_FILL, NODE_STROKE, NODE_TEXT_COLOR
+
+FLOWCHART = "flowchart"
+SEQUENCE = "sequence"
+SEQUENCE_KEYWORD = "sequenceDiagram"
+# In-flight submissions per pool worker when render_many fans out.
+WINDOW_PER_WORKER = 4
+# Placeholder values rendered in place of every themeable style value.
+THEME_SLOT_PATTERN = re.compile("\x00([0-9]+)\x00")
+NODE_STYLE_DEFAULTS = {"fill": NODE_FILL, "stroke": NODE_STROKE, "color": NODE_TEXT_COLOR}
+
+# Parsers and renderers hold no per-call state, so one instance of each
+# is shared by every caller (and every thread) in the process.
+_flowchart_parser = FlowchartParser()
+_flowchart_renderer = FlowchartRenderer()
+_sequence_parser = SequenceParser()
+_sequence_renderer = SequenceRenderer()
+
+
+@dataclass
+class RenderResult:
+    index: int
+    # What the render callable returned: SVG text, or diagnostics from validate_many.
+    output: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def detect_diagram_type(text: str) -> str:
+    return SEQUENCE if SEQUENCE_KEYWORD in text else FLOWCHART
+
+
+def render_diagram(text: str) -> str:
+    if detect_diagram_type(text) == SEQUENCE:
+        return _sequence_renderer.render(*_sequence_parser.parse(text))
+    return _flowchart_renderer.render(*_flowchart_parser.parse(text))
+
+
+def render_diagram_bytes(text: str) -> memoryview:
+    if detect_diagram_type(text) == SEQUENCE:
+        return _sequence_renderer.render_bytes(*_sequence_parser.parse(text))
+    return _flowchart_renderer.render_bytes(*_flowchart_parser.parse(text))
+
+
+class PreparedDiagram:
+    """Parsed model and computed layout of one diagram, kept for re-theming.
+
+    The first render() splits the SVG into static text and style slots;
+    later calls with a different theme only fill the slots, skipping
+    parsing, layout and element emission. A flowchart theme maps class
+    names to ``fill``/``stroke``/``color`` overrides, a sequence theme
+    overrides DEFAULT_STYLE keys.
+    """
+
+    def __init__(self, text: str):
+        self.kind = detect_diagram_type(text)
+        if self.kind == SEQUENCE:
+            self.model: Tuple[Any, ...] = _sequence_parser.parse(text)
+            self.layout: Any = _sequence_renderer.layout(*self.model[:3])
+        else:
+            self.model = _flowchart_parser.parse(text)
+            node_map, edges, column_meta, _, notes, direction = self.model
+            self.layout = _flowchart_renderer.layout(node_map, column_meta, notes, direction, edges)
+        # A NUL in the source could be mistaken for a slot placeholder.
+        self._chunks: Optional[List[str]] = [] if "\x00" in text else None
+        self._slots: List[Hashable] = []
+
+    def render(self, theme: Optional[Mapping[str, Any]] = None) -> str:
+        """SVG identical to a full render of the source with ``theme`` applied."""
+        if self._chunks is None:
+            self._build_template()
+        if not self._chunks:
+            return self._render_full(theme or {})
+        resolve = self._slot_resolver(theme or {})
+        parts = [""] * (2 * len(self._chunks) - 1)
+        parts[0::2] = self._chunks
+        parts[1::2] = [resolve(slot) for slot in self._slots]
+        return "".join(parts)
+
+    def _render_full(self, theme: Mapping[str, Any]) -> str:
+        if self.kind == SEQUENCE:
+            *entities, style_overrides = self.model
+            return _sequence_renderer.render(*entities, {**style_overrides, **theme}, layout=self.layout)
+        node_map, edges, column_meta, styles, notes, direction = self.model
+        themed = {**styles, **{name: {**styles.get(name, {}), **style} for name, style in theme.items()}}
+        return _flowchart_renderer.render(node_map, edges, column_meta, themed, notes, direction, layout=self.layout)
+
+    def _build_template(self) -> None:
+        slots: List[Hashable] = []
+
+        def placeholder(slot: Hashable) -> str:
+            slots.append(slot)
+            return f"\x00{len(slots) - 1}\x00"
+
+        if self.kind == SEQUENCE:
+            keys = {**DEFAULT_STYLE, **self.model[-1]}
+            svg = self._render_full({key: placeholder(key) for key in keys})
+        else:
+            node_map, _, _, styles, _, _ = self.model
+            class_names = list(styles) + [node.class_name for node in node_map.values() if node.class_name is not None]
+            theme = {
+                name: {key: placeholder((name, key)) for key in NODE_STYLE_DEFAULTS}
+                for name in dict.fromkeys(class_names)
+            }
+            svg = self._render_full(theme)
+        pieces = THEME_SLOT_PATTERN.split(svg)
+        self._chunks = pieces[0::2]
+        self._slots = [slots[int(idx)] for idx in pieces[1::2]]
+
+    def _slot_resolver(self, theme: Mapping[str, Any]) -> Callable[[Hashable], str]:
+        if self.kind == SEQUENCE:
+            style = {**DEFAULT_STYLE, **self.model[-1], **theme}
+            return style.__getitem__
+        styles = self.model[3]
+
+        def resolve(slot: Hashable) -> str:
+            name, key = slot
+            value = theme.get(name, {}).get(key)
+            if value is None:
+                value = styles.get(name, {}).get(key, NODE_STYLE_DEFAULTS[key])
+            return value
+
+        return resolve
+
+
+def prepare_diagram(text: str) -> PreparedDiagram:
+    return PreparedDiagram(text)
+
+
+def render_with_sidecar(text: str) -> Tuple[str, Dict[str, Any]]:
+    """SVG plus its hit-test/search sidecar, sharing one layout."""
+    if detect_diagram_type(text) == SEQUENCE:
+        model = _sequence_parser.parse(text)
+        layout = _sequence_renderer.layout(*model[:3])
+        svg = _sequence_renderer.render(*model, layout=layout)
+        return svg, sequence_sidecar(*model, renderer=_sequence_renderer, layout=layout)
+    node_map, edges, column_meta, styles, notes, direction = model = _flowchart_parser.parse(text)
+    layout = _flowchart_renderer.layout(node_map, column_meta, notes, direction, edges)
+    svg = _flowchart_renderer.render(*model, layout=layout)
+    return svg, flowchart_sidecar(*model, renderer=_flowchart_renderer, layout=layout)
+
+
+def validate_diagram(text: str) -> List[Diagnostic]:
+    """Diagnostics for one source; stops after parsing, with no layout or SVG."""
+    if detect_diagram_type(text) == SEQUENCE:
+        return _sequence_parser.validate(text)
+    return _flowchart_parser.validate(text)
+
+
+def layout_payload(text: str) -> Dict[str, Any]:
+    if detect_diagram_type(text) == SEQUENCE:
+        return sequence_layout_payload(*_sequence_parser.parse(text), renderer=_sequence_renderer)
+    return flowchart_layout_payload(*_flowchart_parser.parse(text), renderer=_flowchart_renderer)
+
+
+def normalized_lines(text: str) -> Iterator[str]:
+    if detect_diagram_type(text) == SEQUENCE:
+        return _sequence_parser._normalize_lines(text)
+    return _flowchart_parser._normalize_lines(text)
+
+
+def source_digest(text: str) -> str:
+    digest = hashlib.sha256()
+    for line in normalized_lines(text):
+        digest.update(line.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def render_many(
+    texts: Iterable[str],
+    workers: int = 0,
+    use_processes: bool = False,
+    ordered: bool = True,
+    window: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    render: Callable[[str], str] = render_diagram,
+) -> Iterator[RenderResult]:
+    """Render each diagram in ``texts``, yielding one RenderResult per item.
+
+    ``texts`` is consumed lazily and at most ``window`` items are in flight,
+    so arbitrarily long streams run in bounded memory. A failing item is
+    reported through ``RenderResult.error`` and never stops the batch. With
+    ``ordered=False`` results are yielded as they finish.
+    """
+    if executor is None and workers <= 0:
+        for index, text in enumerate(texts):
+            yield _render_captured(render, index, text)
+        return
+
+    owned = executor is None
+    if executor is None:
+        pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        executor = pool(max_workers=workers)
+    limit = window or max(workers, 1) * WINDOW_PER_WORKER
+    try:
+        if ordered:
+            queue: Deque[Tuple[int, Future]] = deque()
+            for index, text in enumerate(texts):
+                queue.append((index, executor.submit(render, text)))
+                if len(queue) >= limit:
+                    yield _collect(*queue.popleft())
+            while queue:
+                yield _collect(*queue.popleft())
+        else:
+            in_flight: Dict[Future, int] = {}
+            for index, text in enumerate(texts):
+                in_flight[executor.submit(render, text)] = index
+                if len(in_flight) >= limit:
+                    yield from _drain(in_flight)
+            while in_flight:
+                yield from _drain(in_flight)
+    finally:
+        if owned:
+            executor.shutdown(cancel_futures=True)
+
+
+def validate_many(texts: Iterable[str], **options) -> Iterator[RenderResult]:
+    """render_many() with validate_diagram; each result's output is a list of Diagnostic."""
+    return render_many(texts, render=validate_diagram, **options)
+
+
+def _render_captured(render: Callable[[str], str], index: int, text: str) -> RenderResult:
+    try:
+        return RenderResult(index, output=render(text))
+    except Exception as error:
+        return RenderResult(index, error=error)
+
+
+def _collect(index: int, future: Future) -> RenderResult:
+    try:
+        return RenderResult(index, output=future.result())
+    except Exception as error:
+        return RenderResult(index, error=error)
+
+
+def _drain(in_flight: Dict[Future, int]) -> Iterator[RenderResult]:
+    done: Set[Future] = wait(in_flight, return_when=FIRST_COMPLETED).done
+    for future in done:
+        yield _collect(in_flight.pop(future), future)
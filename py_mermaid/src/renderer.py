@@ -1,35 +1,60 @@
 from __future__ import annotations
 
 import math
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from py_mermaid.src.db import ColumnFrame, Edge, Node, Note, ColumnMeta
+from py_mermaid.src.db import ColumnFrame, ColumnMeta, Edge, EdgeBundle, FlowchartLayout, Node, NodeBox, Note, NoteBox
+from py_mermaid.src.escape import element_id, svg_escape
+from py_mermaid.src.spatial import Rect, SpatialHash, bounding_rect, union_rect
+from py_mermaid.src.graph import DEFAULT_EDGE_WIDTH, MAX_WEIGHTED_STROKE
+from py_mermaid.src.styles import (
+    DEFAULT_EDGE_STYLE,
+    DEFAULT_NODE_STYLE,
+    NodeStyle,
+    StyleTable,
+    format_attributes,
+    resolve_node_styles,
+)
 from py_mermaid.src.utils import label_to_lines
 
 LAYOUT_MARGIN = 40.0
 FONT_STACK = "Helvetica Neue, Arial, sans-serif"
 COLUMN_BACKGROUND_COLORS = ["#fefaf3", "#f4f9ff", "#f4fff6"]
-DEFAULT_EDGE_STYLE = {"stroke": "#7b7b7b", "stroke-width": "2", "marker-end": "url(#arrow)"}
 NODE_TEXT_PADDING = 16.0
 NODE_LINE_HEIGHT = 18.0
 AVG_CHAR_WIDTH = 6.5
 TEXT_WIDTH_SCALE = 1.1
 COLUMN_INNER_PADDING = 14.0
+# Header text extent above and below its baseline.
+COLUMN_HEADER_HEIGHT = 20.0
 BOX_CORNER_RADIUS = 0.0
+ROUND_CORNER_RADIUS = 10.0
+SHAPE_INSET = 8.0
+CYLINDER_RIM = 8.0
 NODE_COLUMN_INSET = 10.0
 MIN_NODE_WIDTH = 150.0
 MAX_NODE_WIDTH = 360.0
-
-def _svg_escape(text: str) -> str:
-    return (
-        text.replace("&", "&amp;")
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-        .replace('"', "&quot;")
-        .replace("'", "&apos;")
-    )
+EDGE_LABEL_CHAR_WIDTH = 6.5
+EDGE_LABEL_HEIGHT = 14.0
+EDGE_LABEL_RISE = 8.0
+LABEL_GAP = 2.0
+NOTE_GAP = 8.0
+# Fewest parallel edges between two clusters worth sharing a trunk.
+BUNDLE_MIN_EDGES = 3
+# Trunk ends sit this far along the line between the two cluster centroids.
+BUNDLE_SPLIT = 0.25
 
 class Renderer:
+    def __init__(
+        self,
+        avoid_collisions: bool = False,
+        bundle_edges: bool = False,
+        bundle_min_edges: int = BUNDLE_MIN_EDGES,
+    ):
+        self.avoid_collisions = avoid_collisions
+        self.bundle_edges = bundle_edges
+        self.bundle_min_edges = bundle_min_edges
+
     def render(
         self,
         node_map: Dict[str, Node],
@@ -38,22 +63,180 @@ class Renderer:
         styles: Dict[str, Dict[str, str]],
         notes: List[Note],
         direction: str,
+        layout: Optional[FlowchartLayout] = None,
     ) -> str:
-        canvas_size, columns, margin = self._layout_nodes(node_map, column_meta, direction)
-        self._layout_notes(notes, node_map, margin)
-        return self._render_svg(node_map, edges, styles, canvas_size, columns, margin, notes)
+        if layout is None:
+            layout = self.layout(node_map, column_meta, notes, direction, edges)
+        return self._render_svg(node_map, edges, styles, layout, notes)
+
+    def render_bytes(
+        self,
+        node_map: Dict[str, Node],
+        edges: List[Edge],
+        column_meta: List[ColumnMeta],
+        styles: Dict[str, Dict[str, str]],
+        notes: List[Note],
+        direction: str,
+        layout: Optional[FlowchartLayout] = None,
+    ) -> memoryview:
+        """render() output encoded as UTF-8, returned as a memoryview."""
+        if layout is None:
+            layout = self.layout(node_map, column_meta, notes, direction, edges)
+        return memoryview("\n".join(self._svg_lines(node_map, edges, styles, layout, notes)).encode("utf-8"))
+
+    def layout(
+        self,
+        node_map: Dict[str, Node],
+        column_meta: List[ColumnMeta],
+        notes: List[Note],
+        direction: str,
+        edges: Optional[List[Edge]] = None,
+    ) -> FlowchartLayout:
+        canvas_size, columns, margin, boxes = self._layout_nodes(node_map, column_meta, direction)
+        note_boxes = self._layout_notes(notes, boxes, margin)
+        layout = FlowchartLayout(
+            canvas_size=canvas_size,
+            columns=columns,
+            margin=margin,
+            nodes=boxes,
+            notes=note_boxes,
+        )
+        if self.bundle_edges:
+            layout.bundles = self._bundle_edges(node_map, edges or [], boxes)
+        if self.avoid_collisions:
+            self._resolve_collisions(layout, notes, edges or [])
+        return layout
+
+    def _bundle_edges(self, node_map: Dict[str, Node], edges: List[Edge], boxes: Dict[str, NodeBox]) -> List[EdgeBundle]:
+        """Group plain edges by (source cluster, target cluster); a cluster is a subgraph, else a column."""
+        groups: Dict[Tuple[Tuple[str, str], Tuple[str, str]], List[int]] = {}
+        for idx, edge in enumerate(edges):
+            if edge.label or edge.style:
+                continue
+            source = node_map.get(edge.source)
+            target = node_map.get(edge.target)
+            if source is None or target is None:
+                continue
+            key = (self._cluster(source), self._cluster(target))
+            if key[0] != key[1]:
+                groups.setdefault(key, []).append(idx)
+
+        bundles: List[EdgeBundle] = []
+        for indexes in groups.values():
+            if len(indexes) < self.bundle_min_edges:
+                continue
+            sx, sy = self._centroid(boxes, dict.fromkeys(edges[idx].source for idx in indexes))
+            tx, ty = self._centroid(boxes, dict.fromkeys(edges[idx].target for idx in indexes))
+            dx, dy = tx - sx, ty - sy
+            start = (sx + dx * BUNDLE_SPLIT, sy + dy * BUNDLE_SPLIT)
+            end = (tx - dx * BUNDLE_SPLIT, ty - dy * BUNDLE_SPLIT)
+            bundles.append(EdgeBundle(edge_indexes=indexes, start=start, end=end))
+        return bundles
 
-    def _compute_node_box(self, node: Node) -> None:
+    def _cluster(self, node: Node) -> Tuple[str, str]:
+        if node.subgraph is not None:
+            return ("subgraph", node.subgraph)
+        return ("column", node.column_key)
+
+    def _centroid(self, boxes: Dict[str, NodeBox], node_ids: Iterable[str]) -> Tuple[float, float]:
+        centers = [boxes[node_id].center() for node_id in node_ids]
+        return sum(x for x, _ in centers) / len(centers), sum(y for _, y in centers) / len(centers)
+
+    def element_rects(
+        self,
+        node_map: Dict[str, Node],
+        edges: List[Edge],
+        notes: List[Note],
+        layout: FlowchartLayout,
+    ) -> Iterator[Tuple[str, Union[str, int], Rect]]:
+        """(kind, key, bounding box) of every drawn element, in paint order.
+
+        element_id(kind, key) is the element's group id in the SVG.
+        """
+        boxes = layout.nodes
+        bundled = set()
+        for idx, bundle in enumerate(layout.bundles):
+            points = [bundle.start, bundle.end]
+            for edge_idx in bundle.edge_indexes:
+                edge = edges[edge_idx]
+                points.extend((boxes[edge.source].center(), boxes[edge.target].center()))
+            bundled.update(bundle.edge_indexes)
+            yield "bundle", idx, bounding_rect(points)
+
+        for idx, edge in enumerate(edges):
+            source = boxes.get(edge.source)
+            target = boxes.get(edge.target)
+            if idx in bundled or not source or not target:
+                continue
+            rect = bounding_rect((source.center(), target.center()))
+            if edge.label:
+                rect = union_rect(rect, self._edge_label_rect(edge.label, *self.edge_label_anchor(idx, edge, layout)))
+            yield "edge", idx, rect
+
+        for node_id in node_map:
+            box = boxes[node_id]
+            yield "node", node_id, (box.x, box.y, box.width, box.height)
+
+        for idx, (note, note_box) in enumerate(zip(notes, layout.notes)):
+            if note.anchor in boxes:
+                yield "note", idx, (note_box.x, note_box.y, note_box.width, note_box.height)
+
+    def _resolve_collisions(self, layout: FlowchartLayout, notes: List[Note], edges: List[Edge]) -> None:
+        """Move notes, then edge labels, to the nearest spot clear of nodes and of each other."""
+        grid = SpatialHash()
+        boxes = layout.nodes
+        for node_id, box in boxes.items():
+            grid.insert(("node", node_id), (box.x, box.y, box.width, box.height))
+
+        for idx, (note, note_box) in enumerate(zip(notes, layout.notes)):
+            if note.anchor not in boxes:
+                continue
+            rect = grid.find_free((note_box.x, note_box.y, note_box.width, note_box.height), NOTE_GAP)
+            if rect is not None:
+                note_box.x, note_box.y = rect[0], rect[1]
+            grid.insert(("note", idx), (note_box.x, note_box.y, note_box.width, note_box.height))
+
+        for idx, edge in enumerate(edges):
+            source = boxes.get(edge.source)
+            target = boxes.get(edge.target)
+            if not edge.label or not source or not target:
+                continue
+            label_x, label_y = self._edge_label_anchor(source, target)
+            rect = grid.find_free(self._edge_label_rect(edge.label, label_x, label_y), LABEL_GAP)
+            if rect is None:
+                continue
+            label_x, label_y = rect[0] + rect[2] / 2, rect[1] + EDGE_LABEL_HEIGHT - 3
+            layout.edge_labels[idx] = (label_x, label_y)
+            grid.insert(("label", idx), rect)
+
+    def edge_label_anchor(self, idx: int, edge: Edge, layout: FlowchartLayout) -> Tuple[float, float]:
+        """Where the label of ``edges[idx]`` is drawn: its collision-free spot if one was found."""
+        anchor = layout.edge_labels.get(idx)
+        if anchor is None:
+            anchor = self._edge_label_anchor(layout.nodes[edge.source], layout.nodes[edge.target])
+        return anchor
+
+    def _edge_label_anchor(self, source: NodeBox, target: NodeBox) -> Tuple[float, float]:
+        sx, sy = source.center()
+        tx, ty = target.center()
+        return (sx + tx) / 2, (sy + ty) / 2 - EDGE_LABEL_RISE
+
+    def _edge_label_rect(self, label: str, label_x: float, label_y: float) -> Rect:
+        width = len(label) * EDGE_LABEL_CHAR_WIDTH + 4
+        return (label_x - width / 2, label_y - EDGE_LABEL_HEIGHT + 3, width, EDGE_LABEL_HEIGHT)
+
+    def _compute_node_box(self, node: Node) -> NodeBox:
         char_width = AVG_CHAR_WIDTH
         line_height = NODE_LINE_HEIGHT
         padding = NODE_TEXT_PADDING
 
-        node.text_lines = label_to_lines(node.label)
-        longest_line = max((len(line) for line in node.text_lines), default=1)
+        text_lines = label_to_lines(node.label)
+        longest_line = max((len(line) for line in text_lines), default=1)
         text_width = longest_line * char_width * TEXT_WIDTH_SCALE
-        node.width = max(MIN_NODE_WIDTH, min(MAX_NODE_WIDTH, text_width + 2 * padding))
-        text_height = len(node.text_lines) * line_height
-        node.height = max(60.0, text_height + 2 * padding)
+        width = max(MIN_NODE_WIDTH, min(MAX_NODE_WIDTH, text_width + 2 * padding))
+        text_height = len(text_lines) * line_height
+        height = max(60.0, text_height + 2 * padding)
+        return NodeBox(text_lines=text_lines, width=width, height=height)
 
     def _layout_nodes(
         self,
@@ -63,19 +246,17 @@ class Renderer:
         column_gap: float = 70.0,
         row_gap: float = 50.0,
         margin: float = LAYOUT_MARGIN,
-    ) -> Tuple[Tuple[float, float], List[ColumnFrame], float]:
+    ) -> Tuple[Tuple[float, float], List[ColumnFrame], float, Dict[str, NodeBox]]:
         columns = len(column_meta)
-        for node in node_map.values():
-            self._compute_node_box(node)
+        boxes = {node_id: self._compute_node_box(node) for node_id, node in node_map.items()}
 
         column_widths = [0.0 for _ in range(max(columns, 1))]
-        for node in node_map.values():
-            index = min(node.column_index, len(column_widths) - 1)
-            column_widths[index] = max(column_widths[index], node.width + NODE_COLUMN_INSET * 2)
-
         row_heights: Dict[int, float] = {}
-        for node in node_map.values():
-            row_heights[node.row_index] = max(row_heights.get(node.row_index, 0.0), node.height)
+        for node_id, node in node_map.items():
+            box = boxes[node_id]
+            index = min(node.column_index, len(column_widths) - 1)
+            column_widths[index] = max(column_widths[index], box.width + NODE_COLUMN_INSET * 2)
+            row_heights[node.row_index] = max(row_heights.get(node.row_index, 0.0), box.height)
 
         col_positions: Dict[int, float] = {}
         current_x = margin
@@ -92,14 +273,15 @@ class Renderer:
             extra = row_gap if idx < len(sorted_rows) - 1 else 0.0
             current_y += row_heights[row] + extra
 
-        for node in node_map.values():
+        for node_id, node in node_map.items():
+            box = boxes[node_id]
             col_x = col_positions.get(node.column_index, margin)
             row_y = row_positions.get(node.row_index, margin)
-            col_width = column_widths[node.column_index] if column_widths else node.width
-            row_height = row_heights.get(node.row_index, node.height)
+            col_width = column_widths[node.column_index] if column_widths else box.width
+            row_height = row_heights.get(node.row_index, box.height)
             inner_width = max(col_width - NODE_COLUMN_INSET * 2, 0.0)
-            node.x = col_x + NODE_COLUMN_INSET + max((inner_width - node.width) / 2.0, 0.0)
-            node.y = row_y + (row_height - node.height) / 2.0
+            box.x = col_x + NODE_COLUMN_INSET + max((inner_width - box.width) / 2.0, 0.0)
+            box.y = row_y + (row_height - box.height) / 2.0
 
         total_width = sum(column_widths[:columns]) + column_gap * max(columns - 1, 0) + 2 * margin
         total_height = (
@@ -119,61 +301,112 @@ class Renderer:
             )
 
         if direction in {"RL", "BT"}:
-            for node in node_map.values():
+            for box in boxes.values():
                 if direction == "RL":
-                    node.x = total_width - node.x - node.width
+                    box.x = total_width - box.x - box.width
                 if direction == "BT":
-                    node.y = total_height - node.y - node.height
+                    box.y = total_height - box.y - box.height
             for column in column_frames:
                 if direction == "RL":
                     column.x = total_width - column.x - column.width
 
-        return (math.ceil(total_width), math.ceil(total_height)), column_frames, margin
+        return (math.ceil(total_width), math.ceil(total_height)), column_frames, margin, boxes
 
-    def _compute_note_box(self, note: Note) -> None:
+    def _compute_note_box(self, note: Note) -> NoteBox:
         char_width = 6.0
         line_height = 16
         padding = 10
         longest = max((len(line) for line in note.text_lines), default=1)
         text_width = longest * char_width
-        note.width = max(120.0, min(240.0, text_width + 2 * padding))
+        width = max(120.0, min(240.0, text_width + 2 * padding))
         text_height = len(note.text_lines) * line_height
-        note.height = max(48.0, text_height + 2 * padding)
+        height = max(48.0, text_height + 2 * padding)
+        return NoteBox(width=width, height=height)
 
-    def _layout_notes(self, notes: List[Note], node_map: Dict[str, Node], margin: float) -> None:
+    def _layout_notes(self, notes: List[Note], boxes: Dict[str, NodeBox], margin: float) -> List[NoteBox]:
         gap = 24.0
+        note_boxes: List[NoteBox] = []
         for note in notes:
-            self._compute_note_box(note)
-            anchor = node_map.get(note.anchor)
+            box = self._compute_note_box(note)
+            note_boxes.append(box)
+            anchor = boxes.get(note.anchor)
             if not anchor:
                 continue
             if note.position == "left":
-                note.x = anchor.x - gap - note.width
-                note.y = anchor.y + anchor.height / 2 - note.height / 2
+                box.x = anchor.x - gap - box.width
+                box.y = anchor.y + anchor.height / 2 - box.height / 2
             elif note.position == "right":
-                note.x = anchor.x + anchor.width + gap
-                note.y = anchor.y + anchor.height / 2 - note.height / 2
+                box.x = anchor.x + anchor.width + gap
+                box.y = anchor.y + anchor.height / 2 - box.height / 2
             elif note.position == "top":
-                note.x = anchor.x + anchor.width / 2 - note.width / 2
-                note.y = max(margin / 2, anchor.y - gap - note.height)
+                box.x = anchor.x + anchor.width / 2 - box.width / 2
+                box.y = max(margin / 2, anchor.y - gap - box.height)
             else:  # bottom
-                note.x = anchor.x + anchor.width / 2 - note.width / 2
-                note.y = anchor.y + anchor.height + gap
+                box.x = anchor.x + anchor.width / 2 - box.width / 2
+                box.y = anchor.y + anchor.height + gap
+        return note_boxes
 
     def _render_svg(
         self,
         node_map: Dict[str, Node],
         edges: List[Edge],
         styles: Dict[str, Dict[str, str]],
-        canvas_size: Tuple[float, float],
-        columns: List[ColumnFrame],
-        margin: float,
+        layout: FlowchartLayout,
         notes: List[Note],
     ) -> str:
-        width, height = canvas_size
-        lines: List[str] = [
+        return "\n".join(self._svg_lines(node_map, edges, styles, layout, notes))
+
+    def _svg_lines(
+        self,
+        node_map: Dict[str, Node],
+        edges: List[Edge],
+        styles: Dict[str, Dict[str, str]],
+        layout: FlowchartLayout,
+        notes: List[Note],
+    ) -> List[str]:
+        width, height = layout.canvas_size
+        margin = layout.margin
+        boxes = layout.nodes
+        lines = self._svg_head(width, height, f"0 0 {width} {height}")
+
+        bg_y, bg_height = self._column_band(layout)
+        for idx, column in enumerate(layout.columns):
+            lines.extend(self._column_lines(idx, column, bg_y, bg_height, margin / 2))
+
+        bundled = {idx for bundle in layout.bundles for idx in bundle.edge_indexes}
+        for idx, bundle in enumerate(layout.bundles):
+            lines.extend(self._bundle_lines(idx, bundle, edges, boxes))
+
+        edge_styles = StyleTable(DEFAULT_EDGE_STYLE)
+        for idx, edge in enumerate(edges):
+            if idx in bundled:
+                continue
+            source = boxes.get(edge.source)
+            target = boxes.get(edge.target)
+            if not source or not target:
+                continue
+            style_attr = edge_styles.attributes(edge_styles.intern(edge.style))
+            lines.extend(self._edge_lines(idx, edge, source, target, style_attr, layout.edge_labels.get(idx)))
+
+        node_styles = resolve_node_styles(styles)
+        for node_id, node in node_map.items():
+            node_style = node_styles.get(node.class_name, DEFAULT_NODE_STYLE)
+            lines.extend(self._node_lines(node_id, boxes[node_id], node_style, node.shape))
+
+        for idx, (note, note_box) in enumerate(zip(notes, layout.notes)):
+            anchor = boxes.get(note.anchor)
+            if not anchor:
+                continue
+            lines.extend(self._note_lines(idx, note, note_box, anchor))
+
+        # The trailing "" gives the final newline without another full-size copy.
+        lines.extend(("</svg>", ""))
+        return lines
+
+    def _svg_head(self, width: float, height: float, view_box: str) -> List[str]:
+        return [
             '<?xml version="1.0" encoding="UTF-8"?>',
-            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">',
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="{view_box}">',
             '<defs>',
             '<marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="6" markerHeight="6" orient="auto-start-reverse">',
             '<path d="M 0 0 L 10 5 L 0 10 z" fill="#7b7b7b" />',
@@ -184,80 +417,182 @@ class Renderer:
             '</defs>',
         ]
 
-        bg_y = margin * 0.75
-        bg_height = max(height - (margin * 1.5), 0)
-        header_y = margin / 2
-        for idx, column in enumerate(columns):
-            bg_color = COLUMN_BACKGROUND_COLORS[idx % len(COLUMN_BACKGROUND_COLORS)]
-            rect_x = column.x - COLUMN_INNER_PADDING / 2
-            rect_width = column.width + COLUMN_INNER_PADDING
-            lines.append(
-                f'<rect x="{rect_x:.2f}" y="{bg_y:.2f}" width="{rect_width:.2f}" height="{bg_height:.2f}" '
-                f'rx="0" ry="0" fill="{bg_color}" opacity="0.55"/>'
-            )
+    def _column_band(self, layout: FlowchartLayout) -> Tuple[float, float]:
+        """Top and height of the column backgrounds."""
+        margin = layout.margin
+        return margin * 0.75, max(layout.canvas_size[1] - (margin * 1.5), 0)
+
+    def _column_rect(self, column: ColumnFrame, bg_y: float, bg_height: float) -> Rect:
+        return column.x - COLUMN_INNER_PADDING / 2, bg_y, column.width + COLUMN_INNER_PADDING, bg_height
+
+    def _column_lines(
+        self,
+        idx: int,
+        column: ColumnFrame,
+        bg_y: float,
+        bg_height: float,
+        header_y: float,
+        clip: Optional[Rect] = None,
+    ) -> List[str]:
+        """Background and header of one column; with ``clip`` the background is cut to it
+        and a header outside it is left out."""
+        bg_color = COLUMN_BACKGROUND_COLORS[idx % len(COLUMN_BACKGROUND_COLORS)]
+        rect_x, rect_y, rect_width, rect_height = self._column_rect(column, bg_y, bg_height)
+        show_header = True
+        if clip is not None:
+            left, top = max(rect_x, clip[0]), max(rect_y, clip[1])
+            right = min(rect_x + rect_width, clip[0] + clip[2])
+            bottom = min(rect_y + rect_height, clip[1] + clip[3])
+            rect_x, rect_y = left, top
+            rect_width, rect_height = max(right - left, 0), max(bottom - top, 0)
+            show_header = clip[1] - COLUMN_HEADER_HEIGHT < header_y < clip[1] + clip[3] + COLUMN_HEADER_HEIGHT
+        lines = [
+            f'<g id="{element_id("column", column.identifier)}">',
+            f'<rect x="{rect_x:.2f}" y="{rect_y:.2f}" width="{rect_width:.2f}" height="{rect_height:.2f}" '
+            f'rx="0" ry="0" fill="{bg_color}" opacity="0.55"/>',
+        ]
+        if show_header:
             lines.append(
                 f'<text x="{column.x + column.width / 2:.2f}" y="{header_y:.2f}" fill="#2c2c2c" '
                 f'font-size="16" font-weight="600" text-anchor="middle" font-family="{FONT_STACK}">'
-                f'{_svg_escape(column.label)}</text>'
+                f'{svg_escape(column.label)}</text>'
             )
+        lines.append("</g>")
+        return lines
 
-        for edge in edges:
-            source = node_map.get(edge.source)
-            target = node_map.get(edge.target)
-            if not source or not target:
-                continue
-            sx, sy = source.center()
-            tx, ty = target.center()
-            style = {**DEFAULT_EDGE_STYLE, **edge.style}
-            style_attr = " ".join(f'{key}="{value}"' for key, value in style.items())
-            lines.append(f'<line x1="{sx:.2f}" y1="{sy:.2f}" x2="{tx:.2f}" y2="{ty:.2f}" {style_attr} />')
-            if edge.label:
-                label_x = (sx + tx) / 2
-                label_y = (sy + ty) / 2 - 8
-                lines.append(
-                    f'<text x="{label_x:.2f}" y="{label_y:.2f}" fill="#454545" font-size="12" '
-                    f'text-anchor="middle" font-family="{FONT_STACK}">{_svg_escape(edge.label)}</text>'
-                )
-
-        for node in node_map.values():
-            style = styles.get(node.class_name, {})
-            fill = style.get("fill", "#ffffff")
-            stroke = style.get("stroke", "#666666")
-            text_color = style.get("color", "#1f1f1f")
-            radius = BOX_CORNER_RADIUS
+    def _edge_lines(
+        self,
+        idx: int,
+        edge: Edge,
+        source: NodeBox,
+        target: NodeBox,
+        style_attr: str,
+        label_anchor: Optional[Tuple[float, float]] = None,
+    ) -> List[str]:
+        sx, sy = source.center()
+        tx, ty = target.center()
+        lines = [
+            f'<g id="{element_id("edge", idx)}">',
+            f'<line x1="{sx:.2f}" y1="{sy:.2f}" x2="{tx:.2f}" y2="{ty:.2f}" {style_attr} />',
+        ]
+        if edge.label:
+            label_x, label_y = label_anchor or self._edge_label_anchor(source, target)
             lines.append(
-                f'<rect x="{node.x:.2f}" y="{node.y:.2f}" width="{node.width:.2f}" height="{node.height:.2f}" '
-                f'rx="{radius}" ry="{radius}" fill="{fill}" stroke="{stroke}" stroke-width="2" filter="url(#shadow)"/>'
+                f'<text x="{label_x:.2f}" y="{label_y:.2f}" fill="#454545" font-size="12" '
+                f'text-anchor="middle" font-family="{FONT_STACK}">{svg_escape(edge.label)}</text>'
             )
-            text_y = node.y + node.height / 2 - (len(node.text_lines) - 1) * 9
-            for idx, text_line in enumerate(node.text_lines):
-                lines.append(
-                    f'<text x="{node.x + node.width / 2:.2f}" y="{text_y + idx * 18:.2f}" '
-                    f'fill="{text_color}" font-size="14" text-anchor="middle" dominant-baseline="middle" '
-                    f'font-family="{FONT_STACK}">{_svg_escape(text_line)}</text>'
-                )
+        lines.append("</g>")
+        return lines
 
-        for note in notes:
-            anchor = node_map.get(note.anchor)
-            if not anchor:
-                continue
+    def _bundle_lines(self, idx: int, bundle: EdgeBundle, edges: List[Edge], boxes: Dict[str, NodeBox]) -> List[str]:
+        """One path for the source spurs and trunk, then one arrow per distinct target."""
+        sources = dict.fromkeys(edges[edge_idx].source for edge_idx in bundle.edge_indexes)
+        targets = dict.fromkeys(edges[edge_idx].target for edge_idx in bundle.edge_indexes)
+        (bx, by), (ex, ey) = bundle.start, bundle.end
+        spurs = " ".join(f"M {x:.2f},{y:.2f} L {bx:.2f},{by:.2f}" for x, y in (boxes[node_id].center() for node_id in sources))
+        count = len(bundle.edge_indexes)
+        trunk_style = {
+            **DEFAULT_EDGE_STYLE,
+            "stroke-width": str(min(DEFAULT_EDGE_WIDTH + count // 2, MAX_WEIGHTED_STROKE)),
+            "marker-end": "none",
+        }
+        lines = [
+            f'<g id="{element_id("bundle", idx)}">',
+            f'<path d="{spurs}" fill="none" {format_attributes({**DEFAULT_EDGE_STYLE, "marker-end": "none"})} />',
+            f'<line x1="{bx:.2f}" y1="{by:.2f}" x2="{ex:.2f}" y2="{ey:.2f}" {format_attributes(trunk_style)} />',
+        ]
+        edge_attr = format_attributes(DEFAULT_EDGE_STYLE)
+        for node_id in targets:
+            tx, ty = boxes[node_id].center()
+            lines.append(f'<line x1="{ex:.2f}" y1="{ey:.2f}" x2="{tx:.2f}" y2="{ty:.2f}" {edge_attr} />')
+        lines.append("</g>")
+        return lines
+
+    def _node_lines(self, node_id: str, box: NodeBox, node_style: NodeStyle, shape: str = "rect") -> List[str]:
+        lines = [f'<g id="{element_id("node", node_id)}">']
+        lines.extend(self._shape_outline(shape, box, node_style))
+        text_y = box.y + box.height / 2 - (len(box.text_lines) - 1) * 9
+        for idx, text_line in enumerate(box.text_lines):
             lines.append(
-                f'<rect x="{note.x:.2f}" y="{note.y:.2f}" width="{note.width:.2f}" height="{note.height:.2f}" '
-                f'rx="10" ry="10" fill="#fffceb" stroke="#cba135" stroke-dasharray="5 3"/>'
+                f'<text x="{box.x + box.width / 2:.2f}" y="{text_y + idx * 18:.2f}" '
+                f'{node_style.text} font-size="14" text-anchor="middle" dominant-baseline="middle" '
+                f'font-family="{FONT_STACK}">{svg_escape(text_line)}</text>'
             )
-            note_text_y = note.y + note.height / 2 - (len(note.text_lines) - 1) * 8
-            for idx, text_line in enumerate(note.text_lines):
+        lines.append("</g>")
+        return lines
+
+    def _shape_outline(self, shape: str, box: NodeBox, node_style: NodeStyle) -> List[str]:
+        paint = f'{node_style.box} stroke-width="2" filter="url(#shadow)"'
+        x, y, width, height = box.x, box.y, box.width, box.height
+        if shape in ("rect", "round", "stadium", "subroutine"):
+            radius = {"round": ROUND_CORNER_RADIUS, "stadium": height / 2}.get(shape, BOX_CORNER_RADIUS)
+            radius_attr = radius if shape == "rect" else f"{radius:.2f}"
+            lines = [
+                f'<rect x="{x:.2f}" y="{y:.2f}" width="{width:.2f}" height="{height:.2f}" '
+                f'rx="{radius_attr}" ry="{radius_attr}" {paint}/>'
+            ]
+            if shape == "subroutine":
+                for line_x in (x + SHAPE_INSET, x + width - SHAPE_INSET):
+                    lines.append(
+                        f'<line x1="{line_x:.2f}" y1="{y:.2f}" x2="{line_x:.2f}" y2="{y + height:.2f}" {node_style.box} stroke-width="2"/>'
+                    )
+            return lines
+        if shape in ("circle", "doublecircle"):
+            cx, cy = box.center()
+            lines = [f'<ellipse cx="{cx:.2f}" cy="{cy:.2f}" rx="{width / 2:.2f}" ry="{height / 2:.2f}" {paint}/>']
+            if shape == "doublecircle":
                 lines.append(
-                    f'<text x="{note.x + note.width / 2:.2f}" y="{note_text_y + idx * 16:.2f}" '
-                    f'fill="#4b3800" font-size="12" text-anchor="middle" dominant-baseline="middle" '
-                    f'font-family="{FONT_STACK}">{_svg_escape(text_line)}</text>'
+                    f'<ellipse cx="{cx:.2f}" cy="{cy:.2f}" rx="{width / 2 - 4:.2f}" ry="{height / 2 - 4:.2f}" {paint}/>'
                 )
-            sx, sy = anchor.center()
-            nx = note.x + note.width / 2
-            ny = note.y + note.height / 2
+            return lines
+        if shape == "cylinder":
+            rim = min(CYLINDER_RIM, height / 4)
+            arc = f"a {width / 2:.2f},{rim:.2f} 0 0 0"
+            body = height - 2 * rim
+            return [
+                f'<path d="M {x:.2f},{y + rim:.2f} {arc} {width:.2f},0 {arc} {-width:.2f},0 v {body:.2f} '
+                f'{arc} {width:.2f},0 v {-body:.2f}" {paint}/>'
+            ]
+        points = " ".join(f"{px:.2f},{py:.2f}" for px, py in self._shape_polygon(shape, x, y, width, height))
+        return [f'<polygon points="{points}" {paint}/>']
+
+    def _shape_polygon(self, shape: str, x: float, y: float, width: float, height: float) -> List[Tuple[float, float]]:
+        inset = min(height / 2, width / 4)
+        right, bottom, cx, cy = x + width, y + height, x + width / 2, y + height / 2
+        if shape == "diamond":
+            return [(cx, y), (right, cy), (cx, bottom), (x, cy)]
+        if shape == "hexagon":
+            return [(x + inset, y), (right - inset, y), (right, cy), (right - inset, bottom), (x + inset, bottom), (x, cy)]
+        if shape == "parallelogram":
+            return [(x + inset, y), (right, y), (right - inset, bottom), (x, bottom)]
+        if shape == "parallelogram_alt":
+            return [(x, y), (right - inset, y), (right, bottom), (x + inset, bottom)]
+        if shape == "trapezoid":
+            return [(x + inset, y), (right - inset, y), (right, bottom), (x, bottom)]
+        if shape == "trapezoid_alt":
+            return [(x, y), (right, y), (right - inset, bottom), (x + inset, bottom)]
+        if shape == "asymmetric":
+            return [(x, y), (right, y), (right, bottom), (x, bottom), (x + inset, cy)]
+        raise ValueError(f"Unknown node shape: {shape}")
+
+    def _note_lines(self, idx: int, note: Note, note_box: NoteBox, anchor: NodeBox) -> List[str]:
+        lines = [
+            f'<g id="{element_id("note", idx)}">',
+            f'<rect x="{note_box.x:.2f}" y="{note_box.y:.2f}" width="{note_box.width:.2f}" height="{note_box.height:.2f}" '
+            f'rx="10" ry="10" fill="#fffceb" stroke="#cba135" stroke-dasharray="5 3"/>',
+        ]
+        note_text_y = note_box.y + note_box.height / 2 - (len(note.text_lines) - 1) * 8
+        for line_idx, text_line in enumerate(note.text_lines):
             lines.append(
-                f'<line x1="{sx:.2f}" y1="{sy:.2f}" x2="{nx:.2f}" y2="{ny:.2f}" stroke="#cba135" stroke-dasharray="4 3"/>'
+                f'<text x="{note_box.x + note_box.width / 2:.2f}" y="{note_text_y + line_idx * 16:.2f}" '
+                f'fill="#4b3800" font-size="12" text-anchor="middle" dominant-baseline="middle" '
+                f'font-family="{FONT_STACK}">{svg_escape(text_line)}</text>'
             )
-
-        lines.append("</svg>")
-        return "\n".join(lines) + "\n"
+        sx, sy = anchor.center()
+        nx = note_box.x + note_box.width / 2
+        ny = note_box.y + note_box.height / 2
+        lines.append(
+            f'<line x1="{sx:.2f}" y1="{sy:.2f}" x2="{nx:.2f}" y2="{ny:.2f}" stroke="#cba135" stroke-dasharray="4 3"/>'
+        )
+        lines.append("</g>")
+        return lines
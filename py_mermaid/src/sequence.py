@@ -1,16 +1,40 @@
 from __future__ import annotations
 
 import math
+import re
+import shutil
+import tempfile
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
-
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from py_mermaid.src.diagnostics import WARNING, Diagnostic, DiagnosticSink
+from py_mermaid.src.escape import element_id, svg_escape
+from py_mermaid.src.spatial import Rect, bounding_rect, union_rect
+from py_mermaid.src.utils import PathLike, iter_file_lines
+
+# Run-length folding: a block of up to FOLD_MAX_PERIOD messages repeated at
+# least FOLD_MIN_REPEATS times in a row becomes one "loop ×N" fragment.
+FOLD_MIN_REPEATS = 3
+FOLD_MAX_PERIOD = 8
+# Kinds yielded by SequenceParser._iter_sequence.
+MESSAGE = "message"
+NOTE = "note"
+ACTIVATION = "activation"
+FRAGMENT = "fragment"
+TIMESTAMP_PATTERN = re.compile(
+    r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?|\b\d{1,2}:\d{2}:\d{2}(?:\.\d+)?\b"
+)
 
 @dataclass
 class Participant:
     name: str
     label: str
-    width: float = 140.0
-    x: float = 0.0
+
+
+@dataclass
+class ParticipantBox:
+    x: float  # lifeline centre
+    width: float
 
 
 @dataclass
@@ -30,8 +54,12 @@ class Note:
     end_index: int
     text_lines: List[str]
     row_index: int
-    width: float = 0.0
-    height: float = 0.0
+
+
+@dataclass
+class NoteBox:
+    width: float
+    height: float
     x: float = 0.0
     y: float = 0.0
 
@@ -57,25 +85,60 @@ class Fragment:
     sections: List[FragmentSection]
     start_row: int
     end_row: int
+    # Set on loops produced by folding repeated messages.
+    repeat_count: int = 0
+    first_timestamp: Optional[str] = None
+    last_timestamp: Optional[str] = None
 
 
-class SequenceParser:
-    def parse(self, text: str):
-        lines = self._normalize_lines(text)
-        return self._parse_sequence(lines)
+@dataclass
+class SequenceLayout:
+    canvas: Tuple[float, float]
+    participants: Dict[str, ParticipantBox]
+    notes: List[NoteBox]
 
-    def _normalize_lines(self, text: str) -> List[str]:
-        lines: List[str] = []
-        inside_code_block = False
-        for raw in text.splitlines():
+
+class SequenceParser:
+    def __init__(
+        self,
+        fold_repeats: bool = False,
+        min_repeats: int = FOLD_MIN_REPEATS,
+        max_period: int = FOLD_MAX_PERIOD,
+    ):
+        self.fold_repeats = fold_repeats
+        self.min_repeats = min_repeats
+        self.max_period = max_period
+
+    def parse(self, text: Union[str, Iterable[str]]):
+        return self.parse_iter(text)
+
+    def parse_file(self, path: PathLike, use_mmap: bool = False, encoding: str = "utf-8"):
+        return self.parse_iter(iter_file_lines(path, use_mmap=use_mmap, encoding=encoding))
+
+    def parse_iter(self, lines: Union[str, Iterable[str]]):
+        return self._parse_sequence(self._numbered_lines(lines))
+
+    def validate(self, lines: Union[str, Iterable[str]]) -> List[Diagnostic]:
+        """Diagnostics for the source, in the same form as Parser.validate().
+
+        Covers unknown arrows, malformed notes, unparsed lines, unmatched
+        ``end``/``else``, stray ``deactivate`` and fragments left open.
+        """
+        sink = DiagnosticSink()
+        for _ in self._iter_sequence(self._numbered_lines(lines), {}, {}, sink):
+            pass
+        return sink.diagnostics
+
+    def _numbered_lines(self, source: Union[str, Iterable[str]]) -> Iterator[Tuple[int, str]]:
+        lines = source.splitlines() if isinstance(source, str) else source
+        for number, raw in enumerate(lines, 1):
             stripped = raw.strip()
-            if stripped.startswith("```"):
-                inside_code_block = not inside_code_block
-                continue
-            if not stripped:
+            if not stripped or stripped.startswith("```"):
                 continue
-            lines.append(stripped)
-        return lines
+            yield number, stripped
+
+    def _normalize_lines(self, source: Union[str, Iterable[str]]) -> Iterator[str]:
+        return (line for _, line in self._numbered_lines(source))
 
     def _parse_style_line(self, line: str, style: Dict[str, str]) -> None:
         _, _, rest = line.partition(" ")
@@ -84,136 +147,191 @@ class SequenceParser:
                 key, value = token.split("=", 1)
                 style[key.strip()] = value.strip()
 
-    def _parse_sequence(self, lines: List[str]):
+    def _parse_sequence(self, lines: Iterable[str]):
         participants: Dict[str, Participant] = {}
-        order: List[str] = []
         messages: List[Message] = []
         notes: List[Note] = []
         activations: List[Activation] = []
         fragments: List[Fragment] = []
         style_overrides: Dict[str, str] = {}
+        collect = {MESSAGE: messages.append, NOTE: notes.append, ACTIVATION: activations.append, FRAGMENT: fragments.append}
+        for kind, item in self._iter_sequence(lines, participants, style_overrides):
+            collect[kind](item)
+
+        return (
+            list(participants.values()),
+            messages,
+            notes,
+            activations,
+            fragments,
+            style_overrides,
+        )
+
+    def _iter_sequence(
+        self,
+        lines: Iterable[Tuple[int, str]],
+        participants: Dict[str, Participant],
+        style_overrides: Dict[str, str],
+        sink: Optional[DiagnosticSink] = None,
+    ) -> Iterator[Tuple[str, Any]]:
+        """Yield (kind, item) for every message, note, activation and fragment.
+
+        ``lines`` are (line number, line) pairs from _numbered_lines.
+        Activations and fragments are yielded when they close, so the only
+        state held is what is still open. ``participants`` and
+        ``style_overrides`` are filled in as the lines are read; problems
+        go to ``sink`` when one is given.
+        """
+        positions: Dict[str, int] = {}
         row_index = 0
         activation_stack: Dict[str, List[int]] = {}
         fragment_stack: List[Dict[str, any]] = []
+        # Consecutive messages held back for folding; rows are assigned on flush.
+        pending: List[Message] = []
+
+        def flush_pending():
+            nonlocal row_index
+            if pending:
+                folded, loops, row_index = self._fold_messages(pending, row_index)
+                for message in folded:
+                    yield MESSAGE, message
+                for loop in loops:
+                    yield FRAGMENT, loop
+                pending.clear()
 
         def ensure_participant(token: str, label: Optional[str] = None):
             if token not in participants:
                 display = label or token
                 participants[token] = Participant(name=token, label=display)
-                order.append(token)
+                positions[token] = len(positions)
             else:
                 if label:
                     participants[token].label = label
 
-        for line in lines:
-            if line.startswith("%%"):
-                if line.startswith("%% style"):
-                    self._parse_style_line(line, style_overrides)
-                continue
+        for line_number, line in lines:
+            if sink is not None:
+                sink.line = line_number
+            try:
+                if line.startswith("%%"):
+                    if line.startswith("%% style"):
+                        self._parse_style_line(line, style_overrides)
+                    continue
 
-            if line.startswith("sequenceDiagram"):
-                continue
+                if line.startswith("sequenceDiagram"):
+                    continue
 
-            if line.startswith(("participant ", "actor ")):
-                _, rest = line.split(None, 1)
-                if " as " in rest:
-                    name, label = rest.split(" as ", 1)
-                else:
-                    name, label = rest, None
-                ensure_participant(name.strip(), label.strip() if label else None)
-                continue
+                if line.startswith(("participant ", "actor ")):
+                    _, rest = line.split(None, 1)
+                    if " as " in rest:
+                        name, label = rest.split(" as ", 1)
+                    else:
+                        name, label = rest, None
+                    ensure_participant(name.strip(), label.strip() if label else None)
+                    continue
 
-            if line.startswith("Note over"):
-                prefix, text = line.split(":", 1)
-                _, _, span = prefix.partition("over")
-                span = span.strip()
-                if "," in span:
-                    left, right = (token.strip() for token in span.split(",", 1))
-                else:
-                    left = right = span
-                ensure_participant(left)
-                ensure_participant(right)
-                note = Note(
-                    start_index=min(order.index(left), order.index(right)),
-                    end_index=max(order.index(left), order.index(right)),
-                    text_lines=[segment.strip() for segment in text.strip().split("\\n")],
-                    row_index=row_index,
-                )
-                notes.append(note)
-                row_index += 1
-                continue
+                if line.startswith("Note over"):
+                    yield from flush_pending()
+                    if ":" not in line:
+                        if sink is not None:
+                            sink.report("invalid-note", "Expected 'Note over <participant>[,<participant>]: <text>'")
+                        continue
+                    prefix, text = line.split(":", 1)
+                    _, _, span = prefix.partition("over")
+                    span = span.strip()
+                    if "," in span:
+                        left, right = (token.strip() for token in span.split(",", 1))
+                    else:
+                        left = right = span
+                    ensure_participant(left)
+                    ensure_participant(right)
+                    note = Note(
+                        start_index=min(positions[left], positions[right]),
+                        end_index=max(positions[left], positions[right]),
+                        text_lines=[segment.strip() for segment in text.strip().split("\\n")],
+                        row_index=row_index,
+                    )
+                    yield NOTE, note
+                    row_index += 1
+                    continue
 
-            if line.startswith("activate "):
-                name = line[len("activate ") :].strip()
-                ensure_participant(name)
-                activation_stack.setdefault(name, []).append(row_index)
-                continue
+                if line.startswith("activate "):
+                    yield from flush_pending()
+                    name = line[len("activate ") :].strip()
+                    ensure_participant(name)
+                    activation_stack.setdefault(name, []).append(row_index)
+                    continue
 
-            if line.startswith("deactivate "):
-                name = line[len("deactivate ") :].strip()
-                ensure_participant(name)
-                stack = activation_stack.get(name)
-                if stack:
-                    start = stack.pop()
-                    activations.append(Activation(participant=name, start_row=start, end_row=row_index))
-                continue
+                if line.startswith("deactivate "):
+                    yield from flush_pending()
+                    name = line[len("deactivate ") :].strip()
+                    ensure_participant(name)
+                    stack = activation_stack.get(name)
+                    if stack:
+                        start = stack.pop()
+                        yield ACTIVATION, Activation(participant=name, start_row=start, end_row=row_index)
+                    elif sink is not None:
+                        sink.report("unmatched-deactivate", f"deactivate {name} without a matching activate")
+                    continue
 
-            if any(line.startswith(keyword) for keyword in ("alt", "opt", "loop", "par", "rect")):
-                parts = line.split(None, 1)
-                kind = parts[0]
-                label = parts[1] if len(parts) > 1 else kind.title()
-                fragment_stack.append(
-                    {
-                        "kind": kind,
-                        "label": label,
-                        "start_row": row_index,
-                        "sections": [FragmentSection(label=label, start_row=row_index, end_row=row_index)],
-                    }
-                )
-                continue
+                if any(line.startswith(keyword) for keyword in ("alt", "opt", "loop", "par", "rect")):
+                    yield from flush_pending()
+                    parts = line.split(None, 1)
+                    kind = parts[0]
+                    label = parts[1] if len(parts) > 1 else kind.title()
+                    fragment_stack.append(
+                        {
+                            "kind": kind,
+                            "label": label,
+                            "start_row": row_index,
+                            "sections": [FragmentSection(label=label, start_row=row_index, end_row=row_index)],
+                            "line": line_number,
+                        }
+                    )
+                    continue
 
-            if line.startswith(("else", "and")) and fragment_stack:
-                parts = line.split(None, 1)
-                label = parts[1] if len(parts) > 1 else parts[0].title()
-                frag = fragment_stack[-1]
-                frag["sections"][-1].end_row = row_index
-                frag["sections"].append(FragmentSection(label=label, start_row=row_index, end_row=row_index))
-                continue
+                if line.startswith(("else", "and")) and fragment_stack:
+                    yield from flush_pending()
+                    parts = line.split(None, 1)
+                    label = parts[1] if len(parts) > 1 else parts[0].title()
+                    frag = fragment_stack[-1]
+                    frag["sections"][-1].end_row = row_index
+                    frag["sections"].append(FragmentSection(label=label, start_row=row_index, end_row=row_index))
+                    continue
 
-            if line == "end" and fragment_stack:
-                frag_info = fragment_stack.pop()
-                frag_info["sections"][-1].end_row = row_index
-                fragments.append(
-                    Fragment(
+                if line == "end" and fragment_stack:
+                    yield from flush_pending()
+                    frag_info = fragment_stack.pop()
+                    frag_info["sections"][-1].end_row = row_index
+                    yield FRAGMENT, Fragment(
                         kind=frag_info["kind"],
                         label=frag_info["label"],
                         sections=frag_info["sections"],
                         start_row=frag_info["start_row"],
                         end_row=row_index,
                     )
-                )
-                continue
-
-            if ":" in line and ("->" in line or "--" in line):
-                head, text = line.split(":", 1)
-                text = text.strip()
-                arrow = None
-                for candidate in ("-->>", "->>", "-->", "->", "--", "-x", "--x"):
-                    if candidate in head:
-                        arrow = candidate
-                        left, right = head.split(candidate, 1)
-                        break
-                if not arrow:
                     continue
-                sender = left.strip()
-                receiver = right.strip()
-                ensure_participant(sender)
-                ensure_participant(receiver)
-                dashed = arrow.startswith("--")
-                double_head = arrow.endswith(">>")
-                async_arrow = arrow in ("->>", "-->>", "-x", "--x")
-                messages.append(
-                    Message(
+
+                if ":" in line and ("->" in line or "--" in line):
+                    head, text = line.split(":", 1)
+                    text = text.strip()
+                    arrow = None
+                    for candidate in ("-->>", "->>", "-->", "->", "--", "-x", "--x"):
+                        if candidate in head:
+                            arrow = candidate
+                            left, right = head.split(candidate, 1)
+                            break
+                    if not arrow:
+                        if sink is not None:
+                            sink.report("unknown-arrow", f"No known arrow in {head.strip()!r}")
+                        continue
+                    sender = left.strip()
+                    receiver = right.strip()
+                    ensure_participant(sender)
+                    ensure_participant(receiver)
+                    dashed = arrow.startswith("--")
+                    double_head = arrow.endswith(">>")
+                    async_arrow = arrow in ("->>", "-->>", "-x", "--x")
+                    message = Message(
                         sender=sender,
                         receiver=receiver,
                         text=text,
@@ -222,28 +340,93 @@ class SequenceParser:
                         double_head=double_head,
                         async_arrow=async_arrow,
                     )
-                )
-                row_index += 1
-                continue
-
-            tokens = [segment for segment in line.replace(",", " ").split() if segment]
-            for token in tokens:
-                if token.isidentifier():
-                    ensure_participant(token)
+                    if self.fold_repeats:
+                        pending.append(message)
+                        continue
+                    yield MESSAGE, message
+                    row_index += 1
+                    continue
 
+                yield from flush_pending()
+                if sink is not None:
+                    if line == "end":
+                        sink.report("unmatched-end", "end without an open fragment")
+                    elif line.startswith(("else", "and")):
+                        sink.report("unmatched-else", f"{line.split()[0]} outside a fragment")
+                    else:
+                        sink.report("unparsed-line", f"Not a recognised statement: {line!r}", WARNING)
+                tokens = [segment for segment in line.replace(",", " ").split() if segment]
+                for token in tokens:
+                    if token.isidentifier():
+                        ensure_participant(token)
+            except (ValueError, IndexError, KeyError) as error:
+                if sink is None:
+                    raise
+                sink.report("invalid-statement", f"Cannot parse {line!r} ({type(error).__name__}: {error})")
+
+        yield from flush_pending()
+        if sink is not None:
+            for frag_info in fragment_stack:
+                sink.report("unclosed-fragment", f"{frag_info['kind']} is never closed with end", line=frag_info["line"])
         for name, stack in activation_stack.items():
             while stack:
                 start = stack.pop()
-                activations.append(Activation(participant=name, start_row=start, end_row=row_index))
+                yield ACTIVATION, Activation(participant=name, start_row=start, end_row=row_index)
+
+    def _fold_messages(self, run: List[Message], row_index: int) -> Tuple[List[Message], List[Fragment], int]:
+        """Assign rows to a run of messages, folding repeated blocks into loops.
+
+        At each position the period covering the most messages wins; the
+        first occurrence of the block is kept and its rows are wrapped in a
+        loop fragment. Returns the kept messages, the loops and the next row.
+        """
+        keys = [
+            (m.sender, m.receiver, TIMESTAMP_PATTERN.sub("", m.text), m.dashed, m.double_head, m.async_arrow)
+            for m in run
+        ]
+        kept: List[Message] = []
+        loops: List[Fragment] = []
+        idx = 0
+        while idx < len(run):
+            best_period, best_count = 0, 0
+            for period in range(1, min(self.max_period, (len(run) - idx) // self.min_repeats) + 1):
+                count = 1
+                while keys[idx + count * period : idx + (count + 1) * period] == keys[idx : idx + period]:
+                    count += 1
+                if count >= self.min_repeats and period * count > best_period * best_count:
+                    best_period, best_count = period, count
+            if not best_count:
+                run[idx].row_index = row_index
+                kept.append(run[idx])
+                row_index += 1
+                idx += 1
+                continue
 
-        return (
-            [participants[name] for name in order],
-            messages,
-            notes,
-            activations,
-            fragments,
-            style_overrides,
-        )
+            start_row = row_index
+            for message in run[idx : idx + best_period]:
+                message.row_index = row_index
+                kept.append(message)
+                row_index += 1
+            first = TIMESTAMP_PATTERN.search(" ".join(m.text for m in run[idx : idx + best_period]))
+            last_block = run[idx + (best_count - 1) * best_period : idx + best_count * best_period]
+            last = TIMESTAMP_PATTERN.findall(" ".join(m.text for m in last_block))
+            label = f"×{best_count}"
+            if first and last:
+                label += f" ({first.group()} – {last[-1]})"
+            loops.append(
+                Fragment(
+                    kind="loop",
+                    label=label,
+                    sections=[FragmentSection(label=label, start_row=start_row, end_row=row_index)],
+                    start_row=start_row,
+                    end_row=row_index,
+                    repeat_count=best_count,
+                    first_timestamp=first.group() if first else None,
+                    last_timestamp=last[-1] if last else None,
+                )
+            )
+            idx += best_period * best_count
+        return kept, loops, row_index
 
 
 MARGIN = 60.0
@@ -258,6 +441,10 @@ FONT_FAMILY = "Helvetica Neue, Arial, sans-serif"
 NOTE_PADDING = 14.0
 NOTE_LINE_HEIGHT = 16.0
 ACTIVATION_WIDTH = 16.0
+# Rough glyph width of 13px message text, for hit-test boxes.
+MESSAGE_CHAR_WIDTH = 7.0
+# In-memory size of each render_stream() layer before it spills to disk.
+STREAM_SPOOL_BYTES = 1 << 20
 
 DEFAULT_STYLE = {
     "participantFill": "#ffffff",
@@ -283,72 +470,222 @@ class SequenceRenderer:
         activations: List[Activation],
         fragments: List[Fragment],
         style_overrides: Dict[str, str],
+        layout: Optional[SequenceLayout] = None,
     ) -> str:
-        canvas = self._compute_layout(participants, messages, notes)
+        if layout is None:
+            layout = self.layout(participants, messages, notes)
         style = {**DEFAULT_STYLE, **style_overrides}
-        return self._render_svg(participants, messages, notes, activations, fragments, canvas, style)
+        return self._render_svg(participants, messages, notes, activations, fragments, layout, style)
 
-    def _estimate_width(self, label: str) -> float:
-        return max(140.0, len(label) * 7 + 40)
+    def render_stream(
+        self,
+        open_lines: Callable[[], Iterable[str]],
+        out: TextIO,
+        parser: Optional[SequenceParser] = None,
+        spool_bytes: int = STREAM_SPOOL_BYTES,
+    ) -> None:
+        """Write the same SVG as render() without collecting the diagram.
+
+        ``open_lines`` is called twice and must give the same source both
+        times. The first pass only finds the participants and the canvas
+        size. The second lays out and writes each row as it is read,
+        holding just the open activations and fragments. Fragments, messages
+        and notes go to spooled layers so the drawing order matches render().
+        """
+        parser = parser or SequenceParser()
+        found: Dict[str, Participant] = {}
+        style_overrides: Dict[str, str] = {}
+        total_rows = 1
+        # A note's right edge depends only on its participant span and its
+        # bottom only on row and height, so one note per span sizes the canvas.
+        lowest: Dict[Tuple[int, int], Note] = {}
+        for kind, item in parser._iter_sequence(parser._numbered_lines(open_lines()), found, style_overrides):
+            if kind == MESSAGE:
+                total_rows = max(total_rows, item.row_index + 1)
+            elif kind == NOTE:
+                total_rows = max(total_rows, item.row_index + 1)
+                span = (item.start_index, item.end_index)
+                kept = lowest.get(span)
+                if kept is None or self._note_bottom(item) > self._note_bottom(kept):
+                    lowest[span] = item
+
+        participants = list(found.values())
+        boxes = self._participant_boxes(participants)
+        width, height = self._canvas(boxes, total_rows)
+        for note in lowest.values():
+            note_box = self._note_box(note, boxes)
+            width = max(width, note_box.x + note_box.width + MARGIN / 2)
+            height = max(height, note_box.y + note_box.height + MARGIN / 2)
+        layout = SequenceLayout(
+            canvas=(width, height),
+            participants={participant.name: box for participant, box in zip(participants, boxes)},
+            notes=[],
+        )
+        style = {**DEFAULT_STYLE, **style_overrides}
 
-    def _compute_layout(
+        def write(target: TextIO, lines: List[str]) -> None:
+            target.write("\n".join(lines))
+            target.write("\n")
+
+        write(out, self._svg_head(layout, style))
+        for participant in participants:
+            write(out, self._participant_lines(participant, layout.participants[participant.name], height, style))
+
+        def spool():
+            return tempfile.SpooledTemporaryFile(max_size=spool_bytes, mode="w+", encoding="utf-8", newline="")
+
+        with spool() as fragment_layer, spool() as message_layer, spool() as note_layer:
+            activation_idx = fragment_idx = 0
+            for kind, item in parser._iter_sequence(parser._numbered_lines(open_lines()), {}, {}):
+                if kind == MESSAGE:
+                    sender, receiver = layout.participants[item.sender], layout.participants[item.receiver]
+                    write(message_layer, self._message_lines(item, sender, receiver, style))
+                elif kind == NOTE:
+                    write(note_layer, self._note_lines(item, self._note_box(item, boxes), style))
+                elif kind == ACTIVATION:
+                    rect = self.activation_rect(item, layout)
+                    if rect:
+                        write(out, self._activation_lines(activation_idx, rect, style))
+                    activation_idx += 1
+                else:
+                    rect = self.fragment_rect(item, participants, layout)
+                    write(fragment_layer, self._fragment_lines(fragment_idx, item, rect, style))
+                    fragment_idx += 1
+            for layer in (fragment_layer, message_layer, note_layer):
+                layer.seek(0)
+                shutil.copyfileobj(layer, out)
+        out.write("</svg>\n")
+
+    def render_bytes(
         self,
         participants: List[Participant],
         messages: List[Message],
         notes: List[Note],
-    ) -> Tuple[float, float]:
-        current_x = MARGIN
+        activations: List[Activation],
+        fragments: List[Fragment],
+        style_overrides: Dict[str, str],
+        layout: Optional[SequenceLayout] = None,
+    ) -> memoryview:
+        """The SVG from render(), UTF-8 encoded and wrapped in a memoryview."""
+        if layout is None:
+            layout = self.layout(participants, messages, notes)
+        style = {**DEFAULT_STYLE, **style_overrides}
+        lines = self._svg_lines(participants, messages, notes, activations, fragments, layout, style)
+        return memoryview("\n".join(lines).encode("utf-8"))
+
+    def layout(
+        self,
+        participants: List[Participant],
+        messages: List[Message],
+        notes: List[Note],
+    ) -> SequenceLayout:
+        return self._compute_layout(participants, messages, notes)
+
+    def element_rects(
+        self,
+        participants: List[Participant],
+        messages: List[Message],
+        notes: List[Note],
+        layout: SequenceLayout,
+    ) -> Iterator[Tuple[str, Union[str, int], Rect]]:
+        """(kind, key, bounding box) of participants, messages and notes, in paint order.
+
+        element_id(kind, key) is the element's group id in the SVG.
+        """
+        boxes = layout.participants
         for participant in participants:
-            participant.width = self._estimate_width(participant.label)
-            participant.x = current_x + participant.width / 2
-            current_x += participant.width + COLUMN_GAP
+            box = boxes[participant.name]
+            yield "participant", participant.name, (box.x - box.width / 2, MARGIN / 2, box.width, HEADER_HEIGHT)
 
-        if participants:
-            min_left = min(p.x - p.width / 2 for p in participants)
-            if min_left < MARGIN / 2:
-                shift = (MARGIN / 2) - min_left
-                for participant in participants:
-                    participant.x += shift
-            min_left = min(p.x - p.width / 2 for p in participants)
-            max_right = max(p.x + p.width / 2 for p in participants)
-        else:
-            min_left = MARGIN / 2
-            max_right = MARGIN
+        for message in messages:
+            sender = boxes.get(message.sender)
+            receiver = boxes.get(message.receiver)
+            if not sender or not receiver:
+                continue
+            y = self.message_y(message.row_index)
+            if message.sender == message.receiver:
+                line = bounding_rect(((sender.x, y - 40), (sender.x + 80, y + 40)))
+                label_x = sender.x + 40
+            else:
+                line = bounding_rect(((sender.x, y - 6), (receiver.x, y + 6)))
+                label_x = (sender.x + receiver.x) / 2
+            text_width = len(message.text) * MESSAGE_CHAR_WIDTH
+            yield "message", message.row_index, union_rect(line, (label_x - text_width / 2, y - 28, text_width, 20))
+
+        for note, note_box in zip(notes, layout.notes):
+            yield "note", note.row_index, (note_box.x, note_box.y, note_box.width, note_box.height)
+
+    def _estimate_width(self, label: str) -> float:
+        return max(140.0, len(label) * 7 + 40)
 
+    def _compute_layout(
+        self,
+        participants: List[Participant],
+        messages: List[Message],
+        notes: List[Note],
+    ) -> SequenceLayout:
+        boxes = self._participant_boxes(participants)
         total_rows = 1 + max(
             [msg.row_index for msg in messages]
             + [note.row_index for note in notes]
             if messages or notes
             else [0]
         )
-        body_height = MESSAGE_BASELINE + total_rows * MESSAGE_GAP + LIFELINE_EXTRA
-        width = max(max_right + MARGIN / 2, (MARGIN * 2 + 200))
+        width, body_height = self._canvas(boxes, total_rows)
 
+        note_boxes: List[NoteBox] = []
         for note in notes:
-            width_span = sum(p.width for p in participants[note.start_index : note.end_index + 1]) + (
-                note.end_index - note.start_index
-            ) * COLUMN_GAP
-            note.width = max(200.0, width_span - 40)
-            note.height = max(48.0, len(note.text_lines) * NOTE_LINE_HEIGHT + 2 * NOTE_PADDING)
-            start_x = participants[note.start_index].x - participants[note.start_index].width / 2
-            note.x = start_x + (width_span - note.width) / 2
-            note.x = max(MARGIN / 2, note.x)
-            note.y = NOTE_BASELINE + note.row_index * MESSAGE_GAP
-            width = max(width, note.x + note.width + MARGIN / 2)
-            body_height = max(body_height, note.y + note.height + MARGIN / 2)
-
-        return width, body_height
-
-    def _svg_escape(self, value: str) -> str:
-        return (
-            value.replace("&", "&amp;")
-            .replace("<", "&lt;")
-            .replace(">", "&gt;")
-            .replace('"', "&quot;")
-            .replace("'", "&apos;")
+            note_box = self._note_box(note, boxes)
+            width = max(width, note_box.x + note_box.width + MARGIN / 2)
+            body_height = max(body_height, note_box.y + note_box.height + MARGIN / 2)
+            note_boxes.append(note_box)
+
+        return SequenceLayout(
+            canvas=(width, body_height),
+            participants={participant.name: box for participant, box in zip(participants, boxes)},
+            notes=note_boxes,
         )
 
-    def _message_y(self, row_index: int) -> float:
+    def _participant_boxes(self, participants: List[Participant]) -> List[ParticipantBox]:
+        boxes: List[ParticipantBox] = []
+        current_x = MARGIN
+        for participant in participants:
+            width = self._estimate_width(participant.label)
+            boxes.append(ParticipantBox(x=current_x + width / 2, width=width))
+            current_x += width + COLUMN_GAP
+
+        if boxes:
+            min_left = min(box.x - box.width / 2 for box in boxes)
+            if min_left < MARGIN / 2:
+                shift = (MARGIN / 2) - min_left
+                for box in boxes:
+                    box.x += shift
+        return boxes
+
+    def _canvas(self, boxes: List[ParticipantBox], total_rows: int) -> Tuple[float, float]:
+        """Canvas size before notes are accounted for."""
+        max_right = max(box.x + box.width / 2 for box in boxes) if boxes else MARGIN
+        body_height = MESSAGE_BASELINE + total_rows * MESSAGE_GAP + LIFELINE_EXTRA
+        return max(max_right + MARGIN / 2, (MARGIN * 2 + 200)), body_height
+
+    def _note_box(self, note: Note, boxes: List[ParticipantBox]) -> NoteBox:
+        width_span = sum(box.width for box in boxes[note.start_index : note.end_index + 1]) + (
+            note.end_index - note.start_index
+        ) * COLUMN_GAP
+        note_box = NoteBox(width=max(200.0, width_span - 40), height=self._note_height(note))
+        start_x = boxes[note.start_index].x - boxes[note.start_index].width / 2
+        note_box.x = start_x + (width_span - note_box.width) / 2
+        note_box.x = max(MARGIN / 2, note_box.x)
+        note_box.y = NOTE_BASELINE + note.row_index * MESSAGE_GAP
+        return note_box
+
+    def _note_height(self, note: Note) -> float:
+        return max(48.0, len(note.text_lines) * NOTE_LINE_HEIGHT + 2 * NOTE_PADDING)
+
+    def _note_bottom(self, note: Note) -> float:
+        return NOTE_BASELINE + note.row_index * MESSAGE_GAP + self._note_height(note)
+
+    def message_y(self, row_index: int) -> float:
         return MESSAGE_BASELINE + row_index * MESSAGE_GAP
 
     def _render_self_message(self, x: float, y: float, text: str, async_arrow: bool, dashed: bool, style: Dict[str, str]):
@@ -359,41 +696,132 @@ class SequenceRenderer:
         return [
             f'<path d="M {x:.2f} {y:.2f} C {x + dx:.2f} {y - curve_height:.2f}, {x + dx:.2f} {y + curve_height:.2f}, {x:.2f} {y + curve_height:.2f}" '
             f'stroke="{style["message"]}" stroke-width="2" fill="none" {dash_attr} marker-end="url(#{marker})"/>',
-            f'<text x="{x + dx/2:.2f}" y="{y - 14:.2f}" text-anchor="middle" font-size="13" font-family="{FONT_FAMILY}" fill="{style["message"]}">{self._svg_escape(text)}</text>',
+            f'<text x="{x + dx/2:.2f}" y="{y - 14:.2f}" text-anchor="middle" font-size="13" font-family="{FONT_FAMILY}" fill="{style["message"]}">{svg_escape(text)}</text>',
         ]
 
+    def activation_rect(
+        self, activation: Activation, layout: SequenceLayout
+    ) -> Optional[Tuple[float, float, float, float]]:
+        box = layout.participants.get(activation.participant)
+        if not box:
+            return None
+        start_y = self.message_y(activation.start_row) - MESSAGE_GAP / 2 + 10
+        end_y = self.message_y(activation.end_row) + MESSAGE_GAP / 2 - 10
+        return box.x - ACTIVATION_WIDTH / 2, start_y, ACTIVATION_WIDTH, max(20.0, end_y - start_y)
+
+    def fragment_rect(
+        self, fragment: Fragment, participants: List[Participant], layout: SequenceLayout
+    ) -> Tuple[float, float, float, float]:
+        first = layout.participants[participants[0].name]
+        last = layout.participants[participants[-1].name]
+        left = first.x - first.width / 2
+        total_width = last.x + last.width / 2 - left
+        top = self.message_y(fragment.start_row) - MESSAGE_GAP / 2
+        bottom = self.message_y(fragment.end_row) + MESSAGE_GAP / 2
+        return left, top, total_width, bottom - top
+
+    def section_label_ys(self, fragment: Fragment, top: float) -> List[float]:
+        label_ys: List[float] = []
+        section_top = top
+        for section in fragment.sections:
+            label_ys.append(section_top + 40)
+            section_top = self.message_y(section.end_row)
+        return label_ys
+
     def _render_fragments(
         self,
         participants: List[Participant],
         fragments: List[Fragment],
-        canvas_height: float,
+        layout: SequenceLayout,
         style: Dict[str, str],
     ) -> List[str]:
         lines: List[str] = []
-        total_width = (
-            participants[-1].x
-            + participants[-1].width / 2
-            - (participants[0].x - participants[0].width / 2)
-        )
-        left = participants[0].x - participants[0].width / 2
-        for fragment in fragments:
-            top = self._message_y(fragment.start_row) - MESSAGE_GAP / 2
-            bottom = self._message_y(fragment.end_row) + MESSAGE_GAP / 2
-            height = bottom - top
+        for idx, fragment in enumerate(fragments):
+            lines.extend(self._fragment_lines(idx, fragment, self.fragment_rect(fragment, participants, layout), style))
+        return lines
+
+    def _fragment_lines(
+        self,
+        idx: int,
+        fragment: Fragment,
+        rect: Tuple[float, float, float, float],
+        style: Dict[str, str],
+    ) -> List[str]:
+        left, top, total_width, height = rect
+        lines = [
+            f'<g id="{element_id("fragment", idx)}">',
+            f'<rect x="{left:.2f}" y="{top:.2f}" width="{total_width:.2f}" height="{height:.2f}" '
+            f'stroke="{style["fragmentStroke"]}" fill="{style["fragmentFill"]}" opacity="0.6" stroke-dasharray="8 6"/>',
+            f'<text x="{left + 12:.2f}" y="{top + 20:.2f}" font-size="13" font-weight="600" font-family="{FONT_FAMILY}" fill="{style["fragmentStroke"]}">{svg_escape(fragment.kind.upper())}: {svg_escape(fragment.label)}</text>',
+        ]
+        for section, label_y in zip(fragment.sections, self.section_label_ys(fragment, top)):
             lines.append(
-                f'<rect x="{left:.2f}" y="{top:.2f}" width="{total_width:.2f}" height="{height:.2f}" '
-                f'stroke="{style["fragmentStroke"]}" fill="{style["fragmentFill"]}" opacity="0.6" stroke-dasharray="8 6"/>'
+                f'<text x="{left + 20:.2f}" y="{label_y:.2f}" font-size="12" font-family="{FONT_FAMILY}" fill="{style["fragmentStroke"]}">{svg_escape(section.label)}</text>'
             )
+        lines.append("</g>")
+        return lines
+
+    def _participant_lines(
+        self, participant: Participant, box: ParticipantBox, height: float, style: Dict[str, str]
+    ) -> List[str]:
+        x = box.x
+        header_y = MARGIN / 2
+        return [
+            f'<g id="{element_id("participant", participant.name)}">',
+            f'<line x1="{x:.2f}" y1="{LIFELINE_TOP:.2f}" x2="{x:.2f}" y2="{height - MARGIN / 2:.2f}" '
+            f'stroke="{style["lifeline"]}" stroke-width="2" stroke-dasharray="6 4"/>',
+            f'<rect x="{x - box.width/2:.2f}" y="{header_y:.2f}" width="{box.width:.2f}" height="{HEADER_HEIGHT:.2f}" '
+            f'stroke="{style["participantStroke"]}" fill="{style["participantFill"]}" stroke-width="2"/>',
+            f'<text x="{x:.2f}" y="{header_y + HEADER_HEIGHT/2:.2f}" text-anchor="middle" '
+            f'font-size="14" font-family="{FONT_FAMILY}" fill="{style["participantText"]}" dominant-baseline="middle">{svg_escape(participant.label)}</text>',
+            "</g>",
+        ]
+
+    def _activation_lines(
+        self, idx: int, rect: Tuple[float, float, float, float], style: Dict[str, str]
+    ) -> List[str]:
+        rect_x, rect_y, rect_width, rect_height = rect
+        return [
+            f'<g id="{element_id("activation", idx)}">',
+            f'<rect x="{rect_x:.2f}" y="{rect_y:.2f}" width="{rect_width:.2f}" height="{rect_height:.2f}" '
+            f'fill="{style["activation"]}" stroke="{style["activationStroke"]}" stroke-width="1.5" opacity="0.85"/>',
+            "</g>",
+        ]
+
+    def _message_lines(
+        self, message: Message, sender: ParticipantBox, receiver: ParticipantBox, style: Dict[str, str]
+    ) -> List[str]:
+        y = self.message_y(message.row_index)
+        x1 = sender.x
+        x2 = receiver.x
+        lines = [f'<g id="{element_id("message", message.row_index)}">']
+        if message.sender == message.receiver:
+            lines.extend(self._render_self_message(x1, y, message.text, message.async_arrow, message.dashed, style))
+        else:
+            dash_attr = 'stroke-dasharray="6 4"' if message.dashed else ""
+            marker = "doublehead" if message.double_head else "arrowhead"
+            label_x = (x1 + x2) / 2
             lines.append(
-                f'<text x="{left + 12:.2f}" y="{top + 20:.2f}" font-size="13" font-weight="600" font-family="{FONT_FAMILY}" fill="{style["fragmentStroke"]}">{self._svg_escape(fragment.kind.upper())}: {self._svg_escape(fragment.label)}</text>'
+                f'<line x1="{x1:.2f}" y1="{y:.2f}" x2="{x2:.2f}" y2="{y:.2f}" stroke="{style["message"]}" stroke-width="2" {dash_attr} marker-end="url(#{marker})"/>'
             )
-            section_top = top
-            for section in fragment.sections:
-                section_bottom = self._message_y(section.end_row)
-                lines.append(
-                    f'<text x="{left + 20:.2f}" y="{section_top + 40:.2f}" font-size="12" font-family="{FONT_FAMILY}" fill="{style["fragmentStroke"]}">{self._svg_escape(section.label)}</text>'
-                )
-                section_top = section_bottom
+            lines.append(
+                f'<text x="{label_x:.2f}" y="{y - 12:.2f}" text-anchor="middle" font-size="13" font-family="{FONT_FAMILY}" fill="{style["message"]}">{svg_escape(message.text)}</text>'
+            )
+        lines.append("</g>")
+        return lines
+
+    def _note_lines(self, note: Note, note_box: NoteBox, style: Dict[str, str]) -> List[str]:
+        lines = [
+            f'<g id="{element_id("note", note.row_index)}">',
+            f'<rect x="{note_box.x:.2f}" y="{note_box.y:.2f}" width="{note_box.width:.2f}" height="{note_box.height:.2f}" '
+            f'rx="8" ry="8" fill="{style["noteFill"]}" stroke="{style["noteStroke"]}" stroke-width="2"/>',
+        ]
+        for idx, text_line in enumerate(note.text_lines):
+            lines.append(
+                f'<text x="{note_box.x + note_box.width/2:.2f}" y="{note_box.y + NOTE_PADDING + idx * NOTE_LINE_HEIGHT + NOTE_LINE_HEIGHT/2:.2f}" '
+                f'text-anchor="middle" font-size="12" font-family="{FONT_FAMILY}" fill="{style["noteText"]}" dominant-baseline="middle">{svg_escape(text_line)}</text>'
+            )
+        lines.append("</g>")
         return lines
 
     def _render_svg(
@@ -403,11 +831,14 @@ class SequenceRenderer:
         notes: List[Note],
         activations: List[Activation],
         fragments: List[Fragment],
-        canvas: Tuple[float, float],
+        layout: SequenceLayout,
         style: Dict[str, str],
     ) -> str:
-        width, height = canvas
-        lines: List[str] = [
+        return "\n".join(self._svg_lines(participants, messages, notes, activations, fragments, layout, style))
+
+    def _svg_head(self, layout: SequenceLayout, style: Dict[str, str]) -> List[str]:
+        width, height = layout.canvas
+        return [
             '<?xml version="1.0" encoding="UTF-8"?>',
             f'<svg xmlns="http://www.w3.org/2000/svg" width="{math.ceil(width)}" height="{math.ceil(height)}" viewBox="0 0 {math.ceil(width)} {math.ceil(height)}">',
             "<defs>",
@@ -420,66 +851,51 @@ class SequenceRenderer:
             "</defs>",
         ]
 
+    def _svg_lines(
+        self,
+        participants: List[Participant],
+        messages: List[Message],
+        notes: List[Note],
+        activations: List[Activation],
+        fragments: List[Fragment],
+        layout: SequenceLayout,
+        style: Dict[str, str],
+    ) -> List[str]:
+        width, height = layout.canvas
+        boxes = layout.participants
+        lines = self._svg_head(layout, style)
+
         for participant in participants:
-            x = participant.x
-            header_y = MARGIN / 2
-            lines.append(
-                f'<line x1="{x:.2f}" y1="{LIFELINE_TOP:.2f}" x2="{x:.2f}" y2="{height - MARGIN / 2:.2f}" '
-                f'stroke="{style["lifeline"]}" stroke-width="2" stroke-dasharray="6 4"/>'
-            )
-            lines.append(
-                f'<rect x="{x - participant.width/2:.2f}" y="{header_y:.2f}" width="{participant.width:.2f}" height="{HEADER_HEIGHT:.2f}" '
-                f'stroke="{style["participantStroke"]}" fill="{style["participantFill"]}" stroke-width="2"/>'
-            )
-            lines.append(
-                f'<text x="{x:.2f}" y="{header_y + HEADER_HEIGHT/2:.2f}" text-anchor="middle" '
-                f'font-size="14" font-family="{FONT_FAMILY}" fill="{style["participantText"]}" dominant-baseline="middle">{self._svg_escape(participant.label)}</text>'
-            )
+            lines.extend(self._participant_lines(participant, boxes[participant.name], height, style))
 
-        for activation in activations:
-            participant = next((p for p in participants if p.name == activation.participant), None)
-            if not participant:
-                continue
-            start_y = self._message_y(activation.start_row) - MESSAGE_GAP / 2 + 10
-            end_y = self._message_y(activation.end_row) + MESSAGE_GAP / 2 - 10
-            lines.append(
-                f'<rect x="{participant.x - ACTIVATION_WIDTH/2:.2f}" y="{start_y:.2f}" width="{ACTIVATION_WIDTH:.2f}" height="{max(20.0, end_y - start_y):.2f}" '
-                f'fill="{style["activation"]}" stroke="{style["activationStroke"]}" stroke-width="1.5" opacity="0.85"/>'
-            )
+        for idx, activation in enumerate(activations):
+            rect = self.activation_rect(activation, layout)
+            if rect:
+                lines.extend(self._activation_lines(idx, rect, style))
 
-        lines.extend(self._render_fragments(participants, fragments, height, style))
+        lines.extend(self._render_fragments(participants, fragments, layout, style))
 
         for message in messages:
-            sender = next((p for p in participants if p.name == message.sender), None)
-            receiver = next((p for p in participants if p.name == message.receiver), None)
-            if not sender or not receiver:
-                continue
-            y = self._message_y(message.row_index)
-            x1 = sender.x
-            x2 = receiver.x
-            dash_attr = 'stroke-dasharray="6 4"' if message.dashed else ""
-            marker = "doublehead" if message.double_head else "arrowhead"
-            if sender.name == receiver.name:
-                lines.extend(self._render_self_message(x1, y, message.text, message.async_arrow, message.dashed, style))
-                continue
-            lines.append(
-                f'<line x1="{x1:.2f}" y1="{y:.2f}" x2="{x2:.2f}" y2="{y:.2f}" stroke="{style["message"]}" stroke-width="2" {dash_attr} marker-end="url(#{marker})"/>'
-            )
-            label_x = (x1 + x2) / 2
-            lines.append(
-                f'<text x="{label_x:.2f}" y="{y - 12:.2f}" text-anchor="middle" font-size="13" font-family="{FONT_FAMILY}" fill="{style["message"]}">{self._svg_escape(message.text)}</text>'
-            )
+            sender = boxes.get(message.sender)
+            receiver = boxes.get(message.receiver)
+            if sender and receiver:
+                lines.extend(self._message_lines(message, sender, receiver, style))
+
+        for note, note_box in zip(notes, layout.notes):
+            lines.extend(self._note_lines(note, note_box, style))
+
+        lines.extend(("</svg>", ""))
+        return lines
 
-        for note in notes:
-            lines.append(
-                f'<rect x="{note.x:.2f}" y="{note.y:.2f}" width="{note.width:.2f}" height="{note.height:.2f}" '
-                f'rx="8" ry="8" fill="{style["noteFill"]}" stroke="{style["noteStroke"]}" stroke-width="2"/>'
-            )
-            for idx, text_line in enumerate(note.text_lines):
-                lines.append(
-                    f'<text x="{note.x + note.width/2:.2f}" y="{note.y + NOTE_PADDING + idx * NOTE_LINE_HEIGHT + NOTE_LINE_HEIGHT/2:.2f}" '
-                    f'text-anchor="middle" font-size="12" font-family="{FONT_FAMILY}" fill="{style["noteText"]}" dominant-baseline="middle">{self._svg_escape(text_line)}</text>'
-                )
 
-        lines.append("</svg>")
-        return "\n".join(lines) + "\n"
+def stream_sequence_file(
+    path: PathLike,
+    out: TextIO,
+    parser: Optional[SequenceParser] = None,
+    renderer: Optional[SequenceRenderer] = None,
+    use_mmap: bool = False,
+    encoding: str = "utf-8",
+) -> None:
+    """Render a sequence diagram file to ``out`` in bounded memory; see SequenceRenderer.render_stream."""
+    renderer = renderer or SequenceRenderer()
+    renderer.render_stream(lambda: iter_file_lines(path, use_mmap=use_mmap, encoding=encoding), out, parser)
@@ -0,0 +1,239 @@
+"""Manifest-driven batch rendering split into shards across processes or machines.
+
+Each shard renders the manifest entries whose digest maps to it and writes
+content-addressed outputs (``<digest>.svg``) into a shared directory, so any
+shard can be re-run and skips work already done. ``merge`` checks that every
+entry has an output and totals the per-shard reports.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from py_mermaid.src.pipeline import render_diagram, render_many, source_digest
+from py_mermaid.src.utils import PathLike
+from py_mermaid.src.watch import OUTPUT_SUFFIX, SOURCE_PATTERN
+
+MANIFEST_VERSION = 1
+REPORT_DIR = "shards"
+
+
+@dataclass
+class ManifestEntry:
+    path: str
+    digest: str
+
+
+@dataclass
+class ShardReport:
+    index: int
+    count: int
+    assigned: int = 0
+    rendered: int = 0
+    skipped: int = 0
+    # (manifest path, error message)
+    failed: List[Tuple[str, str]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+@dataclass
+class MergeReport:
+    total: int
+    missing: List[str]
+    missing_shards: List[int]
+    shards: List[ShardReport]
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing and not self.missing_shards
+
+    @property
+    def elapsed(self) -> float:
+        """Wall time of the slowest shard, i.e. of the whole job when shards run in parallel."""
+        return max((report.elapsed for report in self.shards), default=0.0)
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """``"i/n"`` -> (i, n) with 0 <= i < n."""
+    index, _, count = spec.partition("/")
+    try:
+        shard = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Shard must look like i/n, got {spec!r}") from None
+    if not 0 <= shard[0] < shard[1]:
+        raise ValueError(f"Shard index out of range: {spec!r}")
+    return shard
+
+
+def shard_of(digest: str, count: int) -> int:
+    # Keyed by content, so identical sources land on the same shard and
+    # adding files never moves existing ones between shards.
+    return int(digest[:16], 16) % count
+
+
+def output_path(out_dir: PathLike, digest: str) -> Path:
+    return Path(out_dir) / f"{digest}{OUTPUT_SUFFIX}"
+
+
+def build_manifest(root: PathLike, pattern: str = SOURCE_PATTERN) -> List[ManifestEntry]:
+    root = Path(root)
+    return [
+        ManifestEntry(path=path.relative_to(root).as_posix(), digest=source_digest(path.read_text(encoding="utf-8")))
+        for path in sorted(root.rglob(pattern))
+    ]
+
+
+def write_manifest(entries: List[ManifestEntry], path: PathLike, root: Optional[PathLike] = None) -> None:
+    payload = {
+        "version": MANIFEST_VERSION,
+        "root": str(root) if root is not None else None,
+        "entries": [[entry.path, entry.digest] for entry in entries],
+    }
+    _write_atomic(Path(path), json.dumps(payload, separators=(",", ":")))
+
+
+def load_manifest(path: PathLike) -> Tuple[Optional[str], List[ManifestEntry]]:
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    if payload.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported manifest version: {payload.get('version')!r}")
+    return payload["root"], [ManifestEntry(path=item[0], digest=item[1]) for item in payload["entries"]]
+
+
+def run_shard(
+    entries: List[ManifestEntry],
+    root: PathLike,
+    out_dir: PathLike,
+    index: int,
+    count: int,
+    workers: int = 0,
+    use_processes: bool = False,
+    render: Callable[[str], str] = render_diagram,
+) -> ShardReport:
+    """Render this shard's missing outputs and record a report under ``out_dir/shards``."""
+    started = time.perf_counter()
+    root, out_dir = Path(root), Path(out_dir)
+    report = ShardReport(index=index, count=count)
+    pending: Dict[str, ManifestEntry] = {}
+    for entry in entries:
+        if shard_of(entry.digest, count) != index:
+            continue
+        report.assigned += 1
+        if entry.digest in pending or output_path(out_dir, entry.digest).exists():
+            report.skipped += 1
+        else:
+            pending[entry.digest] = entry
+
+    # Sources are read as render_many pulls them; todo[i] is the entry of text i.
+    todo: List[ManifestEntry] = []
+
+    def texts() -> Iterator[str]:
+        for digest, entry in pending.items():
+            text = (root / entry.path).read_text(encoding="utf-8")
+            if source_digest(text) != digest:
+                report.failed.append((entry.path, "source changed since the manifest was built"))
+                continue
+            todo.append(entry)
+            yield text
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for result in render_many(texts(), workers=workers, use_processes=use_processes, render=render):
+        entry = todo[result.index]
+        if result.ok:
+            _write_atomic(output_path(out_dir, entry.digest), result.output)
+            report.rendered += 1
+        else:
+            report.failed.append((entry.path, f"{type(result.error).__name__}: {result.error}"))
+
+    report.elapsed = time.perf_counter() - started
+    _write_atomic(_report_path(out_dir, index, count), json.dumps(asdict(report)))
+    return report
+
+
+def merge(entries: List[ManifestEntry], out_dir: PathLike, count: int) -> MergeReport:
+    out_dir = Path(out_dir)
+    shards: List[ShardReport] = []
+    missing_shards: List[int] = []
+    for index in range(count):
+        path = _report_path(out_dir, index, count)
+        if not path.exists():
+            missing_shards.append(index)
+            continue
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        payload["failed"] = [tuple(item) for item in payload["failed"]]
+        shards.append(ShardReport(**payload))
+    missing = [entry.path for entry in entries if not output_path(out_dir, entry.digest).exists()]
+    return MergeReport(total=len(entries), missing=missing, missing_shards=missing_shards, shards=shards)
+
+
+def _report_path(out_dir: Path, index: int, count: int) -> Path:
+    return out_dir / REPORT_DIR / f"{index}-of-{count}.json"
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Per-process temp name: several shards may share the directory.
+    temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temp.write_text(text, encoding="utf-8")
+    os.replace(temp, path)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m py_mermaid.src.shard")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("manifest", help="hash every source under ROOT into MANIFEST")
+    build.add_argument("root")
+    build.add_argument("manifest")
+    build.add_argument("--pattern", default=SOURCE_PATTERN)
+
+    run = commands.add_parser("run", help="render one shard of MANIFEST into OUT")
+    run.add_argument("manifest")
+    run.add_argument("out")
+    run.add_argument("--shard", type=parse_shard, default=(0, 1), metavar="i/n")
+    run.add_argument("--root", help="source root (defaults to the one stored in the manifest)")
+    run.add_argument("--workers", type=int, default=0)
+    run.add_argument("--processes", action="store_true")
+
+    check = commands.add_parser("merge", help="validate OUT against MANIFEST and total shard timings")
+    check.add_argument("manifest")
+    check.add_argument("out")
+    check.add_argument("--shards", type=int, required=True)
+
+    args = parser.parse_args(argv)
+    if args.command == "manifest":
+        entries = build_manifest(args.root, args.pattern)
+        write_manifest(entries, args.manifest, root=Path(args.root).resolve())
+        print(f"{len(entries)} entries")
+        return 0
+
+    root, entries = load_manifest(args.manifest)
+    if args.command == "run":
+        if args.root is None and root is None:
+            parser.error("the manifest stores no root; pass --root")
+        index, count = args.shard
+        report = run_shard(
+            entries, args.root or root, args.out, index, count, workers=args.workers, use_processes=args.processes
+        )
+        print(
+            f"shard {index}/{count}: {report.rendered} rendered, {report.skipped} skipped, "
+            f"{len(report.failed)} failed in {report.elapsed:.2f}s"
+        )
+        return 1 if report.failed else 0
+
+    result = merge(entries, args.out, args.shards)
+    for report in result.shards:
+        print(f"shard {report.index}/{report.count}: {report.rendered} rendered, {report.skipped} skipped, "
+              f"{len(report.failed)} failed in {report.elapsed:.2f}s")
+    if result.missing_shards:
+        print(f"no report from shards {result.missing_shards}")
+    print(f"{result.total - len(result.missing)}/{result.total} outputs present, slowest shard {result.elapsed:.2f}s")
+    return 0 if result.complete else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
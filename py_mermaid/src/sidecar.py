@@ -0,0 +1,180 @@
+"""Hit-test and label-search index shipped next to a rendered SVG.
+
+Items are the bounding boxes of nodes, edges, notes, participants and
+messages in paint order, keyed by the ``<g id>`` of their SVG group.
+``levels`` buckets item indexes on grids whose cells grow by ``fanout``
+per level ("col,row" -> indexes); each item sits on the level matching its
+size, so long edges stay a few entries and a point lookup reads one cell
+per level. ``tokens`` is sorted, so a client can binary-search
+words and prefixes and read the matching ``postings``. HitIndex runs the
+same queries in Python.
+"""
+from __future__ import annotations
+
+import math
+import re
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from py_mermaid.src.db import ColumnMeta, Edge, FlowchartLayout, Node, Note
+from py_mermaid.src.escape import element_id
+from py_mermaid.src.renderer import Renderer
+from py_mermaid.src.sequence import (
+    Activation,
+    Fragment,
+    Message,
+    Participant,
+    SequenceLayout,
+    SequenceRenderer,
+)
+from py_mermaid.src.sequence import Note as SequenceNote
+from py_mermaid.src.spatial import LEVEL_FANOUT, LayeredSpatialHash, Rect
+from py_mermaid.src.utils import compact_number
+
+SIDECAR_SCHEMA_VERSION = 1
+SIDECAR_FIELDS = {"items": ["id", "kind", "x", "y", "width", "height"]}
+# Boxes are grown by this much so thin lines can still be hit.
+HIT_SLOP = 3.0
+MIN_CELL_SIZE = 32.0
+# Grid cells are sized for about this many items each.
+ITEMS_PER_CELL = 4
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# (kind, key, bounding box, searchable text)
+Element = Tuple[str, Union[str, int], Rect, str]
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def flowchart_sidecar(
+    node_map: Dict[str, Node],
+    edges: List[Edge],
+    column_meta: List[ColumnMeta],
+    styles: Dict[str, Dict[str, str]],
+    notes: List[Note],
+    direction: str,
+    renderer: Optional[Renderer] = None,
+    layout: Optional[FlowchartLayout] = None,
+) -> Dict[str, Any]:
+    renderer = renderer or Renderer()
+    if layout is None:
+        layout = renderer.layout(node_map, column_meta, notes, direction, edges)
+    elements: List[Element] = []
+    for kind, key, rect in renderer.element_rects(node_map, edges, notes, layout):
+        if kind == "node":
+            text = " ".join(layout.nodes[key].text_lines)
+        elif kind == "edge":
+            text = edges[key].label or ""
+        elif kind == "note":
+            text = " ".join(notes[key].text_lines)
+        else:
+            text = ""
+        elements.append((kind, key, rect, text))
+    return _sidecar_payload("flowchart", layout.canvas_size, elements)
+
+
+def sequence_sidecar(
+    participants: List[Participant],
+    messages: List[Message],
+    notes: List[SequenceNote],
+    activations: List[Activation],
+    fragments: List[Fragment],
+    style_overrides: Dict[str, str],
+    renderer: Optional[SequenceRenderer] = None,
+    layout: Optional[SequenceLayout] = None,
+) -> Dict[str, Any]:
+    renderer = renderer or SequenceRenderer()
+    if layout is None:
+        layout = renderer.layout(participants, messages, notes)
+    labels = {participant.name: participant.label for participant in participants}
+    texts = {
+        "participant": labels,
+        "message": {message.row_index: message.text for message in messages},
+        "note": {note.row_index: " ".join(note.text_lines) for note in notes},
+    }
+    elements: List[Element] = [
+        (kind, key, rect, texts[kind][key])
+        for kind, key, rect in renderer.element_rects(participants, messages, notes, layout)
+    ]
+    return _sidecar_payload("sequence", layout.canvas, elements)
+
+
+def _sidecar_payload(diagram_type: str, canvas: Tuple[float, float], elements: List[Element]) -> Dict[str, Any]:
+    width, height = canvas
+    cell_size = max(MIN_CELL_SIZE, math.ceil(math.sqrt(width * height * ITEMS_PER_CELL / max(len(elements), 1))))
+    grid = LayeredSpatialHash(cell_size, LEVEL_FANOUT)
+    items: List[List[Any]] = []
+    postings: Dict[str, List[int]] = {}
+    for idx, (kind, key, (x, y, w, h), text) in enumerate(elements):
+        rect = (x - HIT_SLOP, y - HIT_SLOP, w + 2 * HIT_SLOP, h + 2 * HIT_SLOP)
+        grid.insert(idx, rect)
+        items.append([element_id(kind, key), kind] + [compact_number(value) for value in rect])
+        for token in dict.fromkeys(tokenize(text)):
+            postings.setdefault(token, []).append(idx)
+    tokens = sorted(postings)
+    return {
+        "version": SIDECAR_SCHEMA_VERSION,
+        "type": diagram_type,
+        "canvas": [compact_number(width), compact_number(height)],
+        "fields": SIDECAR_FIELDS,
+        "cellSize": compact_number(cell_size),
+        "fanout": LEVEL_FANOUT,
+        "items": items,
+        "levels": [
+            {f"{col},{row}": indexes for (col, row), indexes in level.buckets().items()} for level in grid.levels
+        ],
+        "tokens": tokens,
+        "postings": [postings[token] for token in tokens],
+    }
+
+
+class HitIndex:
+    """Point and label queries over a sidecar payload, as a viewer would run them."""
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.items = payload["items"]
+        self.cell_size = payload["cellSize"]
+        self.fanout = payload["fanout"]
+        self.levels = payload["levels"]
+        self.tokens = payload["tokens"]
+        self.postings = payload["postings"]
+
+    def hit(self, x: float, y: float) -> List[str]:
+        """Ids of items under the point, topmost (last painted) first."""
+        found = []
+        for depth, cells in enumerate(self.levels):
+            size = self.cell_size * self.fanout ** depth
+            for idx in cells.get(f"{math.floor(x / size)},{math.floor(y / size)}", ()):
+                _, _, left, top, width, height = self.items[idx]
+                if left <= x <= left + width and top <= y <= top + height:
+                    found.append(idx)
+        return [self.items[idx][0] for idx in sorted(found, reverse=True)]
+
+    def search(self, query: str) -> List[str]:
+        """Ids of items containing every query word; the last word may be a prefix."""
+        words = tokenize(query)
+        if not words:
+            return []
+        matches: Optional[Set[int]] = None
+        for position, word in enumerate(words):
+            found = self._prefix(word) if position == len(words) - 1 else self._exact(word)
+            matches = found if matches is None else matches & found
+            if not matches:
+                return []
+        return [self.items[idx][0] for idx in sorted(matches)]
+
+    def _exact(self, word: str) -> Set[int]:
+        idx = bisect_left(self.tokens, word)
+        if idx < len(self.tokens) and self.tokens[idx] == word:
+            return set(self.postings[idx])
+        return set()
+
+    def _prefix(self, prefix: str) -> Set[int]:
+        found: Set[int] = set()
+        idx = bisect_left(self.tokens, prefix)
+        while idx < len(self.tokens) and self.tokens[idx].startswith(prefix):
+            found.update(self.postings[idx])
+            idx += 1
+        return found
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+# x, y (top-left), width, height
+Rect = Tuple[float, float, float, float]
+
+DEFAULT_CELL_SIZE = 64.0
+# Cell size ratio between neighbouring LayeredSpatialHash levels.
+LEVEL_FANOUT = 4
+# Upper bound on grid probes per placement; past it the caller keeps its spot.
+MAX_PLACEMENT_PROBES = 128
+
+
+def rects_overlap(first: Rect, second: Rect) -> bool:
+    return (
+        first[0] < second[0] + second[2]
+        and second[0] < first[0] + first[2]
+        and first[1] < second[1] + second[3]
+        and second[1] < first[1] + first[3]
+    )
+
+
+def bounding_rect(points: Iterable[Tuple[float, float]]) -> Rect:
+    xs, ys = zip(*points)
+    return min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)
+
+
+def union_rect(first: Rect, second: Rect) -> Rect:
+    left, top = min(first[0], second[0]), min(first[1], second[1])
+    right = max(first[0] + first[2], second[0] + second[2])
+    bottom = max(first[1] + first[3], second[1] + second[3])
+    return left, top, right - left, bottom - top
+
+
+def segment_intersects_rect(start: Tuple[float, float], end: Tuple[float, float], rect: Rect) -> bool:
+    """Liang-Barsky clip of the segment against ``rect``."""
+    (x1, y1), (x2, y2) = start, end
+    dx, dy = x2 - x1, y2 - y1
+    low, high = 0.0, 1.0
+    for p, q in (
+        (-dx, x1 - rect[0]),
+        (dx, rect[0] + rect[2] - x1),
+        (-dy, y1 - rect[1]),
+        (dy, rect[1] + rect[3] - y1),
+    ):
+        if p == 0:
+            if q < 0:
+                return False
+        elif p < 0:
+            low = max(low, q / p)
+        else:
+            high = min(high, q / p)
+        if low > high:
+            return False
+    return True
+
+
+class SpatialHash:
+    """Uniform grid of buckets over axis-aligned rectangles.
+
+    Each rectangle is stored in every cell it touches, so a query only
+    looks at the handful of items near it rather than at all of them.
+    """
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.rects: Dict[Hashable, Rect] = {}
+        self._cells: Dict[Tuple[int, int], List[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self.rects)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.rects
+
+    def insert(self, key: Hashable, rect: Rect) -> None:
+        if key in self.rects:
+            self.remove(key)
+        self.rects[key] = rect
+        for cell in self._cells_for(rect):
+            self._cells.setdefault(cell, []).append(key)
+
+    def remove(self, key: Hashable) -> None:
+        rect = self.rects.pop(key)
+        for cell in self._cells_for(rect):
+            bucket = self._cells[cell]
+            bucket.remove(key)
+            if not bucket:
+                del self._cells[cell]
+
+    def query(self, rect: Rect) -> Iterator[Hashable]:
+        """Keys of stored rectangles overlapping ``rect``, each reported once."""
+        seen: Set[Hashable] = set()
+        for cell in self._cells_for(rect):
+            for key in self._cells.get(cell, ()):
+                if key not in seen:
+                    seen.add(key)
+                    if rects_overlap(rect, self.rects[key]):
+                        yield key
+
+    def buckets(self) -> Dict[Tuple[int, int], List[Hashable]]:
+        """(column, row) of every non-empty cell -> keys stored in it, in insertion order."""
+        return self._cells
+
+    def is_free(self, rect: Rect) -> bool:
+        return self._first_overlap(rect) is None
+
+    def find_free(self, rect: Rect, gap: float = 0.0) -> Optional[Rect]:
+        """Nearest position for ``rect`` that overlaps nothing stored, or None.
+
+        Best-first search from the original spot: each blocked candidate
+        spawns the four positions just clear of the obstacle it hit, so one
+        probe skips a whole obstacle. Probes are capped at
+        MAX_PLACEMENT_PROBES, keeping the expected cost per call O(1).
+        """
+        x, y, width, height = rect
+        frontier: List[Tuple[float, float, float]] = [(0.0, x, y)]
+        seen: Set[Tuple[float, float]] = {(x, y)}
+        probes = 0
+        while frontier and probes < MAX_PLACEMENT_PROBES:
+            _, cx, cy = heapq.heappop(frontier)
+            candidate = (cx, cy, width, height)
+            blocker = self._first_overlap(candidate)
+            probes += 1
+            if blocker is None:
+                return candidate
+            bx, by, bw, bh = blocker
+            for nx, ny in (
+                (cx, by - height - gap),
+                (cx, by + bh + gap),
+                (bx - width - gap, cy),
+                (bx + bw + gap, cy),
+            ):
+                key = (round(nx, 2), round(ny, 2))
+                if key not in seen:
+                    seen.add(key)
+                    heapq.heappush(frontier, ((nx - x) ** 2 + (ny - y) ** 2, nx, ny))
+        return None
+
+    def _first_overlap(self, rect: Rect) -> Optional[Rect]:
+        x, y, width, height = rect
+        right, bottom = x + width, y + height
+        rects = self.rects
+        for cell in self._cells_for(rect):
+            for key in self._cells.get(cell, ()):
+                other = rects[key]
+                if x < other[0] + other[2] and other[0] < right and y < other[1] + other[3] and other[1] < bottom:
+                    return other
+        return None
+
+    def _cells_for(self, rect: Rect) -> Iterable[Tuple[int, int]]:
+        size = self.cell_size
+        x, y, width, height = rect
+        first_col, last_col = math.floor(x / size), math.floor((x + width) / size)
+        first_row, last_row = math.floor(y / size), math.floor((y + height) / size)
+        return [(col, row) for col in range(first_col, last_col + 1) for row in range(first_row, last_row + 1)]
+
+
+class LayeredSpatialHash:
+    """SpatialHash levels with cells LEVEL_FANOUT times larger at each step.
+
+    A rectangle goes to the first level where it spans at most two cells per
+    axis, so a long edge costs a few entries instead of one per fine cell it
+    crosses. Queries visit every level.
+    """
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE, fanout: int = LEVEL_FANOUT):
+        self.cell_size = cell_size
+        self.fanout = fanout
+        self.levels: List[SpatialHash] = []
+
+    def __len__(self) -> int:
+        return sum(len(level) for level in self.levels)
+
+    def insert(self, key: Hashable, rect: Rect) -> None:
+        extent = max(rect[2], rect[3])
+        depth = 0
+        while extent > self.cell_size * self.fanout ** depth:
+            depth += 1
+        while len(self.levels) <= depth:
+            self.levels.append(SpatialHash(self.cell_size * self.fanout ** len(self.levels)))
+        self.levels[depth].insert(key, rect)
+
+    def query(self, rect: Rect) -> Iterator[Hashable]:
+        """Keys of stored rectangles overlapping ``rect``; a key inserted twice may repeat."""
+        for level in self.levels:
+            yield from level.query(rect)
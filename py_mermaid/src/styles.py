@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
+
+StyleKey = Tuple[Tuple[str, str], ...]
+
+NODE_FILL = "#ffffff"
+NODE_STROKE = "#666666"
+NODE_TEXT_COLOR = "#1f1f1f"
+DEFAULT_EDGE_STYLE = {"stroke": "#7b7b7b", "stroke-width": "2", "marker-end": "url(#arrow)"}
+
+
+def format_attributes(style: Mapping[str, str]) -> str:
+    return " ".join(f'{key}="{value}"' for key, value in style.items())
+
+
+class StyleTable:
+    """Interns style overrides into pre-rendered SVG attribute strings.
+
+    Id 0 is always the base style, so elements without overrides never
+    touch the lookup dictionary.
+    """
+
+    def __init__(self, base: Optional[Mapping[str, str]] = None):
+        self._base = dict(base or {})
+        self._ids: Dict[StyleKey, int] = {(): 0}
+        self._styles: List[Dict[str, str]] = [self._base]
+        self._attributes: List[str] = [format_attributes(self._base)]
+
+    def __len__(self) -> int:
+        return len(self._attributes)
+
+    def intern(self, overrides: Mapping[str, str]) -> int:
+        if not overrides:
+            return 0
+        key = tuple(overrides.items())
+        style_id = self._ids.get(key)
+        if style_id is None:
+            style_id = len(self._attributes)
+            merged = {**self._base, **overrides}
+            self._styles.append(merged)
+            self._attributes.append(format_attributes(merged))
+            self._ids[key] = style_id
+        return style_id
+
+    def attributes(self, style_id: int) -> str:
+        return self._attributes[style_id]
+
+    def styles(self) -> List[Dict[str, str]]:
+        return [dict(style) for style in self._styles]
+
+
+@dataclass(frozen=True)
+class NodeStyle:
+    box: str
+    text: str
+
+
+DEFAULT_NODE_STYLE = NodeStyle(
+    box=f'fill="{NODE_FILL}" stroke="{NODE_STROKE}"',
+    text=f'fill="{NODE_TEXT_COLOR}"',
+)
+
+
+def resolve_node_styles(styles: Mapping[str, Mapping[str, str]]) -> Dict[Optional[str], NodeStyle]:
+    resolved: Dict[Optional[str], NodeStyle] = {None: DEFAULT_NODE_STYLE}
+    for class_name, style in styles.items():
+        resolved[class_name] = NodeStyle(
+            box=f'fill="{style.get("fill", NODE_FILL)}" stroke="{style.get("stroke", NODE_STROKE)}"',
+            text=f'fill="{style.get("color", NODE_TEXT_COLOR)}"',
+        )
+    return resolved
@@ -0,0 +1,143 @@
+"""Viewport and tile rendering for flowcharts too large to draw whole.
+
+TiledFlowchart lays the diagram out once and indexes every element's
+bounding box in a LayeredSpatialHash, so edges spanning the whole canvas
+stay cheap to store. A viewport query reads only the cells it covers,
+drops edges whose line misses the window, and emits the rest in the same
+order as the full render, so a tile costs time in proportion to what it
+shows. The output keeps canvas coordinates and sets the viewBox to the
+requested window.
+"""
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional, Tuple, Union
+
+from py_mermaid.src.db import ColumnMeta, Edge, FlowchartLayout, Node, Note
+from py_mermaid.src.parser import Parser
+from py_mermaid.src.renderer import Renderer
+from py_mermaid.src.spatial import LayeredSpatialHash, Rect, rects_overlap, segment_intersects_rect, union_rect
+from py_mermaid.src.styles import DEFAULT_EDGE_STYLE, DEFAULT_NODE_STYLE, StyleTable, resolve_node_styles
+from py_mermaid.src.utils import compact_number
+
+TILE_SIZE = 256
+CELL_SIZE = 128.0
+# Strokes, arrowheads and node shadows reach this far past an element's box.
+CULL_MARGIN = 8.0
+
+
+class TiledFlowchart:
+    def __init__(
+        self,
+        node_map: Dict[str, Node],
+        edges: List[Edge],
+        column_meta: List[ColumnMeta],
+        styles: Dict[str, Dict[str, str]],
+        notes: List[Note],
+        direction: str,
+        renderer: Optional[Renderer] = None,
+        layout: Optional[FlowchartLayout] = None,
+        tile_size: int = TILE_SIZE,
+    ):
+        self.renderer = renderer or Renderer()
+        if layout is None:
+            layout = self.renderer.layout(node_map, column_meta, notes, direction, edges)
+        self.node_map = node_map
+        self.edges = edges
+        self.notes = notes
+        self.layout = layout
+        self.tile_size = tile_size
+        self._node_styles = resolve_node_styles(styles)
+
+        # (kind, key) by paint position; the grid stores positions, so sorting
+        # a query's hits restores paint order.
+        self._elements: List[Tuple[str, Union[str, int]]] = []
+        self.index = LayeredSpatialHash(CELL_SIZE)
+        boxes = layout.nodes
+        for kind, key, rect in self.renderer.element_rects(node_map, edges, notes, layout):
+            if kind == "note":
+                # The leader line runs to the anchor's centre.
+                ax, ay = boxes[notes[key].anchor].center()
+                rect = union_rect(rect, (ax, ay, 0.0, 0.0))
+            self.index.insert(len(self._elements), rect)
+            self._elements.append((kind, key))
+
+    @classmethod
+    def from_text(cls, text: str, parser: Optional[Parser] = None, **options) -> "TiledFlowchart":
+        return cls(*(parser or Parser()).parse(text), **options)
+
+    @property
+    def canvas_size(self) -> Tuple[float, float]:
+        return self.layout.canvas_size
+
+    def visible(self, x: float, y: float, width: float, height: float) -> List[Tuple[str, Union[str, int]]]:
+        """(kind, key) of the elements drawn inside the viewport, in paint order."""
+        window = (x - CULL_MARGIN, y - CULL_MARGIN, width + 2 * CULL_MARGIN, height + 2 * CULL_MARGIN)
+        found = []
+        for position in sorted(self.index.query(window)):
+            kind, key = self._elements[position]
+            if kind != "edge" or self._edge_visible(key, window):
+                found.append((kind, key))
+        return found
+
+    def render_viewport(self, x: float, y: float, width: float, height: float, scale: float = 1.0) -> str:
+        """SVG of one canvas window, drawn ``scale`` times its canvas size."""
+        renderer = self.renderer
+        layout = self.layout
+        boxes = layout.nodes
+        window = (x, y, width, height)
+        view_box = f"{compact_number(x)} {compact_number(y)} {compact_number(width)} {compact_number(height)}"
+        edge_styles = StyleTable(DEFAULT_EDGE_STYLE)
+        lines = renderer._svg_head(compact_number(width * scale), compact_number(height * scale), view_box)
+
+        bg_y, bg_height = renderer._column_band(layout)
+        for idx, column in enumerate(layout.columns):
+            if rects_overlap(renderer._column_rect(column, bg_y, bg_height), window):
+                lines.extend(renderer._column_lines(idx, column, bg_y, bg_height, layout.margin / 2, clip=window))
+
+        for kind, key in self.visible(x, y, width, height):
+            if kind == "bundle":
+                lines.extend(renderer._bundle_lines(key, layout.bundles[key], self.edges, boxes))
+            elif kind == "edge":
+                edge = self.edges[key]
+                style_attr = edge_styles.attributes(edge_styles.intern(edge.style))
+                lines.extend(
+                    renderer._edge_lines(
+                        key, edge, boxes[edge.source], boxes[edge.target], style_attr, layout.edge_labels.get(key)
+                    )
+                )
+            elif kind == "node":
+                node = self.node_map[key]
+                node_style = self._node_styles.get(node.class_name, DEFAULT_NODE_STYLE)
+                lines.extend(renderer._node_lines(key, boxes[key], node_style, node.shape))
+            else:
+                note = self.notes[key]
+                lines.extend(renderer._note_lines(key, note, layout.notes[key], boxes[note.anchor]))
+
+        lines.extend(("</svg>", ""))
+        return "\n".join(lines)
+
+    def _edge_visible(self, idx: int, window: Rect) -> bool:
+        edge = self.edges[idx]
+        source, target = self.layout.nodes[edge.source], self.layout.nodes[edge.target]
+        if segment_intersects_rect(source.center(), target.center(), window):
+            return True
+        if not edge.label:
+            return False
+        anchor = self.renderer.edge_label_anchor(idx, edge, self.layout)
+        return rects_overlap(self.renderer._edge_label_rect(edge.label, *anchor), window)
+
+    def tile_grid(self, zoom: int) -> Tuple[int, int]:
+        """Columns and rows of tiles covering the canvas at ``zoom``."""
+        span = self._tile_span(zoom)
+        width, height = self.layout.canvas_size
+        return max(1, math.ceil(width / span)), max(1, math.ceil(height / span))
+
+    def render_tile(self, zoom: int, tx: int, ty: int) -> str:
+        """One ``tile_size`` square tile; zoom 0 draws the canvas at 1:1 and each step doubles it."""
+        span = self._tile_span(zoom)
+        return self.render_viewport(tx * span, ty * span, span, span, scale=self.tile_size / span)
+
+    def _tile_span(self, zoom: int) -> float:
+        return self.tile_size / 2.0 ** zoom
+
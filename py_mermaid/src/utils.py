@@ -1,4 +1,8 @@
-from typing import List
+import mmap
+import os
+from typing import Iterator, List, Union
+
+PathLike = Union[str, "os.PathLike[str]"]
 
 MAX_LINE_CHARACTERS = 32
 
@@ -30,6 +34,12 @@ def wrap_segment(text: str) -> List[str]:
     return lines or [" "]
 
 
+def compact_number(value: float) -> float:
+    """Round to two decimals; whole values become ints so JSON stays short."""
+    rounded = round(value, 2)
+    return int(rounded) if rounded == int(rounded) else rounded
+
+
 def label_to_lines(label: str) -> List[str]:
     html_breaks = label.replace("<br/>", "\n").replace("<br>", "\n")
     raw_segments = html_breaks.splitlines()
@@ -37,3 +47,16 @@ def label_to_lines(label: str) -> List[str]:
     for segment in raw_segments:
         lines.extend(wrap_segment(segment))
     return lines or [" "]
+
+
+def iter_file_lines(path: PathLike, use_mmap: bool = False, encoding: str = "utf-8") -> Iterator[str]:
+    if not use_mmap:
+        with open(path, "r", encoding=encoding) as handle:
+            yield from handle
+        return
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for raw in iter(mapped.readline, b""):
+                yield raw.decode(encoding)
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from py_mermaid.src.pipeline import RenderResult, render_diagram, render_many, source_digest
+from py_mermaid.src.utils import PathLike
+
+SOURCE_PATTERN = "*.mmd"
+OUTPUT_SUFFIX = ".svg"
+DEFAULT_DEBOUNCE = 0.2
+DEFAULT_POLL_INTERVAL = 0.1
+
+
+@dataclass
+class WatchEntry:
+    digest: str
+    output: Path
+    # Set when this digest failed to render; the source is retried once it changes.
+    error: Optional[BaseException] = None
+
+
+class PollingNotifier:
+    """Reports files whose (mtime, size) changed since the previous poll.
+
+    Any object with a ``poll() -> Iterable[Path]`` method can replace it,
+    e.g. an inotify or editor-driven notifier.
+    """
+
+    def __init__(self, root: PathLike, pattern: str = SOURCE_PATTERN):
+        self.root = Path(root)
+        self.pattern = pattern
+        self._snapshot: Dict[Path, Tuple[int, int]] = {}
+
+    def poll(self) -> Set[Path]:
+        current: Dict[Path, Tuple[int, int]] = {}
+        for path in self.root.rglob(self.pattern):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            current[path] = (stat.st_mtime_ns, stat.st_size)
+        changed = {path for path, signature in current.items() if self._snapshot.get(path) != signature}
+        changed.update(path for path in self._snapshot if path not in current)
+        self._snapshot = current
+        return changed
+
+
+class Watcher:
+    def __init__(
+        self,
+        root: PathLike,
+        output_dir: Optional[PathLike] = None,
+        notifier=None,
+        debounce: float = DEFAULT_DEBOUNCE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        workers: int = 0,
+        use_processes: bool = False,
+        render: Callable[[str], str] = render_diagram,
+    ):
+        self.root = Path(root)
+        self.output_dir = Path(output_dir) if output_dir is not None else None
+        self.notifier = notifier if notifier is not None else PollingNotifier(self.root)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.workers = workers
+        self.use_processes = use_processes
+        self.render = render
+        self.index: Dict[Path, WatchEntry] = {}
+        self._outputs_by_digest: Dict[str, Path] = {}
+        self._executor: Optional[Executor] = None
+
+    def output_path(self, source: Path) -> Path:
+        if self.output_dir is None:
+            return source.with_suffix(OUTPUT_SUFFIX)
+        return (self.output_dir / source.relative_to(self.root)).with_suffix(OUTPUT_SUFFIX)
+
+    def refresh(self, paths: Optional[Iterable[PathLike]] = None) -> List[Path]:
+        """Process one batch of changes and return the outputs written.
+
+        Without ``paths`` the notifier is polled once. A source that fails to
+        render is recorded in the index with its error (see failures()) and
+        never stops the rest of the batch.
+        """
+        changed = self.notifier.poll() if paths is None else {Path(path) for path in paths}
+        pending: List[Tuple[Path, str, str]] = []
+        for path in sorted(changed):
+            try:
+                text = path.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                self._forget(path)
+                continue
+            digest = source_digest(text)
+            entry = self.index.get(path)
+            if entry is not None and entry.digest == digest:
+                continue
+            pending.append((path, text, digest))
+
+        reused: List[Tuple[Path, str, str]] = []
+        fresh: Dict[str, List[Path]] = {}
+        texts: Dict[str, str] = {}
+        for path, text, digest in pending:
+            known = self._outputs_by_digest.get(digest)
+            if known is not None and known.exists():
+                # Read now: a later write in this batch may overwrite ``known``.
+                reused.append((path, digest, known.read_text(encoding="utf-8")))
+            else:
+                fresh.setdefault(digest, []).append(path)
+                texts.setdefault(digest, text)
+
+        written: List[Path] = []
+        digests = list(fresh)
+        for result in self._render_all(list(texts.values())):
+            digest = digests[result.index]
+            for path in fresh[digest]:
+                if result.ok:
+                    written.append(self._write(path, digest, result.output))
+                else:
+                    self._fail(path, digest, result.error)
+        for path, digest, svg in reused:
+            written.append(self._write(path, digest, svg))
+        return written
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        stop = stop or threading.Event()
+        pending: Set[Path] = set()
+        last_change = 0.0
+        try:
+            while not stop.is_set():
+                changed = self.notifier.poll()
+                if changed:
+                    pending.update(changed)
+                    last_change = time.monotonic()
+                elif pending and time.monotonic() - last_change >= self.debounce:
+                    batch, pending = pending, set()
+                    self.refresh(batch)
+                stop.wait(self.poll_interval)
+        finally:
+            self.close()
+
+    def failures(self) -> Dict[Path, BaseException]:
+        """Sources whose current content failed to render, with the error."""
+        return {path: entry.error for path, entry in self.index.items() if entry.error is not None}
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _render_all(self, texts: List[str]) -> Iterator[RenderResult]:
+        if self.workers <= 0 or len(texts) < 2:
+            return render_many(texts, render=self.render)
+        if self._executor is None:
+            pool = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self._executor = pool(max_workers=self.workers)
+        return render_many(texts, executor=self._executor, render=self.render)
+
+    def _write(self, source: Path, digest: str, svg: str) -> Path:
+        output = self.output_path(source)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        temp = output.with_name(output.name + ".tmp")
+        temp.write_text(svg, encoding="utf-8")
+        os.replace(temp, output)
+        previous = self.index.get(source)
+        if previous is not None:
+            self._release(previous)
+        self.index[source] = WatchEntry(digest=digest, output=output)
+        self._outputs_by_digest.setdefault(digest, output)
+        return output
+
+    def _fail(self, source: Path, digest: str, error: BaseException) -> None:
+        # The last good output is left in place, but no longer serves as a
+        # copy source for its digest.
+        previous = self.index.get(source)
+        if previous is not None:
+            self._release(previous)
+        self.index[source] = WatchEntry(digest=digest, output=self.output_path(source), error=error)
+
+    def _forget(self, source: Path) -> None:
+        entry = self.index.pop(source, None)
+        if entry is None:
+            return
+        try:
+            entry.output.unlink()
+        except FileNotFoundError:
+            pass
+        self._release(entry)
+
+    def _release(self, entry: WatchEntry) -> None:
+        # The output no longer holds this digest; other files with the same
+        # content simply stop being used as a copy source.
+        if self._outputs_by_digest.get(entry.digest) == entry.output:
+            del self._outputs_by_digest[entry.digest]
+
+
+def watch(root: PathLike, output_dir: Optional[PathLike] = None, **options) -> None:
+    watcher = Watcher(root, output_dir=output_dir, **options)
+    watcher.refresh()
+    watcher.run()
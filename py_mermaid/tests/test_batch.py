@@ -0,0 +1,54 @@
+import itertools
+import unittest
+
+from py_mermaid.src.pipeline import RenderResult, render_diagram, render_many
+
+DIAGRAMS = [
+    "flowchart LR\nA[Start] --> B[End]\nA --> B\n",
+    "sequenceDiagram\nA->>B: hi\nB-->>A: bye\n",
+    "flowchart TB\nsubgraph\n",
+    "flowchart TB\nX[Only]\n",
+]
+
+class TestRenderMany(unittest.TestCase):
+    def test_serial_results_keep_order_and_capture_errors(self):
+        results = list(render_many(DIAGRAMS))
+
+        self.assertEqual([result.index for result in results], [0, 1, 2, 3])
+        self.assertEqual(results[0].output, render_diagram(DIAGRAMS[0]))
+        self.assertIn("<svg", results[1].output)
+        self.assertFalse(results[2].ok)
+        self.assertIsNone(results[2].output)
+        self.assertTrue(results[3].ok)
+
+    def test_thread_pool_ordered_and_unordered(self):
+        expected = [result.output for result in render_many(DIAGRAMS)]
+        ordered = list(render_many(DIAGRAMS * 5, workers=3, window=2))
+        self.assertEqual([result.index for result in ordered], list(range(20)))
+        self.assertEqual([result.output for result in ordered], expected * 5)
+
+        unordered = list(render_many(DIAGRAMS * 5, workers=3, ordered=False))
+        self.assertEqual(sorted(result.index for result in unordered), list(range(20)))
+        for result in unordered:
+            self.assertEqual(result.output, expected[result.index % 4])
+
+    def test_input_is_consumed_lazily(self):
+        pulled = []
+
+        def source():
+            for idx in itertools.count():
+                pulled.append(idx)
+                yield DIAGRAMS[idx % 2]
+
+        batch = render_many(source(), workers=2, window=3)
+        first = next(batch)
+        batch.close()
+        self.assertIsInstance(first, RenderResult)
+        self.assertLessEqual(len(pulled), 3)
+
+    def test_process_pool(self):
+        results = list(render_many(DIAGRAMS, workers=2, use_processes=True))
+        self.assertEqual([result.ok for result in results], [True, True, False, True])
+
+if __name__ == '__main__':
+    unittest.main()
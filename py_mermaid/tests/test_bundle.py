@@ -0,0 +1,43 @@
+import re
+import unittest
+import xml.etree.ElementTree as ET
+
+from py_mermaid.src.bundle import bundle_svgs, render_bundle
+from py_mermaid.src.pipeline import render_diagram
+
+DIAGRAMS = [
+    "flowchart LR\nA[Start] --> B[End]\n",
+    "flowchart TB\nA[url(#arrow)] --> B\nB --> C\n",
+    "sequenceDiagram\nA->>B: hi\nB-->>A: bye\n",
+    "sequenceDiagram\nX->>Y: again\n",
+]
+
+class TestBundle(unittest.TestCase):
+    def test_defs_shared_and_ids_namespaced(self):
+        svgs = [render_diagram(text) for text in DIAGRAMS]
+        page = bundle_svgs(svgs, captions=["first", None, "<seq>", None])
+
+        self.assertNotIn("<?xml", page)
+        self.assertEqual(page.count("<defs>"), 1)
+        self.assertEqual(page.count('<marker id="shared0-arrow"'), 1)
+        self.assertEqual(page.count('<marker id="shared1-arrowhead"'), 1)
+        ids = re.findall(r' id="([^"]+)"', page)
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertIn("d1-node-A", ids)
+        for ref in re.findall(r'="url\(#([^)]+)\)"', page):
+            self.assertIn(ref, ids)
+        self.assertIn(">url(#arrow)</text>", page)
+        self.assertIn("<figcaption>&lt;seq&gt;</figcaption>", page)
+        self.assertNotIn("font-family=", page)
+        self.assertLess(len(page), sum(len(svg) for svg in svgs))
+        for figure in re.findall(r"<svg .*?</svg>", page, re.S):
+            ET.fromstring(figure)
+
+    def test_render_bundle_matches_prerendered(self):
+        expected = bundle_svgs([render_diagram(text) for text in DIAGRAMS])
+        self.assertEqual(render_bundle(DIAGRAMS, workers=2), expected)
+        with self.assertRaises(IndexError):
+            render_bundle(DIAGRAMS + ["flowchart TB\nsubgraph\n"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import copy
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from py_mermaid.src.parser import Parser
+from py_mermaid.src.renderer import Renderer
+from py_mermaid.src.sequence import SequenceParser, SequenceRenderer
+
+FLOWCHART = "\n".join(
+    ["flowchart LR"]
+    + [f"col{idx % 7}_n{idx}[Node {idx} <&>]:::{'header' if idx < 7 else 'org'}" for idx in range(120)]
+    + [f"col{idx % 7}_n{idx} --> col{(idx + 1) % 7}_n{idx + 1}" for idx in range(119)]
+    + [f"note right of col{idx % 7}_n{idx}: note {idx}" for idx in range(0, 120, 10)]
+)
+
+SEQUENCE = "\n".join(
+    ["sequenceDiagram", "participant A as Alpha", "participant B", "participant C"]
+    + [f"{'ABC'[idx % 3]}->>{'ABC'[(idx + 1) % 3]}: call {idx}" for idx in range(150)]
+    + ["Note over A,C: spanning note", "activate B", "B-->>A: reply", "deactivate B"]
+)
+
+class TestConcurrentRendering(unittest.TestCase):
+    def _assert_deterministic(self, render, model):
+        snapshot = copy.deepcopy(model)
+        expected = render()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            outputs = list(pool.map(lambda _: render(), range(64)))
+        self.assertTrue(all(output == expected for output in outputs))
+        self.assertEqual(model, snapshot)
+
+    def test_flowchart_renders_are_deterministic_across_threads(self):
+        model = Parser().parse(FLOWCHART)
+        renderer = Renderer()
+        self._assert_deterministic(lambda: renderer.render(*model), model)
+
+    def test_sequence_renders_are_deterministic_across_threads(self):
+        model = SequenceParser().parse(SEQUENCE)
+        renderer = SequenceRenderer()
+        self._assert_deterministic(lambda: renderer.render(*model), model)
+
+    def test_cached_layout_is_reused(self):
+        node_map, edges, column_meta, styles, notes, direction = Parser().parse(FLOWCHART)
+        renderer = Renderer()
+        layout = renderer.layout(node_map, column_meta, notes, direction)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            outputs = set(
+                pool.map(
+                    lambda _: renderer.render(node_map, edges, column_meta, styles, notes, direction, layout=layout),
+                    range(16),
+                )
+            )
+        self.assertEqual(outputs, {renderer.render(node_map, edges, column_meta, styles, notes, direction)})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+from py_mermaid.src.delta import apply_delta, is_empty_delta, split_svg, svg_delta
+from py_mermaid.src.escape import element_id
+from py_mermaid.src.pipeline import render_diagram
+
+BASE = """
+flowchart LR
+    A[Start]
+    B[Middle]
+    C[End]
+    A --> B
+    B --> C
+"""
+
+SEQUENCE = """
+sequenceDiagram
+    participant Alice
+    participant Bob
+    Alice->>Bob: one
+    Bob-->>Alice: two
+"""
+
+class TestSvgDelta(unittest.TestCase):
+    def test_elements_have_stable_ids(self):
+        _, elements = split_svg(render_diagram(BASE))
+        self.assertEqual(
+            list(elements),
+            ["column-A", "column-B", "column-C", "edge-0", "edge-1", "node-A", "node-B", "node-C"],
+        )
+        _, elements = split_svg(render_diagram(SEQUENCE))
+        self.assertEqual(
+            list(elements),
+            ["participant-Alice", "participant-Bob", "message-0", "message-1"],
+        )
+
+    def test_label_edit_only_changes_one_element(self):
+        previous = render_diagram(BASE)
+        current = render_diagram(BASE.replace("[Middle]", "[Centre]"))
+        patch = svg_delta(previous, current)
+
+        self.assertEqual([element_id for element_id, _ in patch["changed"]], ["column-B", "node-B"])
+        self.assertEqual(patch["added"], [])
+        self.assertEqual(patch["removed"], [])
+        self.assertNotIn("head", patch)
+        self.assertEqual(apply_delta(previous, patch), current)
+
+    def test_added_and_removed_elements_round_trip(self):
+        previous = render_diagram(BASE)
+        current = render_diagram(BASE.replace("    C[End]\n", "    C[End]\n    D[Extra]\n    C --> D\n"))
+        patch = svg_delta(previous, current)
+        self.assertIn("node-D", [element_id for element_id, _, _ in patch["added"]])
+        self.assertEqual(apply_delta(previous, patch), current)
+
+        reverse = svg_delta(current, previous)
+        self.assertIn("node-D", reverse["removed"])
+        self.assertEqual(apply_delta(current, reverse), previous)
+
+    def test_sequence_round_trip_and_noop(self):
+        previous = render_diagram(SEQUENCE)
+        current = render_diagram(SEQUENCE + "    Note over Alice,Bob: later\n    Alice->>Alice: self\n")
+        patch = svg_delta(previous, current)
+
+        self.assertEqual(apply_delta(previous, patch), current)
+        self.assertIn("head", patch)
+        self.assertTrue(is_empty_delta(svg_delta(current, current)))
+
+    def test_element_id_escaping(self):
+        self.assertEqual(element_id("node", "svc_A-1"), "node-svc_A-1")
+        self.assertEqual(element_id("participant", "Web App"), "participant-Web.20.App")
+        self.assertNotEqual(element_id("node", "a.20.b"), element_id("node", "a b"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,17 @@
+import unittest
+from py_mermaid.src.escape import svg_escape
+
+class TestSvgEscape(unittest.TestCase):
+    def test_plain_text_is_returned_unchanged(self):
+        label = "Plain label 42"
+        self.assertIs(svg_escape(label), label)
+
+    def test_special_characters(self):
+        self.assertEqual(
+            svg_escape("<a href='x'>\"Tom\" & Jerry</a>"),
+            "&lt;a href=&apos;x&apos;&gt;&quot;Tom&quot; &amp; Jerry&lt;/a&gt;",
+        )
+        self.assertEqual(svg_escape("&amp;"), "&amp;amp;")
+
+if __name__ == '__main__':
+    unittest.main()
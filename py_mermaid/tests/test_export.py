@@ -0,0 +1,108 @@
+import json
+import re
+import unittest
+from unittest import mock
+
+from py_mermaid.src.export import (
+    LAYOUT_SCHEMA_VERSION,
+    MESSAGE_DASHED,
+    MESSAGE_SELF,
+    dumps_layout,
+    flowchart_layout_payload,
+)
+from py_mermaid.src.parser import Parser
+from py_mermaid.src.pipeline import layout_payload
+from py_mermaid.src.renderer import Renderer
+from py_mermaid.src.sequence import SequenceRenderer
+
+class TestLayoutExport(unittest.TestCase):
+    def test_flowchart_payload_matches_layout(self):
+        text = """
+        flowchart LR
+            A[Start]:::header
+            B[End]
+            A --> B
+            A --- Missing
+            linkStyle 0 stroke:#f00
+            note right of A: hi
+        """
+        with mock.patch.object(Renderer, "_render_svg", side_effect=AssertionError("SVG emitted")):
+            payload = layout_payload(text)
+
+        node_map, _, column_meta, _, notes, direction = Parser().parse(text)
+        layout = Renderer().layout(node_map, column_meta, notes, direction)
+        fields = payload["fields"]["nodes"]
+        packed = dict(zip(fields, payload["nodes"][0]))
+
+        self.assertEqual(payload["version"], LAYOUT_SCHEMA_VERSION)
+        self.assertEqual(payload["type"], "flowchart")
+        self.assertEqual(packed["id"], "A")
+        self.assertAlmostEqual(packed["x"], layout.nodes["A"].x, places=2)
+        self.assertEqual(payload["edges"], [[0, 1, None, 1, None, None], [0, 2, None, 2, None, None]])
+        self.assertEqual(payload["edgeStyles"][1]["stroke"], "#f00")
+        self.assertEqual(payload["notes"][0][:2], [0, "right"])
+
+    def test_flowchart_labels_and_bundles_match_svg(self):
+        lines = ["flowchart LR", "subgraph left", "a1", "a2", "a3", "end", "subgraph right", "b1", "b2", "end"]
+        lines += ["a1 --> b1", "a2 --> b1", "a3 --> b2"]
+        lines += [f"a1 -->|crowded label {idx}| a2" for idx in range(4)]
+        model = Parser().parse("\n".join(lines) + "\n")
+        renderer = Renderer(avoid_collisions=True, bundle_edges=True)
+        node_map, edges, column_meta, styles, notes, direction = model
+        layout = renderer.layout(node_map, column_meta, notes, direction, edges)
+        svg = renderer.render(*model, layout=layout)
+        payload = flowchart_layout_payload(*model, renderer=renderer)
+
+        fields = payload["fields"]["edges"]
+        for idx, row in enumerate(payload["edges"]):
+            packed = dict(zip(fields, row))
+            group = svg.split(f'<g id="edge-{idx}">')
+            if not packed["label"]:
+                self.assertIsNone(packed["labelX"])
+                continue
+            text = re.search(r'<text x="([\d.]+)" y="([\d.]+)"', group[1].split("</g>")[0])
+            self.assertEqual((packed["labelX"], packed["labelY"]), (float(text.group(1)), float(text.group(2))))
+        self.assertTrue(layout.edge_labels)
+
+        self.assertEqual(len(payload["bundles"]), 1)
+        bundle = dict(zip(payload["fields"]["bundles"], payload["bundles"][0]))
+        self.assertEqual(bundle["edges"], [0, 1, 2])
+        trunk_svg = svg.split('<g id="bundle-0">')[1]
+        trunk = re.search(r'<line x1="([\d.]+)" y1="([\d.]+)" x2="([\d.]+)" y2="([\d.]+)"', trunk_svg)
+        expected = [float(value) for value in trunk.groups()]
+        self.assertEqual([bundle["startX"], bundle["startY"], bundle["endX"], bundle["endY"]], expected)
+
+    def test_sequence_payload(self):
+        text = """
+        sequenceDiagram
+            participant A
+            participant B
+            activate B
+            A-->>B: hello
+            loop retry
+                B->B: again
+            end
+            deactivate B
+            Note over A,B: done
+        """
+        with mock.patch.object(SequenceRenderer, "_render_svg", side_effect=AssertionError("SVG emitted")):
+            payload = layout_payload(text)
+
+        self.assertEqual(payload["type"], "sequence")
+        self.assertEqual([p[0] for p in payload["participants"]], ["A", "B"])
+        first, second = payload["messages"]
+        self.assertTrue(first[4] & MESSAGE_DASHED)
+        self.assertTrue(second[4] & MESSAGE_SELF)
+        self.assertEqual(len(payload["activations"]), 1)
+        self.assertEqual(payload["fragments"][0][:2], ["loop", "retry"])
+        self.assertEqual(payload["notes"][0][0], 2)
+
+    def test_json_is_compact_and_round_trips(self):
+        payload = layout_payload("flowchart TB\nA[Ünï]\nB[b]\nA --> B\n")
+        encoded = dumps_layout(payload)
+
+        self.assertNotIn(", ", encoded)
+        self.assertEqual(json.loads(encoded), payload)
+
+if __name__ == '__main__':
+    unittest.main()
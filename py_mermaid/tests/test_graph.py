@@ -0,0 +1,81 @@
+import unittest
+
+from py_mermaid.src.graph import IN, OUT, FlowGraph, merge_duplicate_edges
+from py_mermaid.src.parser import Parser
+from py_mermaid.src.renderer import Renderer
+
+CHART = """
+flowchart LR
+    a_0[Root]:::header
+    b_0[Other]:::header
+    a_1[Child]
+    subgraph tail
+        a_1 --> a_2
+    end
+    a_0 --> a_1 --> b_0
+    a_0 --> a_1
+    b_0 --- b_1
+    note right of b_1: leaf
+"""
+
+class TestFlowGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = Parser().parse_graph(CHART)
+
+    def test_edge_only_endpoints_become_nodes(self):
+        node_map = self.graph.node_map
+        self.assertEqual(node_map["a_2"].label, "a_2")
+        self.assertEqual(node_map["a_2"].subgraph, "tail")
+        self.assertIsNone(node_map["b_1"].subgraph)
+        self.assertEqual(list(node_map)[:3], ["a_0", "b_0", "a_1"])
+        svg = Renderer().render(*self.graph.model())
+        self.assertIn('id="node-b_1"', svg)
+
+    def test_adjacency_queries(self):
+        graph = self.graph
+        self.assertEqual(graph.successors("a_1"), ["a_2", "b_0"])
+        self.assertEqual(graph.predecessors("a_1"), ["a_0"])
+        self.assertEqual(graph.neighbors("b_0"), ["b_1", "a_1"])
+        self.assertEqual(graph.degree("a_1"), 4)
+        self.assertEqual(graph.degree("a_1", OUT), 2)
+        self.assertEqual(graph.degree("a_0", IN), 0)
+        self.assertEqual(graph.reachable("a_0"), ["a_0", "a_1", "a_2", "b_0", "b_1"])
+        self.assertEqual(graph.reachable("b_1", IN, max_depth=1), ["b_1", "b_0"])
+        self.assertEqual(graph.neighborhood("b_1", depth=2), ["b_1", "b_0", "a_1"])
+
+    def test_induced_subgraph_is_renderable(self):
+        node_map, edges, column_meta, _, notes, _ = self.graph.induced(["b_1", "b_0", "missing"])
+
+        self.assertEqual(list(node_map), ["b_0", "b_1"])
+        self.assertEqual([(edge.source, edge.target) for edge in edges], [("b_0", "b_1")])
+        self.assertEqual([meta.key for meta in column_meta], ["b"])
+        self.assertEqual(node_map["b_0"].column_index, 0)
+        self.assertEqual(len(notes), 1)
+        Renderer().render(*self.graph.induced(self.graph.neighborhood("a_1")))
+
+    def test_edges_to_unknown_nodes_are_not_indexed(self):
+        node_map, edges, column_meta, styles, notes, direction = Parser().parse("flowchart TB\nA[x]\nA --> B")
+        del node_map["B"]
+        graph = FlowGraph(node_map, edges, column_meta, styles, notes, direction)
+        self.assertEqual(graph.successors("A"), [])
+
+    def test_duplicate_edges_merge_with_multiplicity(self):
+        text = "flowchart LR\nA --> B\nA --> B\nA -->|x| B\nA --> B\nB ==> C\nB ==> C\nB --- C\n"
+        edges = Parser().parse(text)[1]
+        merged = merge_duplicate_edges(edges)
+
+        self.assertEqual(
+            [(edge.source, edge.target, edge.label, edge.style) for edge in merged],
+            [
+                ("A", "B", "×3", {"stroke-width": "3"}),
+                ("A", "B", "x", {}),
+                ("B", "C", "×2", {"stroke-width": "5"}),
+                ("B", "C", None, {"stroke-dasharray": "6 4", "marker-end": "none"}),
+            ],
+        )
+        self.assertEqual(Parser(merge_duplicates=True).parse(text)[1], merged)
+        unique = edges[2:4]
+        self.assertIs(merge_duplicate_edges(unique), unique)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from py_mermaid.src.lod import SUMMARY_CLASS, LevelOfDetail
+from py_mermaid.src.parser import Parser
+
+def build_chart():
+    lines = ["flowchart LR"]
+    for group, size in (("alpha", 6), ("beta", 3)):
+        lines.append(f"subgraph {group}")
+        lines.extend(f"{group}_{idx}[{group} {idx}]" for idx in range(size))
+        lines.append("end")
+    lines.append("solo[Solo]")
+    lines.extend(f"alpha_{idx} --> alpha_{idx + 1}" for idx in range(5))
+    lines.extend(f"alpha_{idx} --> beta_{idx % 3}" for idx in range(6))
+    lines.extend(["solo --> alpha_0", "solo --> beta_1", "beta_2 --> solo"])
+    lines.append("note right of alpha_0: hidden when collapsed")
+    return Parser().parse("\n".join(lines))
+
+class TestLevelOfDetail(unittest.TestCase):
+    def setUp(self):
+        self.lod = LevelOfDetail(*build_chart())
+
+    def test_overview_collapses_every_subgraph(self):
+        node_map, edges, _, styles, notes, _ = self.lod.model()
+
+        self.assertEqual(set(node_map), {"solo", "subgraph:alpha", "subgraph:beta"})
+        self.assertEqual(node_map["subgraph:alpha"].class_name, SUMMARY_CLASS)
+        self.assertIn("5 edges", node_map["subgraph:alpha"].label)
+        self.assertIn(SUMMARY_CLASS, styles)
+        pairs = {(edge.source, edge.target): edge for edge in edges}
+        self.assertEqual(pairs[("subgraph:alpha", "subgraph:beta")].label, "×6")
+        self.assertIn(("solo", "subgraph:alpha"), pairs)
+        self.assertIn(("subgraph:beta", "solo"), pairs)
+        self.assertEqual(notes, [])
+
+    def test_threshold_and_expand(self):
+        node_map, edges, _, _, _, _ = self.lod.model(threshold=4)
+        self.assertIn("subgraph:alpha", node_map)
+        self.assertIn("beta_0", node_map)
+        pairs = {(edge.source, edge.target): edge for edge in edges}
+        self.assertEqual(pairs[("subgraph:alpha", "beta_0")].label, "×2")
+
+        node_map, _, _, _, notes, _ = self.lod.model(expand=["alpha"])
+        self.assertIn("alpha_0", node_map)
+        self.assertIn("subgraph:beta", node_map)
+        self.assertEqual(len(notes), 1)
+
+    def test_render_reuses_cached_layouts(self):
+        overview = self.lod.render()
+        self.assertIn("alpha", overview)
+        self.assertNotIn("alpha 3", overview)
+        self.assertEqual(self.lod.render(), overview)
+
+        detail = self.lod.render_subgraph("alpha")
+        self.assertIn("alpha 3", detail)
+        self.assertNotIn("beta 0", detail)
+        self.assertEqual(len(self.lod._layouts), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,6 @@
+import io
+import os
+import tempfile
 import unittest
 from py_mermaid.src.parser import Parser
 
@@ -24,5 +27,105 @@ class TestParser(unittest.TestCase):
         self.assertEqual(edges[1].source, "B")
         self.assertEqual(edges[1].target, "C")
 
+    def test_multiline_label_is_joined(self):
+        flowchart_text = """
+        flowchart LR
+            A[First line
+            second line
+            third line]
+            A --> B
+            B[End]
+        """
+        parser = Parser()
+        lines = list(parser._normalize_lines(flowchart_text))
+
+        self.assertEqual(lines[1], "A[First line second line third line]")
+        self.assertEqual(len(lines), 4)
+
+    def test_parse_accepts_line_iterable(self):
+        source = io.StringIO("flowchart LR\nA[Start\nmore]\nB[End]\nA --> B\n")
+        parser = Parser()
+        node_map, edges, _, _, _, direction = parser.parse(source)
+
+        self.assertEqual(direction, "LR")
+        self.assertEqual(node_map["A"].label, "Start more")
+        self.assertEqual(len(edges), 1)
+
+    def test_parse_file_with_and_without_mmap(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "chart.mmd")
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("flowchart TB\nA[Start]\nB[Ünïcode]\nA --> B\n")
+            parser = Parser()
+            for use_mmap in (False, True):
+                node_map, edges, _, _, _, _ = parser.parse_file(path, use_mmap=use_mmap)
+                self.assertEqual(node_map["B"].label, "Ünïcode")
+                self.assertEqual(len(edges), 1)
+
+            empty = os.path.join(tmp, "empty.mmd")
+            open(empty, "w").close()
+            node_map, edges, _, _, _, _ = parser.parse_file(empty, use_mmap=True)
+            self.assertEqual(node_map, {})
+
+    def test_rows_and_columns_follow_priority_and_headers(self):
+        flowchart_text = """
+        flowchart LR
+            b_1[Loose]:::custom
+            a_1[Org]:::org
+            b_0[Team B]:::header
+            c_1[Unclassed]
+            a_0[Team A]:::header
+            class c_1 infra
+            d_1[Plain]
+        """
+        node_map, _, column_meta, _, _, _ = Parser().parse(flowchart_text)
+
+        self.assertEqual([meta.key for meta in column_meta], ["b", "a", "c", "d"])
+        self.assertEqual(column_meta[0].label, "Team B")
+        self.assertEqual(node_map["b_1"].column_key, "b")
+        self.assertEqual(node_map["a_1"].column_index, 1)
+        rows = {node_id: node.row_index for node_id, node in node_map.items()}
+        self.assertEqual(rows, {"b_0": 0, "a_0": 0, "a_1": 1, "c_1": 2, "b_1": 3, "d_1": 4})
+
+    def test_node_shapes_and_inline_definitions(self):
+        flowchart_text = """
+        graph TD
+            A(Round) --> B{Decide?}:::org
+            B -->|yes| C((Circle)) -.-> D([Stadium])
+            B -- no --> E[[Sub]] ==> F[(Store)]
+            G{{Hex}}
+            H[/Lean/]
+            I[\\Back\\]
+            J[/Top\\]
+            K>Flag]
+            L(((Ring)))
+            M[Uses (parens) / slash]
+            B
+            N[Plain] --> B
+            not a statement
+        """
+        node_map, edges, _, _, _, direction = Parser().parse(flowchart_text)
+
+        self.assertEqual(direction, "TB")
+        shapes = {node_id: node.shape for node_id, node in node_map.items()}
+        self.assertEqual(
+            shapes,
+            {
+                "A": "round", "B": "diamond", "C": "circle", "D": "stadium", "E": "subroutine",
+                "F": "cylinder", "G": "hexagon", "H": "parallelogram", "I": "parallelogram_alt",
+                "J": "trapezoid", "K": "asymmetric", "L": "doublecircle", "M": "rect", "N": "rect",
+            },
+        )
+        self.assertEqual(node_map["B"].label, "Decide?")
+        self.assertEqual(node_map["B"].class_name, "org")
+        self.assertEqual(node_map["M"].label, "Uses (parens) / slash")
+        self.assertEqual(
+            [(edge.source, edge.target, edge.label) for edge in edges],
+            [("A", "B", None), ("B", "C", "yes"), ("C", "D", None), ("B", "E", "no"), ("E", "F", None), ("N", "B", None)],
+        )
+        self.assertEqual(edges[2].style, {"stroke-dasharray": "2 4"})
+        self.assertEqual(edges[4].style, {"stroke-width": "4"})
+        self.assertNotIn("not", node_map)
+
 if __name__ == '__main__':
     unittest.main()
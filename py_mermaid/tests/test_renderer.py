@@ -1,5 +1,6 @@
 import unittest
 from py_mermaid.src.parser import Parser
+from py_mermaid.src.pipeline import render_diagram, render_diagram_bytes
 from py_mermaid.src.renderer import Renderer
 
 class TestRenderer(unittest.TestCase):
@@ -22,5 +23,41 @@ class TestRenderer(unittest.TestCase):
         self.assertIn('Start', svg_output)
         self.assertIn('End', svg_output)
 
+    def test_node_shapes_are_drawn(self):
+        node_map, edges, column_meta, styles, notes, direction = Parser().parse(
+            "flowchart LR\nA{Decide} --> B((Done))\nC[(Store)]\nD[[Sub]]\nE[Box]\n"
+        )
+        svg_output = Renderer().render(node_map, edges, column_meta, styles, notes, direction)
+        self.assertEqual(svg_output.count("<polygon"), 1)
+        self.assertEqual(svg_output.count("<ellipse"), 1)
+        self.assertIn("<path d=\"M ", svg_output)
+        self.assertEqual(svg_output.count("<line x1"), 3)
+        self.assertIn('rx="0.0"', svg_output)
+
+    def test_bytes_output_matches_text_output(self):
+        for text in ("flowchart TB\nA[Ünïcode & <b>]\nA --> B\n", "sequenceDiagram\nA->>B: héllo\n"):
+            data = render_diagram_bytes(text)
+            self.assertIsInstance(data, memoryview)
+            self.assertEqual(data.tobytes(), render_diagram(text).encode("utf-8"))
+
+    def test_parallel_edges_between_clusters_share_a_trunk(self):
+        lines = ["flowchart LR"] + [f"a_{idx}[A{idx}]" for idx in range(4)] + [f"b_{idx}[B{idx}]" for idx in range(2)]
+        lines += ["a_0 --> b_0", "a_1 --> b_0", "a_2 --> b_1", "a_3 -->|kept| b_1", "b_0 --> a_0", "a_0 --> a_1"]
+        model = Parser().parse("\n".join(lines))
+        node_map, edges, column_meta, _, notes, direction = model
+        renderer = Renderer(bundle_edges=True)
+        layout = renderer.layout(node_map, column_meta, notes, direction, edges)
+
+        self.assertEqual([bundle.edge_indexes for bundle in layout.bundles], [[0, 1, 2]])
+        svg = renderer.render(*model, layout=layout)
+        self.assertIn('<g id="bundle-0">', svg)
+        for idx in (0, 1, 2):
+            self.assertNotIn(f'<g id="edge-{idx}">', svg)
+        for idx in (3, 4, 5):
+            self.assertIn(f'<g id="edge-{idx}">', svg)
+        bundle = svg.split('<g id="bundle-0">')[1].split("</g>")[0]
+        self.assertEqual(bundle.count("marker-end=\"url(#arrow)\""), 2)
+        self.assertEqual(Renderer(bundle_edges=True, bundle_min_edges=4).render(*model), Renderer().render(*model))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,140 @@
+import gc
+import math
+import os
+import random
+import time
+import unittest
+
+from py_mermaid.benchmarks.generators import flowchart_source, multiline_label_source, sequence_source
+from py_mermaid.src.parser import Parser
+from py_mermaid.src.renderer import Renderer
+from py_mermaid.src.sequence import DEFAULT_STYLE, SequenceParser, SequenceRenderer
+
+SIZES = [400, 800, 1600, 3200]
+REPEATS = 3
+# Slack on top of the declared exponent for timer noise and n log n terms.
+TOLERANCE = 0.4
+LINEAR = 1.0
+FUZZ_ENV = "PY_MERMAID_FUZZ"
+
+def time_call(func, args):
+    best = math.inf
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            func(*args)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return best
+
+def growth_exponent(sizes, timings):
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(timing, 1e-9)) for timing in timings]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    return numerator / denominator
+
+def measure(setup, run, sizes=SIZES):
+    timings = [time_call(run, setup(size)) for size in sizes]
+    return growth_exponent(sizes, timings)
+
+def flowchart_model(size):
+    return Parser().parse(flowchart_source(size))
+
+def flowchart_layout_args(size):
+    node_map, _, column_meta, _, notes, direction = flowchart_model(size)
+    return node_map, column_meta, notes, direction
+
+def flowchart_svg_args(size):
+    node_map, edges, column_meta, styles, notes, direction = flowchart_model(size)
+    layout = Renderer().layout(node_map, column_meta, notes, direction)
+    return node_map, edges, styles, layout, notes
+
+def sequence_model(size):
+    return SequenceParser().parse(sequence_source(size))
+
+def sequence_layout_args(size):
+    participants, messages, notes, _, _, _ = sequence_model(size)
+    return participants, messages, notes
+
+def sequence_svg_args(size):
+    participants, messages, notes, activations, fragments, overrides = sequence_model(size)
+    layout = SequenceRenderer().layout(participants, messages, notes)
+    return participants, messages, notes, activations, fragments, layout, {**DEFAULT_STYLE, **overrides}
+
+# (stage name, argument factory, stage under test, declared exponent)
+STAGES = [
+    ("flowchart normalize", lambda n: (flowchart_source(n),), lambda text: list(Parser()._normalize_lines(text)), LINEAR),
+    ("multi-line label normalize", lambda n: (multiline_label_source(n * 4),), lambda text: list(Parser()._normalize_lines(text)), LINEAR),
+    ("flowchart parse", lambda n: (flowchart_source(n),), Parser().parse, LINEAR),
+    ("flowchart layout", flowchart_layout_args, Renderer().layout, LINEAR),
+    ("flowchart svg", flowchart_svg_args, Renderer()._render_svg, LINEAR),
+    ("sequence parse", lambda n: (sequence_source(n),), SequenceParser().parse, LINEAR),
+    ("sequence layout", sequence_layout_args, SequenceRenderer().layout, LINEAR),
+    ("sequence svg", sequence_svg_args, SequenceRenderer()._render_svg, LINEAR),
+]
+
+class TestScalingExponents(unittest.TestCase):
+    def test_stage_growth_stays_within_declared_class(self):
+        for name, setup, run, declared in STAGES:
+            with self.subTest(stage=name):
+                exponent = measure(setup, run)
+                if exponent > declared + TOLERANCE:
+                    # One retry filters out a noisy neighbour on shared CI boxes.
+                    exponent = min(exponent, measure(setup, run))
+                self.assertLessEqual(
+                    exponent,
+                    declared + TOLERANCE,
+                    f"{name} grows like n^{exponent:.2f}, declared n^{declared:.1f}",
+                )
+
+    def test_exponent_fit_detects_quadratic_work(self):
+        quadratic = lambda n: sum(1 for _ in range(n) for _ in range(n // 8))
+        self.assertGreater(measure(lambda n: (n,), quadratic), LINEAR + TOLERANCE)
+
+FUZZ_STATEMENTS = [
+    lambda rng, idx: f"n{rng.randrange(idx + 1)}[label {'[' * rng.randrange(3)}{idx}{']' * rng.randrange(3)}]",
+    lambda rng, idx: f"n{rng.randrange(idx + 1)} --> n{rng.randrange(idx + 1)} --- n{idx}",
+    lambda rng, idx: f"subgraph g{idx % 7}",
+    lambda rng, idx: "end",
+    lambda rng, idx: f"class n{rng.randrange(idx + 1)} c{idx % 13}",
+    lambda rng, idx: f"classDef c{idx % 13} fill:#{idx % 999:03d}",
+    lambda rng, idx: f"linkStyle {','.join(str(rng.randrange(idx + 1)) for _ in range(3))} stroke:#000",
+    lambda rng, idx: f"note {rng.choice(['left', 'right', 'top', 'bottom'])} of n{rng.randrange(idx + 1)}: x",
+    lambda rng, idx: "%% comment",
+    lambda rng, idx: f"n{idx}[{'word ' * rng.randrange(1, 40)}]",
+]
+
+def fuzz_flowchart(weights, size, seed):
+    rng = random.Random(seed)
+    lines = ["flowchart TB"]
+    for idx in range(size):
+        statement = rng.choices(FUZZ_STATEMENTS, weights=weights)[0]
+        lines.append(statement(rng, idx))
+    return "\n".join(lines) + "\n"
+
+def render_flowchart(text):
+    Renderer().render(*Parser().parse(text))
+
+@unittest.skipUnless(os.environ.get(FUZZ_ENV), f"set {FUZZ_ENV}=<iterations> to search for pathological inputs")
+class TestScalingFuzz(unittest.TestCase):
+    def test_random_statement_mixes_stay_linear(self):
+        iterations = int(os.environ[FUZZ_ENV]) if os.environ[FUZZ_ENV].isdigit() else 20
+        rng = random.Random(int(os.environ.get("PY_MERMAID_FUZZ_SEED", "0")))
+        worst = (0.0, None)
+        for _ in range(iterations):
+            weights = [rng.random() ** 2 for _ in FUZZ_STATEMENTS]
+            seed = rng.randrange(1 << 30)
+            exponent = measure(lambda n: (fuzz_flowchart(weights, n, seed),), render_flowchart, sizes=[250, 500, 1000, 2000])
+            if exponent > worst[0]:
+                worst = (exponent, (weights, seed))
+        self.assertLessEqual(worst[0], LINEAR + TOLERANCE, f"pathological mix found: {worst[1]}")
+
+if __name__ == '__main__':
+    unittest.main()
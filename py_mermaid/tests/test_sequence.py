@@ -1,5 +1,9 @@
+import io
+import os
+import tempfile
 import unittest
-from py_mermaid.src.sequence import SequenceParser, SequenceRenderer
+from py_mermaid.benchmarks.generators import sequence_source
+from py_mermaid.src.sequence import SequenceParser, SequenceRenderer, stream_sequence_file
 
 class TestSequenceDiagram(unittest.TestCase):
     def test_simple_sequence(self):
@@ -93,5 +97,85 @@ class TestSequenceDiagram(unittest.TestCase):
         self.assertEqual(fragment.sections[0].label, "successful case")
         self.assertEqual(fragment.sections[1].label, "an error")
 
+    def test_parse_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.mmd")
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("sequenceDiagram\n")
+                for idx in range(50):
+                    handle.write(f"A->>B: ping {idx}\n")
+            parser = SequenceParser()
+            for use_mmap in (False, True):
+                participants, messages, _, _, _, _ = parser.parse_file(path, use_mmap=use_mmap)
+                self.assertEqual([p.name for p in participants], ["A", "B"])
+                self.assertEqual(len(messages), 50)
+                self.assertEqual(messages[-1].text, "ping 49")
+
+    def test_fold_repeated_messages(self):
+        lines = ["sequenceDiagram", "A->>B: start"]
+        for idx in range(200):
+            lines.append(f"A->>B: heartbeat 10:{idx // 60:02d}:{idx % 60:02d}")
+            lines.append("B-->>A: ack")
+            if idx == 150:
+                lines.append("%% comments do not break a run")
+        lines += ["Note over A: done", "A->>B: x", "A->>B: x", "B->>A: y"]
+        text = "\n".join(lines)
+
+        participants, messages, notes, activations, fragments, _ = SequenceParser(fold_repeats=True).parse(text)
+
+        self.assertEqual([m.text for m in messages], ["start", "heartbeat 10:00:00", "ack", "x", "x", "y"])
+        self.assertEqual([m.row_index for m in messages], [0, 1, 2, 4, 5, 6])
+        self.assertEqual(notes[0].row_index, 3)
+        self.assertEqual(len(fragments), 1)
+        loop = fragments[0]
+        self.assertEqual((loop.kind, loop.start_row, loop.end_row), ("loop", 1, 3))
+        self.assertEqual(loop.repeat_count, 200)
+        self.assertEqual((loop.first_timestamp, loop.last_timestamp), ("10:00:00", "10:03:19"))
+        self.assertEqual(loop.label, "×200 (10:00:00 – 10:03:19)")
+
+        unfolded = SequenceParser().parse(text)
+        self.assertEqual(len(unfolded[1]), 404)
+        svg = SequenceRenderer().render(participants, messages, notes, activations, fragments, {})
+        self.assertIn("×200", svg)
+
+    def test_note_with_arrow_text_ends_a_folded_run(self):
+        source = "sequenceDiagram\n" + "A->>B: ping\n" * 3 + "Note over A: retry -> later -- maybe\nA->>B: pong\n"
+        parser = SequenceParser(fold_repeats=True)
+        participants, messages, notes, activations, fragments, styles = parser.parse(source)
+
+        self.assertEqual([(m.text, m.row_index) for m in messages], [("ping", 0), ("pong", 2)])
+        self.assertEqual(notes[0].row_index, 1)
+        self.assertEqual(notes[0].text_lines, ["retry -> later -- maybe"])
+        self.assertEqual([(f.start_row, f.end_row) for f in fragments], [(0, 1)])
+
+        out = io.StringIO()
+        SequenceRenderer().render_stream(source.splitlines, out, parser)
+        self.assertEqual(
+            out.getvalue(),
+            SequenceRenderer().render(participants, messages, notes, activations, fragments, styles),
+        )
+
+    def test_stream_matches_render(self):
+        source = sequence_source(300, seed=3) + (
+            "A->>B: ping\nA->>B: ping\nA->>B: ping\n"
+            "Note over P0,P2: late\\nnote\n"
+            "participant P2 as Relabelled after use\n"
+            "activate P1\n"
+        )
+        for fold in (False, True):
+            parser = SequenceParser(fold_repeats=fold)
+            expected = SequenceRenderer().render(*parser.parse(source))
+            out = io.StringIO()
+            SequenceRenderer().render_stream(source.splitlines, out, parser, spool_bytes=256)
+            self.assertEqual(out.getvalue(), expected)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "seq.mmd")
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(source)
+            out = io.StringIO()
+            stream_sequence_file(path, out)
+            self.assertEqual(out.getvalue(), SequenceRenderer().render(*SequenceParser().parse(source)))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,96 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from py_mermaid.src.pipeline import render_diagram
+from py_mermaid.src.shard import build_manifest, load_manifest, merge, output_path, parse_shard, run_shard, shard_of
+
+FLOWCHART = "flowchart TB\nA[Start]\nB[End]\nA --> B\n"
+
+class TestShardedBatch(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name) / "docs"
+        self.out = Path(self._tmp.name) / "cache"
+        (self.root / "nested").mkdir(parents=True)
+        for idx in range(8):
+            (self.root / f"chart{idx}.mmd").write_text(f"flowchart LR\nA[Chart {idx}] --> B\n", encoding="utf-8")
+        (self.root / "nested" / "copy.mmd").write_text("flowchart LR\nA[Chart 0] --> B\n", encoding="utf-8")
+        (self.root / "nested" / "seq.mmd").write_text("sequenceDiagram\nA->>B: hi\n", encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/5"), (2, 5))
+        for bad in ("5/5", "x/2", "3"):
+            with self.assertRaises(ValueError):
+                parse_shard(bad)
+
+    def test_shards_cover_manifest_and_reruns_skip(self):
+        entries = build_manifest(self.root)
+        self.assertEqual(len(entries), 10)
+        self.assertEqual(entries[0].path, "chart0.mmd")
+
+        reports = [run_shard(entries, self.root, self.out, index, 3) for index in range(2)]
+        partial = merge(entries, self.out, 3)
+        self.assertFalse(partial.complete)
+        self.assertEqual(partial.missing_shards, [2])
+        self.assertEqual(
+            sorted(partial.missing),
+            sorted(entry.path for entry in entries if shard_of(entry.digest, 3) == 2),
+        )
+
+        reports.append(run_shard(entries, self.root, self.out, 2, 3))
+        self.assertEqual(sum(report.assigned for report in reports), 10)
+        self.assertEqual(sum(report.rendered for report in reports), 9)
+        result = merge(entries, self.out, 3)
+        self.assertTrue(result.complete)
+        self.assertEqual([report.index for report in result.shards], [0, 1, 2])
+        self.assertEqual(output_path(self.out, entries[0].digest).read_text(encoding="utf-8"), render_diagram(
+            (self.root / "chart0.mmd").read_text(encoding="utf-8")
+        ))
+
+        rerun = run_shard(entries, self.root, self.out, 0, 3)
+        self.assertEqual((rerun.rendered, rerun.skipped), (0, rerun.assigned))
+
+    def test_changed_source_is_reported_not_rendered(self):
+        entries = build_manifest(self.root)
+        (self.root / "chart3.mmd").write_text(FLOWCHART, encoding="utf-8")
+        report = run_shard(entries, self.root, self.out, 0, 1)
+        self.assertEqual(report.failed, [("chart3.mmd", "source changed since the manifest was built")])
+        self.assertEqual(merge(entries, self.out, 1).missing, ["chart3.mmd"])
+
+    def test_sources_are_read_as_they_are_rendered(self):
+        entries = build_manifest(self.root)
+
+        def render(text):
+            # chart5 has not been read yet when the first diagram renders.
+            (self.root / "chart5.mmd").write_text(FLOWCHART, encoding="utf-8")
+            return render_diagram(text)
+
+        report = run_shard(entries, self.root, self.out, 0, 1, render=render)
+        self.assertEqual(report.failed, [("chart5.mmd", "source changed since the manifest was built")])
+        self.assertEqual(report.rendered, 8)
+        self.assertEqual(merge(entries, self.out, 1).missing, ["chart5.mmd"])
+
+    def test_command_line_shards_run_as_separate_processes(self):
+        manifest = Path(self._tmp.name) / "manifest.json"
+        command = [sys.executable, "-m", "py_mermaid.src.shard"]
+        subprocess.run(command + ["manifest", str(self.root), str(manifest)], check=True, capture_output=True)
+        shards = [
+            subprocess.Popen(command + ["run", str(manifest), str(self.out), "--shard", f"{idx}/2"], stdout=subprocess.PIPE)
+            for idx in range(2)
+        ]
+        self.assertEqual([shard.wait() for shard in shards], [0, 0])
+        for shard in shards:
+            shard.stdout.close()
+        merged = subprocess.run(command + ["merge", str(manifest), str(self.out), "--shards", "2"], capture_output=True, text=True)
+        self.assertEqual(merged.returncode, 0, merged.stdout)
+        self.assertIn("10/10 outputs present", merged.stdout)
+        self.assertEqual(len(load_manifest(manifest)[1]), 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import json
+import re
+import unittest
+
+from py_mermaid.benchmarks.generators import flowchart_source
+from py_mermaid.src.export import dumps_layout
+from py_mermaid.src.pipeline import render_diagram, render_with_sidecar
+from py_mermaid.src.sidecar import HitIndex
+
+FLOWCHART = """flowchart LR
+a_0[Alpha service]:::header --> a_1[Beta store]
+a_1 -->|replicates to| b_1[Gamma cache]
+note right of a_0: owned by platform
+"""
+
+SEQUENCE = """sequenceDiagram
+participant A as Alice
+A->>B: fetch token
+B->>B: refresh
+Note over A,B: tokens expire
+"""
+
+class TestSidecar(unittest.TestCase):
+    def test_flowchart_hits_and_search(self):
+        svg, payload = render_with_sidecar(FLOWCHART)
+        self.assertEqual(svg, render_diagram(FLOWCHART))
+        group_ids = set(re.findall(r'<g id="([^"]+)">', svg))
+        ids = [item[0] for item in payload["items"]]
+        self.assertTrue(set(ids) <= group_ids)
+        self.assertIn("edge-1", ids)
+        svg_order = [group for group in re.findall(r'<g id="([^"]+)">', svg) if group in ids]
+        self.assertEqual(ids, svg_order)
+
+        index = HitIndex(json.loads(dumps_layout(payload)))
+        node = payload["items"][ids.index("node-a_1")]
+        self.assertEqual(index.hit(node[2] + node[4] / 2, node[3] + node[5] / 2)[0], "node-a_1")
+        self.assertEqual(index.hit(-50, -50), [])
+        self.assertEqual(index.search("beta"), ["node-a_1"])
+        self.assertEqual(index.search("repl"), ["edge-1"])
+        self.assertEqual(index.search("owned plat"), ["note-0"])
+        self.assertEqual(index.search("alpha store"), [])
+
+    def test_sequence_hits_and_search(self):
+        svg, payload = render_with_sidecar(SEQUENCE)
+        index = HitIndex(payload)
+        ids = [item[0] for item in payload["items"]]
+        self.assertEqual(ids, ["participant-A", "participant-B", "message-0", "message-1", "note-2"])
+        self.assertEqual(index.search("ALICE"), ["participant-A"])
+        self.assertEqual(index.search("tok"), ["message-0", "note-2"])
+        message = payload["items"][2]
+        self.assertIn("message-0", index.hit(message[2] + message[4] / 2, message[3] + message[5] / 2))
+
+    def test_every_item_is_reachable_through_its_cells(self):
+        _, payload = render_with_sidecar(flowchart_source(300))
+        index = HitIndex(payload)
+        for item in payload["items"][:300]:
+            self.assertIn(item[0], index.hit(item[2] + item[4] / 2, item[3] + item[5] / 2))
+        # Long edges go to coarse levels, so no item fills more than a 2x2 block of cells.
+        entries = sum(len(indexes) for cells in payload["levels"] for indexes in cells.values())
+        self.assertLessEqual(entries, 4 * len(payload["items"]))
+
+if __name__ == '__main__':
+    unittest.main()
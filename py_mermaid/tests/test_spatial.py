@@ -0,0 +1,94 @@
+import itertools
+import time
+import unittest
+
+from py_mermaid.benchmarks.generators import flowchart_source
+from py_mermaid.src.parser import Parser
+from py_mermaid.src.renderer import Renderer
+from py_mermaid.src.spatial import LayeredSpatialHash, SpatialHash, rects_overlap, segment_intersects_rect
+
+class TestSpatialHash(unittest.TestCase):
+    def test_query_insert_and_remove(self):
+        grid = SpatialHash(cell_size=10)
+        grid.insert("a", (0, 0, 25, 5))
+        grid.insert("b", (40, 40, 5, 5))
+
+        self.assertEqual(list(grid.query((20, 0, 4, 4))), ["a"])
+        self.assertEqual(list(grid.query((26, 0, 4, 4))), [])
+        self.assertFalse(grid.is_free((41, 41, 1, 1)))
+        grid.remove("b")
+        self.assertTrue(grid.is_free((41, 41, 1, 1)))
+        self.assertEqual(len(grid), 1)
+
+    def test_find_free_returns_nearest_clear_slot(self):
+        grid = SpatialHash(cell_size=10)
+        grid.insert("block", (0, 0, 10, 10))
+
+        self.assertEqual(grid.find_free((20, 20, 5, 5)), (20, 20, 5, 5))
+        slot = grid.find_free((2, 2, 5, 5), gap=1)
+        self.assertFalse(rects_overlap(slot, (0, 0, 10, 10)))
+        self.assertLessEqual(abs(slot[0] - 2) + abs(slot[1] - 2), 10)
+
+    def test_layered_hash_keeps_long_rects_on_coarse_levels(self):
+        grid = LayeredSpatialHash(cell_size=10)
+        grid.insert("small", (0, 0, 5, 5))
+        grid.insert("long", (0, 0, 10000, 2))
+
+        self.assertEqual(len(grid), 2)
+        self.assertEqual(sum(len(level.buckets()) for level in grid.levels), 1 + 1)
+        self.assertEqual(sorted(grid.query((1, 1, 2, 2))), ["long", "small"])
+        self.assertEqual(list(grid.query((9000, 0, 5, 5))), ["long"])
+        self.assertEqual(list(grid.query((9000, 50, 5, 5))), [])
+
+    def test_segment_intersects_rect(self):
+        window = (10, 10, 10, 10)
+        self.assertTrue(segment_intersects_rect((0, 0), (30, 30), window))
+        self.assertTrue(segment_intersects_rect((15, 15), (16, 16), window))
+        self.assertFalse(segment_intersects_rect((0, 30), (5, 0), window))
+        self.assertFalse(segment_intersects_rect((0, 5), (30, 5), window))
+
+class TestCollisionAvoidance(unittest.TestCase):
+    def _dense_chart(self, size, parallel=12):
+        lines = ["flowchart LR"]
+        lines.extend(f"hub{idx}[Hub {idx}]" for idx in range(2))
+        lines.extend(f"n{idx}[Node {idx}]" for idx in range(size))
+        lines.extend(f"hub0 -->|label {idx}| hub1" for idx in range(parallel))
+        lines.extend(f"n{idx} -->|to {idx + 1}| n{idx + 1}" for idx in range(size - 1))
+        lines.extend(f"note right of n{idx}: note {idx}" for idx in range(size))
+        lines.extend(f"note left of n{idx}: other {idx}" for idx in range(size))
+        return Parser().parse("\n".join(lines))
+
+    def test_labels_and_notes_do_not_overlap(self):
+        node_map, edges, column_meta, styles, notes, direction = self._dense_chart(30)
+        renderer = Renderer(avoid_collisions=True)
+        layout = renderer.layout(node_map, column_meta, notes, direction, edges)
+
+        rects = [(box.x, box.y, box.width, box.height) for box in layout.nodes.values()]
+        rects.extend((box.x, box.y, box.width, box.height) for box in layout.notes)
+        for idx, (label_x, label_y) in layout.edge_labels.items():
+            rects.append(renderer._edge_label_rect(edges[idx].label, label_x, label_y))
+        self.assertEqual(len(layout.edge_labels), len(edges))
+        for first, second in itertools.combinations(rects, 2):
+            self.assertFalse(rects_overlap(first, second), (first, second))
+
+        svg = renderer.render(node_map, edges, column_meta, styles, notes, direction, layout=layout)
+        label_x, label_y = layout.edge_labels[11]
+        self.assertIn(f'<text x="{label_x:.2f}" y="{label_y:.2f}"', svg)
+
+    def test_default_renderer_keeps_raw_midpoints(self):
+        node_map, edges, column_meta, _, notes, direction = self._dense_chart(5)
+        layout = Renderer().layout(node_map, column_meta, notes, direction, edges)
+        self.assertEqual(layout.edge_labels, {})
+
+    def test_placement_cost_stays_flat_per_label(self):
+        renderer = Renderer(avoid_collisions=True)
+        per_item = []
+        for size in (500, 4000):
+            node_map, edges, column_meta, _, notes, direction = Parser().parse(flowchart_source(size))
+            start = time.perf_counter()
+            renderer.layout(node_map, column_meta, notes, direction, edges)
+            per_item.append((time.perf_counter() - start) / size)
+        self.assertLess(per_item[1], per_item[0] * 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from py_mermaid.src.parser import Parser
+from py_mermaid.src.renderer import Renderer
+from py_mermaid.src.styles import DEFAULT_NODE_STYLE, StyleTable, resolve_node_styles
+from py_mermaid.src.tiles import TiledFlowchart
+
+class TestStyleTable(unittest.TestCase):
+    def test_identical_overrides_share_one_entry(self):
+        table = StyleTable({"stroke": "#000", "stroke-width": "2"})
+        default_id = table.intern({})
+        dashed_a = table.intern({"stroke-dasharray": "6 4"})
+        dashed_b = table.intern({"stroke-dasharray": "6 4"})
+        red = table.intern({"stroke": "#f00"})
+
+        self.assertEqual(default_id, 0)
+        self.assertEqual(dashed_a, dashed_b)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.attributes(default_id), 'stroke="#000" stroke-width="2"')
+        self.assertEqual(table.attributes(dashed_a), 'stroke="#000" stroke-width="2" stroke-dasharray="6 4"')
+        self.assertEqual(table.attributes(red), 'stroke="#f00" stroke-width="2"')
+
+    def test_edge_style_changes_after_parsing_reach_the_svg(self):
+        parsed = Parser().parse("flowchart LR\nA --> B\nB --- C\nlinkStyle 1 stroke:#0a0\n")
+        edges = parsed[1]
+        edges[0].style["stroke"] = "#f00"
+        svg = Renderer().render(*parsed)
+
+        self.assertIn('stroke="#f00"', svg)
+        self.assertIn('stroke="#0a0" stroke-width="2" marker-end="none" stroke-dasharray="6 4"', svg)
+        tiled = TiledFlowchart(*parsed)
+        width, height = tiled.canvas_size
+        self.assertIn('stroke="#f00"', tiled.render_viewport(0, 0, width, height))
+
+    def test_resolve_node_styles(self):
+        resolved = resolve_node_styles({"warm": {"fill": "#fa0", "color": "#111"}})
+
+        self.assertIs(resolved[None], DEFAULT_NODE_STYLE)
+        self.assertEqual(resolved["warm"].box, 'fill="#fa0" stroke="#666666"')
+        self.assertEqual(resolved["warm"].text, 'fill="#111"')
+
+if __name__ == '__main__':
+    unittest.main()
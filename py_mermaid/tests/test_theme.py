@@ -0,0 +1,40 @@
+import unittest
+
+from py_mermaid.benchmarks.generators import flowchart_source, sequence_source
+from py_mermaid.src.parser import Parser
+from py_mermaid.src.pipeline import prepare_diagram, render_diagram
+from py_mermaid.src.renderer import Renderer
+from py_mermaid.src.sequence import SequenceParser, SequenceRenderer
+
+class TestPreparedDiagram(unittest.TestCase):
+    def test_flowchart_theme_matches_full_render(self):
+        text = flowchart_source(60) + "classDef org fill:#eef,stroke:#00f\nZ[Loose]:::unstyled\n"
+        prepared = prepare_diagram(text)
+        self.assertEqual(prepared.render(), render_diagram(text))
+
+        theme = {"org": {"fill": "#111"}, "unstyled": {"color": "#fff"}, "header": {"stroke": "#0f0", "color": "#eee"}}
+        node_map, edges, column_meta, styles, notes, direction = Parser().parse(text)
+        themed = dict(styles)
+        for name, style in theme.items():
+            themed[name] = {**styles.get(name, {}), **style}
+        expected = Renderer().render(node_map, edges, column_meta, themed, notes, direction)
+        self.assertEqual(prepared.render(theme), expected)
+        self.assertEqual(prepared.render(), render_diagram(text))
+
+    def test_sequence_theme_matches_full_render(self):
+        text = sequence_source(40)
+        prepared = prepare_diagram(text)
+        self.assertEqual(prepared.render(), render_diagram(text))
+
+        theme = {"message": "#abcdef", "participantFill": "#000000", "noteText": "#123456"}
+        *entities, overrides = SequenceParser().parse(text)
+        expected = SequenceRenderer().render(*entities, {**overrides, **theme})
+        self.assertEqual(prepared.render(theme), expected)
+
+    def test_nul_in_source_falls_back_to_full_render(self):
+        text = "flowchart LR\nA[Odd \x001\x00 label]:::org --> B\n"
+        prepared = prepare_diagram(text)
+        self.assertEqual(prepared.render(), render_diagram(text))
+
+if __name__ == '__main__':
+    unittest.main()
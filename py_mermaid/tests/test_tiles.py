@@ -0,0 +1,92 @@
+import re
+import time
+import unittest
+
+from py_mermaid.benchmarks.generators import flowchart_source
+from py_mermaid.src.parser import Parser
+from py_mermaid.src.renderer import Renderer
+from py_mermaid.src.spatial import rects_overlap, segment_intersects_rect
+from py_mermaid.src.tiles import CULL_MARGIN, TiledFlowchart
+
+GROUP_ID = re.compile(r'<g id="([^"]+)">')
+
+class TestTiledFlowchart(unittest.TestCase):
+    def setUp(self):
+        self.model = Parser().parse(flowchart_source(400))
+        self.renderer = Renderer(bundle_edges=True)
+        self.tiled = TiledFlowchart(*self.model, renderer=self.renderer)
+
+    def test_full_viewport_matches_full_render(self):
+        width, height = self.tiled.canvas_size
+        full = self.renderer.render(*self.model, layout=self.tiled.layout)
+        view = self.tiled.render_viewport(0, 0, width, height)
+        self.assertEqual(GROUP_ID.findall(view), GROUP_ID.findall(full))
+        self.assertEqual(view.count("<"), full.count("<"))
+
+    def test_tile_emits_only_intersecting_elements(self):
+        node_map, edges, _, _, notes, _ = self.model
+        rects = {
+            f"{kind}-{key}": rect
+            for kind, key, rect in self.renderer.element_rects(node_map, edges, notes, self.tiled.layout)
+        }
+        x, y, span = 300, 200, 256
+        tile = self.tiled.render_tile(0, x // span, y // span)
+        left, top = x // span * span, y // span * span
+        self.assertIn(f'viewBox="{left} {top} {span} {span}"', tile)
+        window = (left - CULL_MARGIN, top - CULL_MARGIN, span + 2 * CULL_MARGIN, span + 2 * CULL_MARGIN)
+        shown = [group for group in GROUP_ID.findall(tile) if not group.startswith("column-")]
+        self.assertTrue(shown)
+        self.assertLess(len(shown), len(rects) / 4)
+        for group in shown:
+            if not group.startswith("note-"):
+                self.assertTrue(rects_overlap(rects[group], window), group)
+        for group, rect in rects.items():
+            if not rects_overlap(rect, window):
+                continue
+            kind, _, key = group.partition("-")
+            if kind != "edge":
+                self.assertIn(group, shown)
+                continue
+            # Edges are culled by their line, not their bounding box.
+            edge = edges[int(key)]
+            boxes = self.tiled.layout.nodes
+            if segment_intersects_rect(boxes[edge.source].center(), boxes[edge.target].center(), window):
+                self.assertIn(group, shown)
+            elif not edge.label:
+                self.assertNotIn(group, shown)
+
+    def test_column_backgrounds_are_clipped(self):
+        tile = self.tiled.render_viewport(100, 300, 50, 40)
+        backgrounds = re.findall(
+            r'<rect x="([\d.]+)" y="([\d.]+)" width="([\d.]+)" height="([\d.]+)" rx="0" ry="0" fill=', tile
+        )
+        self.assertTrue(backgrounds)
+        for x, y, width, height in backgrounds:
+            self.assertGreaterEqual(float(x), 100)
+            self.assertEqual((float(y), float(height)), (300, 40))
+            self.assertLessEqual(float(x) + float(width), 150)
+        self.assertNotIn('font-size="16"', tile)
+
+    def test_tile_grid_covers_canvas(self):
+        width, height = self.tiled.canvas_size
+        cols, rows = self.tiled.tile_grid(1)
+        self.assertGreaterEqual(cols * 128, width)
+        self.assertGreaterEqual(rows * 128, height)
+        tile = self.tiled.render_tile(1, cols - 1, rows - 1)
+        self.assertIn('width="256" height="256"', tile)
+        self.assertEqual(self.tiled.tile_grid(-20), (1, 1))
+
+    def test_tile_cost_tracks_visible_content(self):
+        small = TiledFlowchart.from_text(flowchart_source(500))
+        large = TiledFlowchart.from_text(flowchart_source(5000))
+
+        def per_tile(tiled):
+            started = time.perf_counter()
+            for _ in range(20):
+                tiled.render_tile(0, 1, 1)
+            return time.perf_counter() - started
+
+        self.assertLess(per_tile(large), per_tile(small) * 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+from py_mermaid.benchmarks.generators import flowchart_source
+from py_mermaid.src.diagnostics import ERROR, WARNING, has_errors
+from py_mermaid.src.parser import Parser
+from py_mermaid.src.pipeline import validate_diagram, validate_many
+from py_mermaid.src.sequence import SequenceParser
+
+FLOWCHART = """flowchart XY
+A[Start] --> B
+B[Multi
+line] --> C
+
+end
+this is not a statement
+linkStyle 0,7,x stroke:#f00
+classDef broken
+class D org
+note left of : empty
+subgraph open
+C --> A
+"""
+
+SEQUENCE = """sequenceDiagram
+A->>B: hi
+A: ping -> pong
+deactivate B
+loop forever
+A-)B: unknown
+end
+end
+else
+alt never closed
+B-->>A: bye
+"""
+
+class TestValidate(unittest.TestCase):
+    def test_flowchart_diagnostics_carry_line_numbers(self):
+        diagnostics = Parser().validate(FLOWCHART)
+        found = [(item.line, item.severity, item.code) for item in diagnostics]
+        self.assertEqual(
+            found,
+            [
+                (1, WARNING, "unknown-direction"),
+                (6, ERROR, "unmatched-end"),
+                (7, ERROR, "unparsed-line"),
+                (8, ERROR, "invalid-link-style"),
+                (9, ERROR, "invalid-classdef"),
+                (11, ERROR, "invalid-note"),
+                (13, WARNING, "unclosed-subgraph"),
+                (8, ERROR, "link-style-index"),
+                (13, WARNING, "unknown-node"),
+            ],
+        )
+        self.assertIn("index 7", diagnostics[7].message)
+        self.assertTrue(str(diagnostics[1]).startswith("6: error: end without"))
+
+    def test_sequence_diagnostics_carry_line_numbers(self):
+        found = [(item.line, item.code) for item in SequenceParser().validate(SEQUENCE)]
+        self.assertEqual(
+            found,
+            [
+                (3, "unknown-arrow"),
+                (4, "unmatched-deactivate"),
+                (6, "unparsed-line"),
+                (8, "unmatched-end"),
+                (9, "unmatched-else"),
+                (10, "unclosed-fragment"),
+            ],
+        )
+
+    def test_parse_errors_become_diagnostics(self):
+        diagnostics = validate_diagram("flowchart TB\nsubgraph\nA --> B\n")
+        self.assertEqual([(item.line, item.code) for item in diagnostics], [(2, "invalid-statement")])
+        diagnostics = validate_diagram("sequenceDiagram\nNote over A without text\n")
+        self.assertEqual([(item.line, item.code) for item in diagnostics], [(2, "invalid-note")])
+
+    def test_sequence_validation_continues_after_a_bad_statement(self):
+        diagnostics = validate_diagram("sequenceDiagram\nNote over A\nA-xB: q\nend\nA~~B: zzz\n")
+        self.assertEqual(
+            [(item.line, item.code) for item in diagnostics],
+            [(2, "invalid-note"), (3, "unparsed-line"), (4, "unmatched-end"), (5, "unparsed-line")],
+        )
+
+    def test_generated_sources_are_clean_and_pool_matches_serial(self):
+        clean_sequence = "sequenceDiagram\nparticipant A as Alice\nA->>B: hi\nactivate B\nloop again\nB-->>A: ok\nend\ndeactivate B\n"
+        texts = [flowchart_source(200, seed=seed) for seed in range(3)] + [clean_sequence, FLOWCHART]
+        serial = [result.output for result in validate_many(texts)]
+        self.assertEqual(serial[:4], [[], [], [], []])
+        self.assertTrue(has_errors(serial[4]))
+        pooled = [result.output for result in validate_many(texts, workers=2)]
+        self.assertEqual(pooled, serial)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from py_mermaid.src.watch import Watcher
+
+FLOWCHART = "flowchart TB\nA[Start]\nB[End]\nA --> B\n"
+SEQUENCE = "sequenceDiagram\nAlice->>Bob: Hello\n"
+
+class CountingRender:
+    def __init__(self):
+        from py_mermaid.src.pipeline import render_diagram
+        self._render = render_diagram
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return self._render(text)
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name) / "docs"
+        self.out = Path(self._tmp.name) / "site"
+        (self.root / "nested").mkdir(parents=True)
+        self.write("a.mmd", FLOWCHART)
+        self.write("nested/b.mmd", SEQUENCE)
+        self.write("c.mmd", FLOWCHART)
+        self.render = CountingRender()
+        self.watcher = Watcher(self.root, output_dir=self.out, render=self.render)
+
+    def tearDown(self):
+        self.watcher.close()
+        self._tmp.cleanup()
+
+    def write(self, name, text):
+        path = self.root / name
+        path.write_text(text, encoding="utf-8")
+        # Make sure the change is visible to mtime polling on coarse clocks.
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        return path
+
+    def test_initial_build_renders_each_distinct_source_once(self):
+        written = self.watcher.refresh()
+
+        self.assertEqual(len(written), 3)
+        self.assertEqual(self.render.calls, 2)
+        self.assertIn("Hello", (self.out / "nested" / "b.svg").read_text())
+        self.assertEqual((self.out / "a.svg").read_text(), (self.out / "c.svg").read_text())
+
+    def test_only_real_source_changes_are_rendered(self):
+        self.watcher.refresh()
+        calls = self.render.calls
+
+        self.write("a.mmd", "%% just a comment\n" + FLOWCHART.replace("\n", "\n\n"))
+        self.assertEqual(self.watcher.refresh(), [])
+        self.assertEqual(self.render.calls, calls)
+
+        self.write("a.mmd", FLOWCHART.replace("End", "Finish"))
+        self.assertEqual(self.watcher.refresh(), [self.out / "a.svg"])
+        self.assertEqual(self.render.calls, calls + 1)
+        self.assertIn("Finish", (self.out / "a.svg").read_text())
+        self.assertNotIn("Finish", (self.out / "c.svg").read_text())
+
+    def test_deleted_source_removes_output(self):
+        self.watcher.refresh()
+        (self.root / "c.mmd").unlink()
+        self.watcher.refresh()
+
+        self.assertFalse((self.out / "c.svg").exists())
+        self.assertTrue((self.out / "a.svg").exists())
+
+    def test_broken_source_does_not_stop_the_batch(self):
+        self.write("broken.mmd", "flowchart TB\nsubgraph\n")
+        written = self.watcher.refresh()
+
+        self.assertEqual(len(written), 3)
+        self.assertTrue((self.out / "a.svg").exists())
+        self.assertFalse((self.out / "broken.svg").exists())
+        self.assertEqual(list(self.watcher.failures()), [self.root / "broken.mmd"])
+        self.assertIsInstance(self.watcher.failures()[self.root / "broken.mmd"], IndexError)
+
+        calls = self.render.calls
+        self.assertEqual(self.watcher.refresh([self.root / "broken.mmd"]), [])
+        self.assertEqual(self.render.calls, calls)
+
+        self.write("broken.mmd", FLOWCHART.replace("End", "Fixed"))
+        self.assertEqual(self.watcher.refresh(), [self.out / "broken.svg"])
+        self.assertIn("Fixed", (self.out / "broken.svg").read_text())
+        self.assertEqual(self.watcher.failures(), {})
+
+    def test_run_debounces_bursts(self):
+        self.watcher.refresh()
+        self.watcher.debounce = 0.05
+        self.watcher.poll_interval = 0.01
+        stop = threading.Event()
+        thread = threading.Thread(target=self.watcher.run, args=(stop,))
+        thread.start()
+        try:
+            for idx in range(3):
+                self.write("a.mmd", FLOWCHART.replace("End", f"Burst {idx}"))
+            deadline = time.monotonic() + 5
+            while "Burst 2" not in (self.out / "a.svg").read_text() and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            stop.set()
+            thread.join()
+        self.assertIn("Burst 2", (self.out / "a.svg").read_text())
+
+if __name__ == '__main__':
+    unittest.main()